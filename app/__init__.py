@@ -2,12 +2,13 @@ import os
 from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
-import redis
 
 from app import routes
 from app.commands import register_commands
+from app.middlewares import register_middlewares
 
 from .services.celery_service import CeleryService
+from .services.circuit_breaker_service import GuardedRedis
 from config.app_config import AppConfig
 
 dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
@@ -29,13 +30,17 @@ def create_app():
 
     routes.init_app_routes(app)
 
+    register_middlewares(app)
+
     app.celery_client = CeleryService.celery_init_app(app)
 
-    app.redis = redis.Redis(
+    app.redis = GuardedRedis(
         host=AppConfig.REDIS_HOST,
         port=AppConfig.REDIS_PORT,
         db=AppConfig.REDIS_DB,
         password=AppConfig.REDIS_PASSWORD,
+        socket_timeout=AppConfig.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=AppConfig.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
     )
 
     register_commands(app)
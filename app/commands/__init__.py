@@ -1,7 +1,18 @@
 from app.commands.celery_health_check import celery_health_check_command
 from app.commands.db_health_check import db_health_check_command
+from app.commands.readiness_check import readiness_check_command
+from app.commands.memory_diagnostics import memory_diagnostics_command
+from app.commands.benchmarks.compression_benchmark import (
+    compression_benchmark_command,
+)
+from app.commands.benchmarks.write_benchmark import write_benchmark_command
+from app.commands.benchmarks.prepared_statement_benchmark import (
+    prepared_statement_benchmark_command,
+)
+from app.commands.benchmarks.validation_benchmark import validation_benchmark_command
 
 from app.commands.seeding.seed_admin_command import seed_admin_command
+from app.commands.seeding.seed_users_command import seed_users_command
 from app.commands.migrations.create_migration import command as create_migration_command
 from app.commands.migrations.db_migrate import command as db_migrate_command
 from app.commands.migrations.db_rollback import command as db_rollback_command
@@ -13,8 +24,15 @@ from app.commands.migrations.db_migrate_status import (
 def register_commands(app):
     app.cli.add_command(celery_health_check_command)
     app.cli.add_command(db_health_check_command)
+    app.cli.add_command(readiness_check_command)
+    app.cli.add_command(memory_diagnostics_command)
+    app.cli.add_command(compression_benchmark_command)
+    app.cli.add_command(write_benchmark_command)
+    app.cli.add_command(prepared_statement_benchmark_command)
+    app.cli.add_command(validation_benchmark_command)
 
     app.cli.add_command(seed_admin_command)
+    app.cli.add_command(seed_users_command)
 
     app.cli.add_command(create_migration_command)
     app.cli.add_command(db_migrate_command)
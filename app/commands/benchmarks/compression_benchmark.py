@@ -0,0 +1,81 @@
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+
+from app.logger_setup import LoggerSetup
+from app.middlewares.compression_middleware import (
+    CompressionMiddleware,
+    StreamCompressor,
+)
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 11],
+    "zstd": [1, 3, 19],
+}
+
+
+def build_users_page(rows: int) -> bytes:
+    generator = random.Random(rows)
+    now = datetime.now()
+    users = []
+    for user_id in range(1, rows + 1):
+        created_at = now - timedelta(minutes=generator.randint(0, 525600))
+        name = generator.choice(["John", "Jane", "Marko", "Ana", "Ivan", "Mila"])
+        surname = generator.choice(["Doe", "Smith", "Petrovic", "Jovanovic", "Ilic"])
+        users.append(
+            {
+                "name": name,
+                "surname": surname,
+                "email": f"{name.lower()}.{surname.lower()}{user_id}@mail.com",
+                "is_admin": generator.random() < 0.05,
+                "is_active": generator.random() < 0.9,
+                "created_at": created_at.isoformat(),
+                "updated_at": created_at.isoformat(),
+                "id": user_id,
+            }
+        )
+    body = {"users": users, "total_entries": rows, "total_pages": 1}
+    return json.dumps(body).encode()
+
+
+@click.command(
+    "bench:compression",
+    help="Measures CPU time and compressed size of a users page for every available encoding and level.",
+)
+@click.option(
+    "--rows",
+    default="10,100,1000,10000",
+    help="Comma separated page sizes to benchmark.",
+)
+@click.option(
+    "--repeat", default=20, help="Number of compressions measured per combination."
+)
+@with_appcontext
+def compression_benchmark_command(rows, repeat):
+    logger = LoggerSetup.get_logger("cli")
+
+    header = f"{'rows':>6} {'encoding':>8} {'level':>5} {'raw bytes':>10} {'compressed':>10} {'ratio':>6} {'ms/op':>8} {'MB/s':>8}"
+    click.echo(header)
+    logger.info(header)
+
+    for row_count in [int(value) for value in rows.split(",")]:
+        body = build_users_page(row_count)
+        for encoding in CompressionMiddleware.available_encodings():
+            for level in LEVELS[encoding]:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    compressed = StreamCompressor.compress_body(encoding, body, level)
+                elapsed = (time.perf_counter() - start) / repeat
+
+                line = (
+                    f"{row_count:>6} {encoding:>8} {level:>5} {len(body):>10} {len(compressed):>10} "
+                    f"{len(body) / len(compressed):>6.1f} {elapsed * 1000:>8.3f} "
+                    f"{len(body) / elapsed / 1e6:>8.1f}"
+                )
+                click.echo(line)
+                logger.info(line)
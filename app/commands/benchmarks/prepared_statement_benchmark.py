@@ -0,0 +1,112 @@
+import json
+import time
+import uuid
+
+import click
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.models.user_profile import UserProfile
+from app.services.base_crud_services.filter_compiler import FilterCompiler
+from app.services.prepared_statement_service import PreparedStatementService
+from app.services.user_services.user_pagination_service import (
+    UserPaginationService,
+)
+from config.app_config import AppConfig
+
+# The filters of GET /user/ when the client sends none, see create_pagination_parser.
+DEFAULT_FILTERS = {"is_active": True}
+
+
+def planning_ms(sql, params, prepared):
+    """
+    Returns the server-side planning and execution time of one statement in ms.
+    """
+    if prepared:
+        name = PreparedStatementService.statement_name(sql)
+        PreparedStatementService.execute(db, sql, params)
+        sql = PreparedStatementService.execute_statement_sql(name, params)
+    plan = db.execute_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", params).fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Planning Time"], plan[0]["Execution Time"]
+
+
+@click.command(
+    "bench:prepared",
+    help="Compares the hot-path selects with and without server-side prepared statements.",
+)
+@click.option("--iterations", default=500, help="Calls per statement and mode.")
+@with_appcontext
+def prepared_statement_benchmark_command(iterations):
+    logger = LoggerSetup.get_logger("cli")
+    domain = f"bench-{uuid.uuid4().hex[:8]}.example.com"
+    user = UserProfile.create(
+        name="Bench",
+        surname="User",
+        email=f"user@{domain}",
+        password=generate_password_hash("bench"),
+    )
+
+    # The same queries the services run, the model cache is bypassed so every
+    # call reaches the database.
+    statements = {
+        "get_user (pk lookup)": lambda: PreparedStatementService.get(
+            UserProfile.select().where(UserProfile.id == user.id)
+        ),
+        "login (email lookup)": lambda: PreparedStatementService.get(
+            UserProfile.select().where(UserProfile.email == user.email)
+        ),
+        "GET /user/ (count + page)": lambda: UserPaginationService.get_rows(
+            1, 10, "name", "asc", "", DEFAULT_FILTERS
+        ),
+    }
+    explained = {
+        "get_user (pk lookup)": UserProfile.select()
+        .where(UserProfile.id == user.id)
+        .limit(1),
+        "login (email lookup)": UserProfile.select()
+        .where(UserProfile.email == user.email)
+        .limit(1),
+        "GET /user/ (count + page)": UserProfile.select()
+        .where(FilterCompiler.compile(UserProfile, DEFAULT_FILTERS))
+        .order_by(UserProfile.name.asc())
+        .paginate(1, 10),
+    }
+
+    header = (
+        f"{'statement':<28} {'prepared':>8} {'ms/call':>8} "
+        f"{'plan ms':>8} {'exec ms':>8}"
+    )
+    click.echo(header)
+    logger.info(header)
+
+    enabled = AppConfig.PREPARED_STATEMENTS_ENABLED
+    try:
+        for name, call in statements.items():
+            sql, params = explained[name].sql()
+            for prepared in (False, True):
+                AppConfig.PREPARED_STATEMENTS_ENABLED = prepared
+                # Warm up, Postgres switches to a cached generic plan after
+                # five executions of a prepared statement.
+                for _ in range(10):
+                    call()
+
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    call()
+                elapsed = time.perf_counter() - start
+
+                plan_ms, exec_ms = planning_ms(sql, params, prepared)
+                line = (
+                    f"{name:<28} {'on' if prepared else 'off':>8} "
+                    f"{elapsed / iterations * 1000:>8.3f} {plan_ms:>8.3f} {exec_ms:>8.3f}"
+                )
+                click.echo(line)
+                logger.info(line)
+    finally:
+        AppConfig.PREPARED_STATEMENTS_ENABLED = enabled
+        PreparedStatementService.deallocate_all(db)
+        UserProfile.delete().where(UserProfile.email.endswith(f"@{domain}")).execute()
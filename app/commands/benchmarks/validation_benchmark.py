@@ -0,0 +1,93 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flask_restx import reqparse
+from flask_restx.model import ModelBase
+
+from app.endpoints.user_endpoints import user_namespace, user_schema_retriever
+from app.logger_setup import LoggerSetup
+
+PAYLOADS = {
+    "registration": {
+        "name": "John",
+        "surname": "Doe",
+        "email": "john.doe@mail.com",
+        "password": "Strong password",
+    },
+    "login": {"email": "john.doe@mail.com", "password": "Strong password"},
+    "change_password": {"old_password": "OldPassword123!", "new_password": "NewPassword456!"},
+    "users_batch_request": {"ids": list(range(1, 101))},
+    "batch_request": {
+        "requests": [
+            {"method": "GET", "path": "/user/get_myself/"},
+            {"method": "GET", "path": "/user/", "query": {"page": 1, "per_page": 10}},
+            {"method": "PUT", "path": "/user/2/status/", "body": {}},
+        ]
+    },
+}
+QUERY_STRINGS = [
+    "",
+    "page=2&per_page=20&sort_field=email&sort_order=desc",
+    "page=1&per_page=50&search=john&filters=%7B%22is_admin%22%3Atrue%7D",
+]
+
+
+def measure(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def as_reqparse(parser):
+    plain = reqparse.RequestParser(bundle_errors=parser.bundle_errors)
+    plain.args = parser.args
+    return plain
+
+
+@click.command(
+    "bench:validation",
+    help="Measures per-request validation time of request bodies and query arguments, restx versus compiled.",
+)
+@click.option("--repeat", default=2000, help="Validations measured per payload and mode.")
+@with_appcontext
+def validation_benchmark_command(repeat):
+    logger = LoggerSetup.get_logger("cli")
+    api = user_namespace.apis[0]
+
+    header = f"{'payload':<52} {'restx us':>9} {'compiled us':>12} {'speedup':>8}"
+    click.echo(header)
+    logger.info(header)
+
+    def emit(name, baseline, compiled):
+        line = f"{name:<52} {baseline:>9.1f} {compiled:>12.1f} {baseline / compiled:>7.1f}x"
+        click.echo(line)
+        logger.info(line)
+
+    for key, payload in PAYLOADS.items():
+        model = user_schema_retriever.retrieve(key)
+        emit(
+            f"body {model.name}",
+            measure(
+                lambda: ModelBase.validate(
+                    model, payload, api.refresolver, api.format_checker
+                ),
+                repeat,
+            ),
+            measure(
+                lambda: model.validate(payload, api.refresolver, api.format_checker),
+                repeat,
+            ),
+        )
+
+    parser = user_schema_retriever.retrieve("pagination_parser")
+    plain = as_reqparse(parser)
+    for query_string in QUERY_STRINGS:
+        with current_app.test_request_context(f"/user/?{query_string}"):
+            emit(
+                f"query /user/?{query_string[:40]}",
+                measure(plain.parse_args, repeat),
+                measure(parser.parse_args, repeat),
+            )
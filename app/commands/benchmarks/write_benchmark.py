@@ -0,0 +1,170 @@
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.models.base import BaseModel
+from app.models.user_profile import UserProfile
+from config.app_config import AppConfig
+
+
+class RoundTripCounter:
+    """
+    Counts statements, transaction control commands and WAL bytes written
+    while it is active.
+    """
+
+    def __init__(self):
+        self.round_trips = 0
+        self._originals = {}
+
+    def __enter__(self):
+        for name in ("execute_sql", "begin", "commit", "rollback"):
+            original = getattr(db, name)
+            self._originals[name] = original
+            setattr(db, name, self._counted(original))
+        self._wal_start = self._wal_lsn()
+        return self
+
+    def __exit__(self, *exc_info):
+        for name in self._originals:
+            delattr(db, name)
+        self.wal_bytes = int(
+            db.execute_sql(
+                "SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s)",
+                (self._wal_start,),
+            ).fetchone()[0]
+        )
+
+    def _counted(self, func):
+        def counted(*args, **kwargs):
+            self.round_trips += 1
+            return func(*args, **kwargs)
+
+        return counted
+
+    @staticmethod
+    def _wal_lsn():
+        return db.execute_sql("SELECT pg_current_wal_insert_lsn()").fetchone()[0]
+
+
+@contextmanager
+def full_row_saves():
+    """
+    Makes ``save`` on existing rows write every field, as it did before saves
+    were limited to dirty fields. The baseline of the dirty-field measurement.
+    """
+    dirty_field_save = BaseModel.save
+
+    def save(self, force_insert=False, only=None):
+        if only is None and self._pk is not None and not force_insert:
+            # Fields missing from model cache instances were never loaded.
+            only = [
+                field
+                for field in self._meta.sorted_fields
+                if field is not self._meta.primary_key and field.name in self.__data__
+            ]
+        return dirty_field_save(self, force_insert=force_insert, only=only)
+
+    BaseModel.save = save
+    try:
+        yield
+    finally:
+        BaseModel.save = dirty_field_save
+
+
+@click.command(
+    "bench:writes",
+    help="Measures database round trips and WAL bytes per write endpoint: full-row against dirty-field saves, "
+    "and without and with the unit of work.",
+)
+@click.option("--requests", "request_count", default=50, help="Requests per endpoint and mode.")
+@with_appcontext
+def write_benchmark_command(request_count):
+    logger = LoggerSetup.get_logger("cli")
+    app = current_app._get_current_object()
+    run_id = uuid.uuid4().hex[:8]
+    domain = f"bench-{run_id}.example.com"
+
+    admin = UserProfile.create(
+        name="Bench",
+        surname="Admin",
+        email=f"admin@{domain}",
+        password=generate_password_hash("bench"),
+        is_admin=True,
+    )
+    target = UserProfile.create(
+        name="Bench",
+        surname="Target",
+        email=f"target@{domain}",
+        password=generate_password_hash("bench"),
+    )
+    client = app.test_client()
+    # Registration logs the new user in, so it gets a client of its own.
+    anonymous_client = app.test_client()
+    client.post("/user/login/", json={"email": admin.email, "password": "bench"})
+
+    endpoints = {
+        "POST /user/register/": lambda i, mode: anonymous_client.post(
+            "/user/register/",
+            json={
+                "name": "Bench",
+                "surname": "User",
+                "email": f"user-{mode}-{i}@{domain}",
+                "password": "bench",
+            },
+        ),
+        "PUT /user/<id>/status/": lambda i, mode: client.put(
+            f"/user/{target.id}/status/"
+        ),
+        "PUT /user/change-password/<id>": lambda i, mode: client.put(
+            f"/user/change-password/{target.id}", json={"new_password": f"bench-{i}"}
+        ),
+    }
+
+    # (save, unit of work): full-row saves are the baseline of dirty-field saves,
+    # which are then measured without and with the unit of work.
+    modes = (("full-row", False), ("dirty", False), ("dirty", True))
+
+    header = (
+        f"{'endpoint':<32} {'save':>8} {'unit of work':>12} {'round trips/req':>16} "
+        f"{'WAL bytes/req':>14} {'ms/req':>8}"
+    )
+    click.echo(header)
+    logger.info(header)
+
+    unit_of_work_enabled = AppConfig.UNIT_OF_WORK_ENABLED
+    try:
+        for name, send in endpoints.items():
+            for save_mode, enabled in modes:
+                AppConfig.UNIT_OF_WORK_ENABLED = enabled
+                unit_of_work = "on" if enabled else "off"
+                mode = f"{save_mode}-{unit_of_work}"
+                saves = full_row_saves() if save_mode == "full-row" else nullcontext()
+                start = time.perf_counter()
+                with saves, RoundTripCounter() as counter:
+                    for i in range(request_count):
+                        response = send(i, mode)
+                        if response.status_code >= 400:
+                            raise click.ClickException(
+                                f"{name} failed with {response.status_code}: {response.get_data(as_text=True)}"
+                            )
+                elapsed = time.perf_counter() - start
+
+                line = (
+                    f"{name:<32} {save_mode:>8} {unit_of_work:>12} "
+                    f"{counter.round_trips / request_count:>16.1f} "
+                    f"{counter.wal_bytes / request_count:>14.0f} "
+                    f"{elapsed / request_count * 1000:>8.2f}"
+                )
+                click.echo(line)
+                logger.info(line)
+    finally:
+        AppConfig.UNIT_OF_WORK_ENABLED = unit_of_work_enabled
+        UserProfile.delete().where(UserProfile.email.endswith(f"@{domain}")).execute()
@@ -1,11 +1,173 @@
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
 import click
+from flask import current_app
 from flask.cli import with_appcontext
+
+from app.logger_setup import LoggerSetup
+from app.tasks.celery_benchmark_tasks import (
+    celery_benchmark_cpu_task,
+    celery_benchmark_noop_task,
+)
 from app.tasks.celery_health_check_task import celery_health_check_task
 
 
+def percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))]
+
+
+def resize_pools(celery_app, pool_sizes: Dict[str, int], size: int) -> None:
+    """
+    Grows or shrinks the pool of every worker to the given size and updates
+    ``pool_sizes`` in place.
+    """
+    for hostname, current in pool_sizes.items():
+        if size > current:
+            celery_app.control.pool_grow(size - current, destination=[hostname])
+        elif size < current:
+            celery_app.control.pool_shrink(current - size, destination=[hostname])
+        pool_sizes[hostname] = size
+
+
+def run_tasks(
+    task, args: Tuple, count: int, in_flight: int, timeout: int
+) -> Tuple[List[Dict[str, float]], float]:
+    """
+    Runs ``count`` tasks keeping at most ``in_flight`` of them queued or running.
+
+    Returns:
+        Tuple[List[Dict[str, float]], float]: The timings of every task and the total duration.
+    """
+    pending = []
+    samples = []
+    submitted = 0
+    start = time.time()
+
+    while submitted < count or pending:
+        while submitted < count and len(pending) < in_flight:
+            enqueued_at = time.time()
+            result = task.apply_async(args=(enqueued_at, *args))
+            pending.append((result, enqueued_at, time.time() - enqueued_at))
+            submitted += 1
+
+        still_pending = []
+        for result, enqueued_at, enqueue_latency in pending:
+            if not result.ready():
+                still_pending.append((result, enqueued_at, enqueue_latency))
+                continue
+            timings = result.get()
+            result.forget()
+            samples.append(
+                {
+                    "hostname": timings["hostname"],
+                    "started_at": timings["started_at"],
+                    "finished_at": timings["finished_at"],
+                    "enqueue": enqueue_latency,
+                    "queue_wait": timings["started_at"] - enqueued_at,
+                    "execution": timings["finished_at"] - timings["started_at"],
+                    "end_to_end": time.time() - enqueued_at,
+                }
+            )
+        pending = still_pending
+
+        if time.time() - start > timeout:
+            raise click.ClickException(
+                f"Benchmark timed out with {len(pending)} task(s) still pending."
+            )
+        if pending:
+            time.sleep(0.005)
+
+    return samples, time.time() - start
+
+
+def report(
+    pool_size: Optional[int], kind: str, samples: List[Dict[str, float]], elapsed: float
+) -> List[str]:
+    lines = [
+        f"pool={pool_size or 'current'} tasks={kind} count={len(samples)} "
+        f"throughput={len(samples) / elapsed:.1f}/s"
+    ]
+    for metric in ("enqueue", "queue_wait", "execution", "end_to_end"):
+        values = [sample[metric] * 1000 for sample in samples]
+        lines.append(
+            f"  {metric:<11} p50={percentile(values, 50):>9.2f}ms "
+            f"p90={percentile(values, 90):>9.2f}ms p99={percentile(values, 99):>9.2f}ms "
+            f"max={max(values):>9.2f}ms"
+        )
+
+    by_hostname = defaultdict(list)
+    for sample in samples:
+        by_hostname[sample["hostname"]].append(sample)
+    for hostname, host_samples in sorted(by_hostname.items()):
+        busy = max(s["finished_at"] for s in host_samples) - min(
+            s["started_at"] for s in host_samples
+        )
+        throughput = len(host_samples) / busy if busy > 0 else float("inf")
+        lines.append(
+            f"  worker {hostname}: {len(host_samples)} tasks, {throughput:.1f}/s"
+        )
+    return lines
+
+
 @click.command("health_check:celery")
+@click.option(
+    "--benchmark",
+    is_flag=True,
+    help="Measure enqueue latency, queue wait, execution time and throughput instead of running the sleep tasks.",
+)
+@click.option("--noop-tasks", default=500, help="Number of no-op tasks per concurrency setting.")
+@click.option("--cpu-tasks", default=100, help="Number of CPU-bound tasks per concurrency setting.")
+@click.option("--cpu-iterations", default=200_000, help="Loop iterations of a CPU-bound task.")
+@click.option(
+    "--concurrency",
+    default=None,
+    help="Comma separated worker pool sizes to sweep, e.g. 1,2,4. "
+    "Pools are resized with pool_grow/pool_shrink and restored afterwards.",
+)
+@click.option("--timeout", default=300, help="Maximum duration of one run in seconds.")
 @with_appcontext
-def celery_health_check_command():
-    for i in range(4):
-        task_name = f"health_check_task_{i+1}"
-        celery_health_check_task.delay(task_name)
+def celery_health_check_command(
+    benchmark, noop_tasks, cpu_tasks, cpu_iterations, concurrency, timeout
+):
+    if not benchmark:
+        for i in range(4):
+            task_name = f"health_check_task_{i+1}"
+            celery_health_check_task.delay(task_name)
+        return
+
+    logger = LoggerSetup.get_logger("cli")
+    celery_app = current_app.celery_client
+
+    stats = celery_app.control.inspect(timeout=2).stats() or {}
+    if not stats:
+        raise click.ClickException("No Celery workers replied.")
+    original_sizes = {
+        hostname: worker_stats["pool"]["max-concurrency"]
+        for hostname, worker_stats in stats.items()
+    }
+    pool_sizes = dict(original_sizes)
+    sweep = [int(size) for size in concurrency.split(",")] if concurrency else [None]
+
+    try:
+        for size in sweep:
+            if size is not None:
+                resize_pools(celery_app, pool_sizes, size)
+            # Two tasks per pool process keep every worker busy between polls.
+            in_flight = 2 * sum(pool_sizes.values())
+
+            for kind, task, args, count in (
+                ("noop", celery_benchmark_noop_task, (), noop_tasks),
+                ("cpu", celery_benchmark_cpu_task, (cpu_iterations,), cpu_tasks),
+            ):
+                if not count:
+                    continue
+                samples, elapsed = run_tasks(task, args, count, in_flight, timeout)
+                for line in report(size, kind, samples, elapsed):
+                    click.echo(line)
+                    logger.info(line)
+    finally:
+        for hostname, size in original_sizes.items():
+            resize_pools(celery_app, {hostname: pool_sizes[hostname]}, size)
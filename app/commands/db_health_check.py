@@ -28,7 +28,7 @@ def db_health_check_command():
                 - Port: {AppConfig.DB_PORT} 
                 - User: {AppConfig.DB_USER}
                 - Name: {AppConfig.DB_NAME} 
-                - Password: {AppConfig.DB_PASSWORD}"""
+                - Password: {"set" if AppConfig.DB_PASSWORD else "not set"}"""
         )
         click.echo(click.style("Database connection failed.", fg="red"))
     finally:
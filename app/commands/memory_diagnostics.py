@@ -0,0 +1,81 @@
+import json
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from app.logger_setup import LoggerSetup
+from app.tasks.memory_diagnostics_task import memory_diagnostics_task
+from config.app_config import AppConfig
+
+
+def format_report(report) -> str:
+    lines = [
+        f"worker {report['hostname']} pid {report['pid']}: "
+        f"rss {report['rss_bytes'] / 1e6:.1f} MB, "
+        f"traced {report['traced_bytes'] / 1e6:.1f} MB "
+        f"(peak {report['traced_peak_bytes'] / 1e6:.1f} MB), "
+        f"{len(report['snapshots'])} snapshot(s)"
+    ]
+    for title, key in (
+        ("growth since previous snapshot", "growth_since_previous"),
+        ("growth since first snapshot", "growth_since_first"),
+        ("top allocation sites", "top"),
+    ):
+        if not report[key]:
+            continue
+        lines.append(f"  {title}:")
+        for stat in report[key]:
+            site = stat["site"] if isinstance(stat["site"], str) else " <- ".join(stat["site"])
+            diff = (
+                f" ({stat['size_diff_bytes']:+,} B, {stat['count_diff']:+,} blocks)"
+                if "size_diff_bytes" in stat
+                else ""
+            )
+            lines.append(
+                f"    {stat['size_bytes']:>12,} B {stat['count']:>8,} blocks{diff}  {site}"
+            )
+    return "\n".join(lines)
+
+
+@click.command(
+    "diagnostics:memory",
+    help="Takes tracemalloc snapshots inside the process of the celery_diagnostics_worker over time "
+    "and prints the growing allocation sites. Use POST /metrics/memory/ for web workers.",
+)
+@click.option("--count", default=2, help="Number of snapshots to take.")
+@click.option("--interval", default=60, help="Seconds between snapshots.")
+@click.option("--limit", default=10, help="Allocation sites listed per section.")
+@click.option(
+    "--key-type",
+    type=click.Choice(["lineno", "filename", "traceback"]),
+    default="lineno",
+    help="Group allocations by line, file or traceback.",
+)
+@click.option("--timeout", default=30, help="Seconds to wait for a worker to answer.")
+@click.option("--as-json", is_flag=True, help="Print the raw reports as JSON.")
+@with_appcontext
+def memory_diagnostics_command(count, interval, limit, key_type, timeout, as_json):
+    logger = LoggerSetup.get_logger("cli")
+    worker = None
+
+    for round_number in range(1, count + 1):
+        # Routed to the diagnostics queue, whose single worker process keeps
+        # the earlier snapshots to compare with.
+        report = memory_diagnostics_task.delay(limit, key_type).get(timeout=timeout)
+        if worker is None:
+            worker = (report["hostname"], report["pid"])
+        elif (report["hostname"], report["pid"]) != worker:
+            raise click.ClickException(
+                f"Snapshot {round_number} was taken by {report['hostname']} pid {report['pid']}, "
+                f"not {worker[0]} pid {worker[1]}: the worker process was replaced or more than one "
+                f"process consumes the {AppConfig.MEMORY_DIAGNOSTICS_QUEUE} queue. Growth can only be "
+                "compared within one process, run the diagnostics worker with --concurrency=1."
+            )
+        output = json.dumps(report, indent=2) if as_json else format_report(report)
+        click.echo(f"--- snapshot {round_number}/{count}")
+        click.echo(output)
+        logger.info(f"Memory diagnostics snapshot {round_number}/{count}: {json.dumps(report)}")
+
+        if round_number < count:
+            time.sleep(interval)
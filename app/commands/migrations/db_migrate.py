@@ -2,6 +2,8 @@ import click
 from flask.cli import with_appcontext
 from app.logger_setup import LoggerSetup
 from app.db_init import router
+from app.online_migrations import OnlineMigrations
+from config.app_config import AppConfig
 
 
 @click.command("db:migrate", help="This command is used to run migrations.")
@@ -10,8 +12,25 @@ from app.db_init import router
     is_flag=True,
     help="Migrate only to the next migration instead of migrating all the way",
 )
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Print the SQL of pending migrations with estimated affected rows, without applying them",
+)
+@click.option(
+    "--lock-timeout",
+    default=AppConfig.MIGRATION_LOCK_TIMEOUT,
+    show_default=True,
+    help="Maximum wait for a lock per statement ('0' disables it)",
+)
+@click.option(
+    "--statement-timeout",
+    default=AppConfig.MIGRATION_STATEMENT_TIMEOUT,
+    show_default=True,
+    help="Maximum duration per statement ('0' disables it)",
+)
 @with_appcontext
-def command(single):
+def command(single, dry_run, lock_timeout, statement_timeout):
     logger = LoggerSetup.get_logger("migrations")
 
     try:
@@ -19,6 +38,15 @@ def command(single):
         if not diff:
             logger.info("There is nothing to migrate.")
             return
+        names = diff[:1] if single else diff
+
+        OnlineMigrations.set_session_timeouts(
+            router.database, lock_timeout, statement_timeout
+        )
+
+        if dry_run:
+            print_dry_run(names)
+            return
         if single:
             router.run_one(name=diff[0], migrator=router.migrator, fake=False)
             logger.info(f"Migration {diff[0]} applied successfully.")
@@ -28,3 +56,25 @@ def command(single):
     except Exception as exception:
         logger.error(f"There was an error while running migrations.")
         logger.error(exception)
+
+
+def print_dry_run(names):
+    migrator = router.migrator
+    with OnlineMigrations.dry_run(router.database) as statements:
+        for name in names:
+            migrate, _ = router.read(name)
+            start = len(statements)
+            migrate(migrator, router.database, fake=False)
+            migrator()
+
+            click.echo(f"-- Migration {name}")
+            for statement in statements[start:]:
+                rows = statement["estimated_rows"]
+                click.echo(
+                    f"-- estimated rows: {'unknown' if rows is None else rows}"
+                )
+                sql = statement["sql"]
+                if statement["params"]:
+                    sql = f"{sql} -- params: {statement['params']}"
+                click.echo(f"{sql};")
+            click.echo()
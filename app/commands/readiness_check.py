@@ -0,0 +1,37 @@
+import json
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.logger_setup import LoggerSetup
+from app.services.health_check_service import HealthCheckService
+
+
+@click.command(
+    "health_check:ready",
+    help="Probes Postgres, Redis and Celery like GET /health/ready and prints the report.",
+)
+@click.option("--as-json", is_flag=True, help="Print the report as JSON.")
+@with_appcontext
+def readiness_check_command(as_json):
+    logger = LoggerSetup.get_logger("cli")
+    report = HealthCheckService.get_report(
+        current_app._get_current_object(), use_cache=False
+    )
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+    else:
+        for name, check in report["checks"].items():
+            details = check.get("error") or ", ".join(check.get("workers", []))
+            line = f"{name:<15} {check['status']:<6} {check['latency_ms']:>9.2f} ms  {details}"
+            if check["status"] == "ok":
+                color = "green"
+            else:
+                color = "red" if check["critical"] else "yellow"
+            click.echo(click.style(line, fg=color))
+
+    logger.info(f"Readiness check: {json.dumps(report)}")
+    if report["status"] == "error":
+        raise SystemExit(1)
@@ -0,0 +1,236 @@
+import csv
+import io
+import itertools
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Tuple
+
+import click
+import psycopg2
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.models.user_profile import UserProfile
+
+NAMES = [
+    "John", "Jane", "Marko", "Ana", "Ivan", "Mila", "Stefan", "Jelena", "Nikola",
+    "Milica", "Luka", "Sara", "Petar", "Marija", "Aleksandar", "Katarina", "Michael",
+    "Emma", "David", "Olivia", "Lazar", "Teodora", "Filip", "Nina", "Vuk", "Sofija",
+    "Daniel", "Laura", "Andrej", "Iva", "Pavle", "Tamara", "Thomas", "Anja", "Uros",
+    "Dragana", "Lucas", "Mia", "Nemanja", "Isidora",
+]
+SURNAMES = [
+    "Petrovic", "Jovanovic", "Nikolic", "Markovic", "Djordjevic", "Stojanovic", "Ilic",
+    "Stankovic", "Pavlovic", "Milosevic", "Smith", "Johnson", "Williams", "Brown",
+    "Jones", "Miller", "Davis", "Popovic", "Zivkovic", "Todorovic", "Kostic",
+    "Ristic", "Savic", "Lukic", "Mitrovic", "Simic", "Obradovic", "Kovacevic",
+    "Garcia", "Wilson", "Taylor", "Anderson", "Lazic", "Vasic", "Radovanovic",
+    "Filipovic", "Marinkovic", "Tomic", "Bogdanovic", "Novakovic",
+]
+COLUMNS = (
+    "name",
+    "surname",
+    "email",
+    "password",
+    "is_admin",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+
+
+def zipf_weights(count: int, skew: float) -> List[float]:
+    """
+    Weights where the n-th value is picked proportionally to 1 / n^skew, so a
+    few names are very common and most are rare. A skew of 0 is uniform.
+    """
+    return list(itertools.accumulate(1 / (rank**skew) for rank in range(1, count + 1)))
+
+
+def generate_batch(
+    seed: int, batch_number: int, start_index: int, size: int, options: Dict[str, Any]
+) -> List[Tuple]:
+    """
+    Generates the rows of one batch. Every batch has its own generator seeded
+    from the seed and the batch number, so the output does not depend on the
+    number of workers or the order in which batches are inserted.
+    """
+    generator = random.Random(f"{seed}:{batch_number}")
+    name_weights = zipf_weights(len(NAMES), options["name_skew"])
+    surname_weights = zipf_weights(len(SURNAMES), options["name_skew"])
+    window_seconds = options["created_days"] * 86400
+    now = options["now"]
+
+    rows = []
+    for index in range(start_index, start_index + size):
+        name = generator.choices(NAMES, cum_weights=name_weights)[0]
+        surname = generator.choices(SURNAMES, cum_weights=surname_weights)[0]
+        created_at = now - timedelta(seconds=generator.random() * window_seconds)
+        updated_at = created_at + (now - created_at) * generator.random() ** 3
+        rows.append(
+            (
+                name,
+                surname,
+                f"{name}.{surname}.{index}@{options['email_domain']}".lower(),
+                options["password_hash"],
+                generator.random() < options["admin_ratio"],
+                generator.random() < options["active_ratio"],
+                created_at,
+                updated_at,
+            )
+        )
+    return rows
+
+
+def seed_batches(
+    seed: int, batches: List[Tuple[int, int, int]], options: Dict[str, Any]
+) -> int:
+    """
+    Inserts the given batches on a dedicated connection, committing after each
+    batch. Runs in a worker process when seeding in parallel.
+
+    Returns:
+        int: The number of inserted rows.
+    """
+    connection = psycopg2.connect(dbname=db.database, **db.connect_params)
+    inserted = 0
+    try:
+        with connection.cursor() as cursor:
+            for batch_number, start_index, size in batches:
+                rows = generate_batch(seed, batch_number, start_index, size, options)
+                if options["method"] == "copy":
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(rows)
+                    buffer.seek(0)
+                    cursor.copy_expert(
+                        f"COPY {UserProfile._meta.table_name} ({', '.join(COLUMNS)}) "
+                        "FROM STDIN WITH (FORMAT csv)",
+                        buffer,
+                    )
+                else:
+                    query = UserProfile.insert_many(
+                        rows, fields=[UserProfile._meta.fields[name] for name in COLUMNS]
+                    )
+                    sql, params = query.sql()
+                    cursor.execute(sql, params)
+                connection.commit()
+                inserted += size
+    finally:
+        connection.close()
+    return inserted
+
+
+@click.command(
+    "seed:users",
+    help="Generates a large number of synthetic users for local benchmarks.",
+)
+@click.option("--count", default=1_000_000, help="Number of users to generate.")
+@click.option("--seed", default=42, help="Seed of the generator, the same seed gives the same users.")
+@click.option("--batch-size", default=10_000, help="Number of rows inserted per batch.")
+@click.option("--workers", default=1, help="Number of parallel worker processes.")
+@click.option(
+    "--method",
+    type=click.Choice(["copy", "insert"]),
+    default="copy",
+    help="Load rows with COPY or with batched multi-row INSERTs.",
+)
+@click.option("--active-ratio", default=0.9, help="Share of active users.")
+@click.option("--admin-ratio", default=0.001, help="Share of admin users.")
+@click.option(
+    "--name-skew",
+    default=1.1,
+    help="Zipf exponent of the name and surname distribution (0 is uniform).",
+)
+@click.option("--created-days", default=730, help="Spread created_at over this many past days.")
+@click.option(
+    "--now",
+    type=click.DateTime(),
+    default="2025-01-01T00:00:00",
+    show_default=True,
+    help="The moment created_at and updated_at are spread back from. Fixed, so the "
+    "same seed gives the same timestamps on every run.",
+)
+@click.option(
+    "--start-index",
+    default=1,
+    show_default=True,
+    help="First index used in generated emails. Emails are unique, so further runs "
+    "on the same database, also in parallel, need disjoint ranges.",
+)
+@click.option("--password", default="password", help="Password of every generated user.")
+@click.option("--email-domain", default="seed.example.com", help="Domain of generated emails.")
+@with_appcontext
+def seed_users_command(
+    count,
+    seed,
+    batch_size,
+    workers,
+    method,
+    active_ratio,
+    admin_ratio,
+    name_skew,
+    created_days,
+    now,
+    start_index,
+    password,
+    email_domain,
+):
+    logger = LoggerSetup.get_logger("cli")
+
+    options = {
+        "method": method,
+        "active_ratio": active_ratio,
+        "admin_ratio": admin_ratio,
+        "name_skew": name_skew,
+        "created_days": created_days,
+        "email_domain": email_domain,
+        # Hashed once, so generating rows costs no key derivation.
+        "password_hash": generate_password_hash(password),
+        "now": now,
+    }
+    batches = [
+        (number, start_index + offset, min(batch_size, count - offset))
+        for number, offset in enumerate(range(0, count, batch_size))
+    ]
+    worker_count = max(1, min(workers, len(batches)))
+    # Batches are dealt round-robin so workers finish at about the same time.
+    worker_batches = [batches[worker::worker_count] for worker in range(worker_count)]
+
+    logger.info(
+        f"Seeding {count} users from index {start_index} with {worker_count} worker(s) using {method}."
+    )
+    start = time.perf_counter()
+
+    if worker_count == 1:
+        inserted = seed_batches(seed, batches, options)
+    else:
+        # Forked workers must not share the parent's connection.
+        db.close()
+        with ProcessPoolExecutor(
+            max_workers=worker_count, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            inserted = sum(
+                executor.map(
+                    seed_batches,
+                    itertools.repeat(seed),
+                    worker_batches,
+                    itertools.repeat(options),
+                )
+            )
+
+    elapsed = time.perf_counter() - start
+    db.execute_sql(f"ANALYZE {UserProfile._meta.table_name}")
+
+    report = (
+        f"Seeded {inserted} users in {elapsed:.2f}s "
+        f"({inserted / elapsed if elapsed else 0:,.0f} rows/s), seed {seed}, "
+        f"email indexes {start_index} to {start_index + count - 1}, "
+        f"timestamps up to {now.isoformat()}."
+    )
+    click.echo(report)
+    logger.info(report)
@@ -1,12 +1,12 @@
-from peewee import PostgresqlDatabase
 from dotenv import load_dotenv, find_dotenv
 from peewee_migrate import Router
 
+from app.services.circuit_breaker_service import GuardedPostgresqlDatabase
 from config.app_config import AppConfig
 
 _ = load_dotenv(find_dotenv())
 
-db = PostgresqlDatabase(
+db = GuardedPostgresqlDatabase(
     AppConfig.DB_NAME,
     user=AppConfig.DB_USER,
     password=AppConfig.DB_PASSWORD,
@@ -0,0 +1,11 @@
+from flask_restx import Namespace
+
+from app.validation_schemas.retrievers.health_schema_retriever import (
+    HealthSchemaRetriever,
+)
+
+
+health_namespace = Namespace("Health", description="Liveness and readiness probes")
+health_schema_retriever = HealthSchemaRetriever(health_namespace)
+
+from .health_endpoints import *
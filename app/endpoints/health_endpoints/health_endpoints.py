@@ -0,0 +1,54 @@
+from flask import current_app
+from flask_restx import Resource
+
+from app.enums.http_status import HttpStatus
+from app.logger_setup import LoggerSetup
+from app.services.health_check_service import HealthCheckService
+
+from . import health_namespace, health_schema_retriever
+
+
+@health_namespace.route("/live")
+class Liveness(Resource):
+    @health_namespace.doc(
+        description="Liveness probe. Succeeds while the process can serve requests, without touching dependencies."
+    )
+    @health_namespace.response(
+        HttpStatus.OK.value,
+        "The process is alive.",
+        health_schema_retriever.retrieve("liveness_response"),
+    )
+    def get(self):
+        return {"status": "ok"}, HttpStatus.OK.value
+
+
+@health_namespace.route("/ready")
+class Readiness(Resource):
+    @health_namespace.doc(
+        description="Readiness probe. Checks Postgres, Redis, the Celery broker and workers concurrently and reports per-dependency latency. Fails only when a dependency in HEALTH_CHECK_CRITICAL fails, other failures are reported as 'degraded'."
+    )
+    @health_namespace.response(
+        HttpStatus.OK.value,
+        "All critical dependencies are healthy, the status is 'degraded' if others failed.",
+        health_schema_retriever.retrieve("readiness_response"),
+    )
+    @health_namespace.response(
+        HttpStatus.SERVICE_UNAVAILABLE.value,
+        "At least one critical dependency is unhealthy.",
+        health_schema_retriever.retrieve("readiness_response"),
+    )
+    def get(self):
+        try:
+            report = HealthCheckService.get_report(current_app._get_current_object())
+            if report["status"] == "error":
+                return report, HttpStatus.SERVICE_UNAVAILABLE.value
+            return report, HttpStatus.OK.value
+
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while checking readiness, err : {e}"
+            )
+            return (
+                {"message": f"Internal server error: {str(e)}"},
+                HttpStatus.INTERNAL_SERVER_ERROR.value,
+            )
@@ -0,0 +1,11 @@
+from flask_restx import Namespace
+
+from app.validation_schemas.retrievers.metrics_schema_retriever import (
+    MetricsSchemaRetriever,
+)
+
+
+metrics_namespace = Namespace("Metrics", description="Process metrics")
+metrics_schema_retriever = MetricsSchemaRetriever(metrics_namespace)
+
+from .metrics_endpoints import *
@@ -0,0 +1,226 @@
+import os
+
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restx import Resource, marshal
+
+from peewee import DoesNotExist
+
+from app.enums.http_status import HttpStatus
+from app.logger_setup import LoggerSetup
+from app.middlewares.admission_control_middleware import AdmissionControlMiddleware
+from app.services.cache_services.model_cache_service import ModelCacheService
+from app.services.circuit_breaker_service import CircuitBreaker
+from app.services.memory_diagnostics_service import MemoryDiagnosticsService
+from app.services.metrics_service import MetricsService
+from app.services.outbox_service import OutboxService
+from app.services.user_services.user_archive_service import UserArchiveService
+from app.services.user_services.user_auth_service import UserAuthService
+from app.services.user_services.user_crud_service import UserCRUDService
+
+from . import metrics_namespace, metrics_schema_retriever
+
+
+@metrics_namespace.route("/")
+class GetMetrics(Resource):
+    @metrics_namespace.doc(
+        description="Retrieve metrics of the worker process serving the request. Requires admin privileges."
+    )
+    @jwt_required()
+    @metrics_namespace.response(
+        HttpStatus.OK.value,
+        "Metrics retrieved successfully.",
+        metrics_schema_retriever.retrieve("metrics_response"),
+    )
+    @metrics_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @metrics_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def get(self):
+        try:
+            current_user_id = get_jwt_identity()
+            current_user_profile = UserCRUDService.get_user(current_user_id)
+
+            if not UserAuthService.check_if_admin(current_user_profile):
+                return (
+                    {"message": "Unauthorized. Only admins can access this endpoint."},
+                    HttpStatus.UNAUTHORIZED.value,
+                )
+
+            return {
+                "pid": os.getpid(),
+                "metrics": MetricsService.snapshot(),
+                "model_cache": ModelCacheService.stats(),
+                "circuit_breakers": CircuitBreaker.snapshot(),
+                "admission": AdmissionControlMiddleware.stats(),
+            }, HttpStatus.OK.value
+
+        except DoesNotExist:
+            return (
+                {"message": "User not found"},
+                HttpStatus.NOT_FOUND.value,
+            )
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while retrieving metrics, err : {e}"
+            )
+            return (
+                {"message": f"Internal server error: {str(e)}"},
+                HttpStatus.INTERNAL_SERVER_ERROR.value,
+            )
+
+
+@metrics_namespace.route("/outbox/")
+class OutboxStats(Resource):
+    @metrics_namespace.doc(
+        description="Retrieve the lag and throughput of the transactional outbox, shared by all processes. Requires admin privileges."
+    )
+    @jwt_required()
+    @metrics_namespace.response(
+        HttpStatus.OK.value,
+        "Outbox stats retrieved successfully.",
+        metrics_schema_retriever.retrieve("outbox_stats"),
+    )
+    @metrics_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @metrics_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def get(self):
+        try:
+            current_user_profile = UserCRUDService.get_user(get_jwt_identity())
+
+            if not UserAuthService.check_if_admin(current_user_profile):
+                return (
+                    {"message": "Unauthorized. Only admins can access this endpoint."},
+                    HttpStatus.UNAUTHORIZED.value,
+                )
+
+            return OutboxService.get_stats(), HttpStatus.OK.value
+
+        except DoesNotExist:
+            return (
+                {"message": "User not found"},
+                HttpStatus.NOT_FOUND.value,
+            )
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while retrieving outbox stats, err : {e}"
+            )
+            return (
+                {"message": f"Internal server error: {str(e)}"},
+                HttpStatus.INTERNAL_SERVER_ERROR.value,
+            )
+
+
+@metrics_namespace.route("/user-archive/")
+class UserArchiveStats(Resource):
+    @metrics_namespace.doc(
+        description="Retrieve the size of the user tables and the size and listing latency before and after the latest archival runs. Requires admin privileges."
+    )
+    @jwt_required()
+    @metrics_namespace.response(
+        HttpStatus.OK.value,
+        "User archive stats retrieved successfully.",
+        metrics_schema_retriever.retrieve("user_archive_stats"),
+    )
+    @metrics_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @metrics_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def get(self):
+        try:
+            current_user_profile = UserCRUDService.get_user(get_jwt_identity())
+
+            if not UserAuthService.check_if_admin(current_user_profile):
+                return (
+                    {"message": "Unauthorized. Only admins can access this endpoint."},
+                    HttpStatus.UNAUTHORIZED.value,
+                )
+
+            return (
+                marshal(
+                    UserArchiveService.get_stats(),
+                    metrics_schema_retriever.retrieve("user_archive_stats"),
+                ),
+                HttpStatus.OK.value,
+            )
+
+        except DoesNotExist:
+            return (
+                {"message": "User not found"},
+                HttpStatus.NOT_FOUND.value,
+            )
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while retrieving user archive stats, err : {e}"
+            )
+            return (
+                {"message": f"Internal server error: {str(e)}"},
+                HttpStatus.INTERNAL_SERVER_ERROR.value,
+            )
+
+
+@metrics_namespace.route("/memory/")
+class MemoryDiagnostics(Resource):
+    @metrics_namespace.doc(
+        description="Report memory usage and tracemalloc allocation sites of the worker process serving the request, without taking a snapshot. Requires admin privileges."
+    )
+    @metrics_namespace.expect(metrics_schema_retriever.retrieve("memory_parser"))
+    @jwt_required()
+    @metrics_namespace.response(
+        HttpStatus.OK.value,
+        "Memory report retrieved successfully.",
+        metrics_schema_retriever.retrieve("memory_report"),
+    )
+    @metrics_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @metrics_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def get(self):
+        return self._handle(MemoryDiagnosticsService.get_report)
+
+    @metrics_namespace.doc(
+        description="Take a tracemalloc snapshot (starting tracing if needed) and report growth since the previous and the first snapshot. Requires admin privileges."
+    )
+    @metrics_namespace.expect(metrics_schema_retriever.retrieve("memory_parser"))
+    @jwt_required()
+    @metrics_namespace.response(
+        HttpStatus.OK.value,
+        "Snapshot taken successfully.",
+        metrics_schema_retriever.retrieve("memory_report"),
+    )
+    @metrics_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @metrics_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def post(self):
+        return self._handle(MemoryDiagnosticsService.take_snapshot)
+
+    @metrics_namespace.doc(
+        description="Stop tracing and drop the snapshots of the worker process serving the request. Requires admin privileges."
+    )
+    @jwt_required()
+    @metrics_namespace.response(HttpStatus.NO_CONTENT.value, "Tracing stopped.")
+    @metrics_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    def delete(self):
+        return self._handle(lambda limit, key_type: MemoryDiagnosticsService.reset())
+
+    @staticmethod
+    def _handle(action):
+        args = metrics_schema_retriever.retrieve("memory_parser").parse_args()
+        try:
+            current_user_profile = UserCRUDService.get_user(get_jwt_identity())
+
+            if not UserAuthService.check_if_admin(current_user_profile):
+                return (
+                    {"message": "Unauthorized. Only admins can access this endpoint."},
+                    HttpStatus.UNAUTHORIZED.value,
+                )
+
+            report = action(max(args["limit"], 1), args["key_type"])
+            if report is None:
+                return "", HttpStatus.NO_CONTENT.value
+            return report, HttpStatus.OK.value
+
+        except DoesNotExist:
+            return (
+                {"message": "User not found"},
+                HttpStatus.NOT_FOUND.value,
+            )
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while diagnosing memory, err : {e}"
+            )
+            return (
+                {"message": f"Internal server error: {str(e)}"},
+                HttpStatus.INTERNAL_SERVER_ERROR.value,
+            )
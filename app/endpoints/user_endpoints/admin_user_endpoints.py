@@ -1,6 +1,8 @@
-from flask import json, request
+import re
+
+from flask import Response, current_app, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from flask_restx import Resource, marshal_with
+from flask_restx import Resource, marshal, marshal_with
 
 from peewee import DoesNotExist
 
@@ -8,9 +10,20 @@ from werkzeug.exceptions import Unauthorized
 
 from app.enums.http_status import HttpStatus
 from app.logger_setup import LoggerSetup
+from app.services.audit_log_service import AuditLogService
+from app.services.change_feed_service import ChangeFeedService
+from app.services.user_services.token_revocation_service import (
+    TokenRevocationService,
+)
+from app.services.user_services.user_archive_service import UserArchiveService
 from app.services.user_services.user_auth_service import UserAuthService
+from app.services.user_services.user_autocomplete_service import UserAutocompleteService
 from app.services.user_services.user_crud_service import UserCRUDService
 from app.services.user_services.user_pagination_service import UserPaginationService
+from app.services.user_services.user_stats_service import UserStatsService
+from app.services.user_services.user_sync_service import UserSyncService
+from app.validation_schemas.typed_request_parser import TypedRequestParser
+from config.app_config import AppConfig
 
 from . import user_namespace, user_schema_retriever
 
@@ -47,6 +60,7 @@ class GetUserById(Resource):
                     {"message": "User not found"},
                     HttpStatus.NOT_FOUND.value,
                 )
+            AuditLogService.record("user.view", "user", user_id)
             return user_profile
 
         except DoesNotExist:
@@ -94,9 +108,19 @@ class ToggleUserStatus(Resource):
                     HttpStatus.UNAUTHORIZED.value,
                 )
 
-            user_profile = UserCRUDService.get_user(user_id)
+            try:
+                user_profile = UserCRUDService.get_user(user_id)
+            except DoesNotExist:
+                # Long inactive users are archived, reactivating one brings it back.
+                user_profile = UserArchiveService.restore(user_id)
 
             new_status, message = UserCRUDService.toggle_active_status(user_profile)
+            AuditLogService.record(
+                "user.toggle_status",
+                "user",
+                user_id,
+                diff={"is_active": [not new_status, new_status]},
+            )
 
             return {"message": message, "is_active": new_status}, HttpStatus.OK.value
 
@@ -120,6 +144,48 @@ class ToggleUserStatus(Resource):
             )
 
 
+@user_namespace.route("/<int:user_id>/revoke-tokens/")
+class RevokeUserTokens(Resource):
+    @user_namespace.doc(
+        description="Revoke every token issued to a user by user ID. Requires admin privileges."
+    )
+    @jwt_required()
+    @user_namespace.response(HttpStatus.OK.value, "Tokens revoked successfully.")
+    @user_namespace.response(HttpStatus.NOT_FOUND.value, "User not found")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def put(self, user_id):
+        try:
+            current_user_id = get_jwt_identity()
+            current_user_profile = UserCRUDService.get_user(current_user_id)
+
+            if not UserAuthService.check_if_admin(current_user_profile):
+                return (
+                    {"message": "Unauthorized."},
+                    HttpStatus.UNAUTHORIZED.value,
+                )
+
+            user_profile = UserCRUDService.get_user(user_id)
+            TokenRevocationService.revoke_all_for_user(user_profile.id)
+            AuditLogService.record("user.revoke_tokens", "user", user_id)
+
+            return {"message": "Tokens revoked successfully"}, HttpStatus.OK.value
+
+        except DoesNotExist:
+            return (
+                {"message": "User not found"},
+                HttpStatus.NOT_FOUND.value,
+            )
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while revoking tokens of the user with ID:{user_id}, err : {e}"
+            )
+            return (
+                {"message": f"Internal server error: {str(e)}"},
+                HttpStatus.INTERNAL_SERVER_ERROR.value,
+            )
+
+
 @user_namespace.route("/change-password/<int:user_id>")
 class AdminChangePassword(Resource):
     @user_namespace.doc(
@@ -145,6 +211,9 @@ class AdminChangePassword(Resource):
             user = UserCRUDService.get_user(user_id)
             data = request.json
             UserAuthService.change_password(user, data.get("new_password"))
+            AuditLogService.record(
+                "user.change_password", "user", user_id, diff={"password": "changed"}
+            )
 
             return {"message": "Password changed successfully"}, HttpStatus.OK.value
 
@@ -183,7 +252,11 @@ class GetUsers(Resource):
             if not UserAuthService.check_if_admin(current_user):
                 return {"message": "Unauthorized"}, HttpStatus.UNAUTHORIZED.value
 
-            filters = json.loads(args["filters"]) if args["filters"] else {}
+            filters = (
+                TypedRequestParser.loads_json(args["filters"])
+                if args["filters"]
+                else {}
+            )
 
             users, total_entries, total_pages = UserPaginationService.get_rows(
                 page=args["page"],
@@ -192,7 +265,9 @@ class GetUsers(Resource):
                 sort_order=args["sort_order"],
                 search=args["search"],
                 filters=filters,
+                include_archived=args["include_archived"],
             )
+            AuditLogService.record("user.list", diff=dict(args))
 
             return {
                 "users": users,
@@ -206,3 +281,295 @@ class GetUsers(Resource):
             return {"message": f"Field error: {str(e)}"}, HttpStatus.BAD_REQUEST.value
         except Exception as e:
             return {"message": str(e)}, HttpStatus.INTERNAL_SERVER_ERROR.value
+
+
+def _get_users_batch(user_ids):
+    current_user_id = get_jwt_identity()
+
+    try:
+        current_user = UserCRUDService.get_user(current_user_id)
+        if not UserAuthService.check_if_admin(current_user):
+            return {"message": "Unauthorized"}, HttpStatus.UNAUTHORIZED.value
+
+        if len(user_ids) > AppConfig.USER_BATCH_MAX_SIZE:
+            return {
+                "message": f"At most {AppConfig.USER_BATCH_MAX_SIZE} users can be requested at once."
+            }, HttpStatus.BAD_REQUEST.value
+
+        users, missing_ids = UserCRUDService.get_users_by_ids(user_ids)
+        AuditLogService.record("user.batch_get", diff={"ids": user_ids})
+
+        return {"users": users, "missing_ids": missing_ids}, HttpStatus.OK.value
+
+    except DoesNotExist:
+        return {"message": "User not found"}, HttpStatus.NOT_FOUND.value
+    except Exception as e:
+        LoggerSetup.get_logger("general").error(
+            f"Internal server error while getting users batch, err : {e}"
+        )
+        return {
+            "message": f"Internal server error: {str(e)}"
+        }, HttpStatus.INTERNAL_SERVER_ERROR.value
+
+
+@user_namespace.route("/batch/")
+class GetUsersBatch(Resource):
+    @user_namespace.doc(
+        description="Retrieve many users by a comma separated list of IDs with a single query. Requires admin privileges."
+    )
+    @user_namespace.expect(user_schema_retriever.retrieve("batch_parser"))
+    @jwt_required()
+    @user_namespace.response(
+        HttpStatus.OK.value,
+        "Users retrieved successfully.",
+        user_schema_retriever.retrieve("users_batch_response"),
+    )
+    @user_namespace.response(HttpStatus.BAD_REQUEST.value, "Bad request")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def get(self):
+        args = user_schema_retriever.retrieve("batch_parser").parse_args()
+
+        try:
+            user_ids = [int(user_id) for user_id in args["ids"].split(",") if user_id]
+        except ValueError:
+            return {"message": "Invalid user ID list."}, HttpStatus.BAD_REQUEST.value
+
+        response, status = _get_users_batch(user_ids)
+        return self._marshal(response, status)
+
+    @user_namespace.doc(
+        description="Retrieve many users by a list of IDs in the request body with a single query. Requires admin privileges."
+    )
+    @user_namespace.expect(
+        user_schema_retriever.retrieve("users_batch_request"), validate=True
+    )
+    @jwt_required()
+    @user_namespace.response(
+        HttpStatus.OK.value,
+        "Users retrieved successfully.",
+        user_schema_retriever.retrieve("users_batch_response"),
+    )
+    @user_namespace.response(HttpStatus.BAD_REQUEST.value, "Bad request")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error")
+    def post(self):
+        response, status = _get_users_batch(request.json.get("ids"))
+        return self._marshal(response, status)
+
+    @staticmethod
+    def _marshal(response, status):
+        if status != HttpStatus.OK.value:
+            return response, status
+        return (
+            marshal(response, user_schema_retriever.retrieve("users_batch_response")),
+            status,
+        )
+
+
+@user_namespace.route("/sync/")
+class SyncUsers(Resource):
+    @user_namespace.doc(
+        description="Returns users changed, deleted or deactivated since the given sync token, in keyset order. Requires admin privileges."
+    )
+    @user_namespace.expect(user_schema_retriever.retrieve("sync_parser"))
+    @user_namespace.response(
+        HttpStatus.OK.value,
+        "Changes fetched successfully.",
+        model=user_schema_retriever.retrieve("users_sync_response"),
+    )
+    @user_namespace.response(HttpStatus.BAD_REQUEST.value, "Bad request")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized.")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error.")
+    @jwt_required()
+    def get(self):
+        args = user_schema_retriever.retrieve("sync_parser").parse_args()
+        current_user_id = get_jwt_identity()
+
+        try:
+            current_user = UserCRUDService.get_user(current_user_id)
+            if not UserAuthService.check_if_admin(current_user):
+                return {"message": "Unauthorized"}, HttpStatus.UNAUTHORIZED.value
+
+            limit = min(max(args["limit"], 1), AppConfig.USER_SYNC_MAX_LIMIT)
+            changes = UserSyncService.get_changes(args["since"], limit)
+            AuditLogService.record("user.sync", diff={"since": args["since"]})
+
+            return (
+                marshal(changes, user_schema_retriever.retrieve("users_sync_response")),
+                HttpStatus.OK.value,
+            )
+
+        except ValueError as e:
+            return {"message": str(e)}, HttpStatus.BAD_REQUEST.value
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while syncing users, err : {e}"
+            )
+            return {"message": str(e)}, HttpStatus.INTERNAL_SERVER_ERROR.value
+
+
+@user_namespace.route("/autocomplete/")
+class UserAutocomplete(Resource):
+    @user_namespace.doc(
+        description="Returns users whose name, surname or email starts with the query, for typeahead pickers. Served from prefix indexes, without a count. Requires admin privileges."
+    )
+    @user_namespace.expect(user_schema_retriever.retrieve("autocomplete_parser"))
+    @user_namespace.response(
+        HttpStatus.OK.value,
+        "Users fetched successfully.",
+        model=user_schema_retriever.retrieve("user_autocomplete_response"),
+    )
+    @user_namespace.response(HttpStatus.BAD_REQUEST.value, "Bad request")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized.")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error.")
+    @jwt_required()
+    def get(self):
+        args = user_schema_retriever.retrieve("autocomplete_parser").parse_args()
+        current_user_id = get_jwt_identity()
+
+        try:
+            current_user = UserCRUDService.get_user(current_user_id)
+            if not UserAuthService.check_if_admin(current_user):
+                return {"message": "Unauthorized"}, HttpStatus.UNAUTHORIZED.value
+
+            limit = min(max(args["limit"], 1), AppConfig.USER_AUTOCOMPLETE_MAX_LIMIT)
+            users = UserAutocompleteService.lookup(args["q"], limit)
+
+            return (
+                marshal(
+                    {"users": users},
+                    user_schema_retriever.retrieve("user_autocomplete_response"),
+                ),
+                HttpStatus.OK.value,
+            )
+
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while looking up users, err : {e}"
+            )
+            return {"message": str(e)}, HttpStatus.INTERNAL_SERVER_ERROR.value
+
+
+@user_namespace.route("/stats/")
+class UserStats(Resource):
+    @user_namespace.doc(
+        description="Returns user totals and registrations per day from precomputed aggregates, refreshed every USER_STATS_REFRESH_SECONDS. Requires admin privileges."
+    )
+    @user_namespace.expect(user_schema_retriever.retrieve("stats_parser"))
+    @user_namespace.response(
+        HttpStatus.OK.value,
+        "Statistics fetched successfully.",
+        model=user_schema_retriever.retrieve("user_stats_response"),
+    )
+    @user_namespace.response(HttpStatus.BAD_REQUEST.value, "Bad request")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized.")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error.")
+    @jwt_required()
+    def get(self):
+        args = user_schema_retriever.retrieve("stats_parser").parse_args()
+        current_user_id = get_jwt_identity()
+
+        try:
+            current_user = UserCRUDService.get_user(current_user_id)
+            if not UserAuthService.check_if_admin(current_user):
+                return {"message": "Unauthorized"}, HttpStatus.UNAUTHORIZED.value
+
+            if not 1 <= args["days"] <= AppConfig.USER_STATS_MAX_DAYS:
+                return {
+                    "message": f"days must be between 1 and {AppConfig.USER_STATS_MAX_DAYS}."
+                }, HttpStatus.BAD_REQUEST.value
+
+            return (
+                marshal(
+                    UserStatsService.get_stats(args["days"]),
+                    user_schema_retriever.retrieve("user_stats_response"),
+                ),
+                HttpStatus.OK.value,
+            )
+
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while getting user stats, err : {e}"
+            )
+            return {"message": str(e)}, HttpStatus.INTERNAL_SERVER_ERROR.value
+
+
+@user_namespace.route("/audit/")
+class AuditLogEntries(Resource):
+    @user_namespace.doc(
+        description="Returns audit log entries of admin actions, newest first, in keyset order. Pass next_cursor as 'before' to page. Entries are written in batches, so the newest actions can take up to AUDIT_LOG_FLUSH_SECONDS to appear. Requires admin privileges."
+    )
+    @user_namespace.expect(user_schema_retriever.retrieve("audit_parser"))
+    @user_namespace.response(
+        HttpStatus.OK.value,
+        "Audit log fetched successfully.",
+        model=user_schema_retriever.retrieve("audit_log_response"),
+    )
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized.")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error.")
+    @jwt_required()
+    def get(self):
+        args = user_schema_retriever.retrieve("audit_parser").parse_args()
+        current_user_id = get_jwt_identity()
+
+        try:
+            current_user = UserCRUDService.get_user(current_user_id)
+            if not UserAuthService.check_if_admin(current_user):
+                return {"message": "Unauthorized"}, HttpStatus.UNAUTHORIZED.value
+
+            entries = AuditLogService.get_entries(
+                limit=min(max(args["limit"], 1), AppConfig.AUDIT_LOG_MAX_LIMIT),
+                before=args["before"],
+                actor_id=args["actor_id"],
+                action=args["action"],
+                target_type=args["target_type"],
+                target_id=args["target_id"],
+            )
+
+            return (
+                marshal(entries, user_schema_retriever.retrieve("audit_log_response")),
+                HttpStatus.OK.value,
+            )
+
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while reading the audit log, err : {e}"
+            )
+            return {"message": str(e)}, HttpStatus.INTERNAL_SERVER_ERROR.value
+
+
+@user_namespace.route("/changes/stream/")
+class UserChangeStream(Resource):
+    @user_namespace.doc(
+        description="Server-sent event stream of user changes. Send the Last-Event-ID header to resume after a disconnect. Requires admin privileges."
+    )
+    @jwt_required()
+    @user_namespace.response(HttpStatus.OK.value, "Event stream opened.")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized.")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server error.")
+    def get(self):
+        current_user_id = get_jwt_identity()
+
+        try:
+            current_user = UserCRUDService.get_user(current_user_id)
+            if not UserAuthService.check_if_admin(current_user):
+                return {"message": "Unauthorized"}, HttpStatus.UNAUTHORIZED.value
+
+            last_event_id = request.headers.get("Last-Event-ID")
+            if last_event_id and not re.fullmatch(r"\d+(-\d+)?", last_event_id):
+                last_event_id = None
+
+            return Response(
+                ChangeFeedService.stream(current_app.redis, last_event_id),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        except DoesNotExist:
+            return {"message": "User not found"}, HttpStatus.NOT_FOUND.value
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while opening the user change stream, err : {e}"
+            )
+            return {"message": str(e)}, HttpStatus.INTERNAL_SERVER_ERROR.value
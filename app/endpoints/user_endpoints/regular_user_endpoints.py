@@ -6,9 +6,12 @@ from peewee import DoesNotExist
 
 from app.enums.http_status import HttpStatus
 from app.logger_setup import LoggerSetup
+from app.services.batch_request_service import BatchRequestService
 from app.services.user_services.user_auth_service import UserAuthService
 from app.services.user_services.user_crud_service import UserCRUDService
 
+from config.app_config import AppConfig
+
 from . import user_namespace, user_schema_retriever
 
 
@@ -53,6 +56,18 @@ class Logout(Resource):
         return UserAuthService.logout()
 
 
+@user_namespace.route("/logout-all/")
+class LogoutAll(Resource):
+    @jwt_required()
+    @user_namespace.doc(
+        description="Log out the current user from all devices by revoking every issued token. Requires a valid JWT token."
+    )
+    @user_namespace.response(HttpStatus.OK.value, "Successfully logged out")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    def post(self):
+        return UserAuthService.logout_all()
+
+
 @user_namespace.route("/get_myself/")
 class GetMyself(Resource):
     @user_namespace.doc(
@@ -188,3 +203,46 @@ class ChangePassword(Resource):
             return {
                 "message": f"Internal server error: {str(e)}"
             }, HttpStatus.INTERNAL_SERVER_ERROR.value
+
+
+@user_namespace.route("/batch-requests/")
+class BatchRequests(Resource):
+    @user_namespace.doc(
+        description="Dispatch several user endpoint requests in one call. Sub-requests share the caller's identity and return their own status and body. Requires a valid JWT token."
+    )
+    @jwt_required()
+    @user_namespace.expect(
+        user_schema_retriever.retrieve("batch_request"), validate=True
+    )
+    @user_namespace.response(
+        HttpStatus.OK.value,
+        "Batch dispatched",
+        user_schema_retriever.retrieve("batch_response"),
+    )
+    @user_namespace.response(HttpStatus.BAD_REQUEST.value, "Bad request")
+    @user_namespace.response(HttpStatus.UNAUTHORIZED.value, "Unauthorized")
+    @user_namespace.response(HttpStatus.INTERNAL_SERVER_ERROR.value, "Server Error")
+    def post(self):
+        sub_requests = request.json.get("requests")
+
+        if len(sub_requests) > AppConfig.BATCH_REQUEST_MAX_SIZE:
+            return {
+                "message": f"At most {AppConfig.BATCH_REQUEST_MAX_SIZE} requests can be sent in a batch."
+            }, HttpStatus.BAD_REQUEST.value
+
+        try:
+            responses = BatchRequestService.dispatch(
+                sub_requests,
+                allowed_prefix="/user/",
+                batch_path=request.path,
+            )
+            return {"responses": responses}, HttpStatus.OK.value
+
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Internal server error while dispatching a batch request, err : {e}"
+            )
+            return (
+                {"message": f"Internal server error: {str(e)}"},
+                HttpStatus.INTERNAL_SERVER_ERROR.value,
+            )
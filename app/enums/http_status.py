@@ -19,3 +19,5 @@ class HttpStatus(Enum):
     NOT_ACCEPTABLE = 406
     REQUEST_TIMEOUT = 408
     UNSUPPORTED_MEDIA_TYPE = 415
+    SERVICE_UNAVAILABLE = 503
+    GATEWAY_TIMEOUT = 504
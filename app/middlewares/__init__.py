@@ -0,0 +1,21 @@
+from app.middlewares.admission_control_middleware import AdmissionControlMiddleware
+from app.middlewares.compression_middleware import CompressionMiddleware
+from app.middlewares.profiling_middleware import ProfilingMiddleware
+from app.middlewares.request_metrics_middleware import RequestMetricsMiddleware
+from app.middlewares.statement_timeout_middleware import StatementTimeoutMiddleware
+from app.middlewares.tracing_middleware import TracingMiddleware
+from app.middlewares.unit_of_work_middleware import UnitOfWorkMiddleware
+
+
+def register_middlewares(app):
+    # Registered first, so their hooks wrap the hooks of the other middlewares.
+    TracingMiddleware.init_app(app)
+    ProfilingMiddleware.init_app(app)
+    RequestMetricsMiddleware.init_app(app)
+    # Before the unit of work, so rejected requests never open a transaction.
+    AdmissionControlMiddleware.init_app(app)
+    UnitOfWorkMiddleware.init_app(app)
+    # After the unit of work, so its transaction gets the request's statement timeout
+    # and it rolls back the responses turned into 504.
+    StatementTimeoutMiddleware.init_app(app)
+    CompressionMiddleware.init_app(app)
@@ -0,0 +1,202 @@
+import json
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import Flask, Response, g, request
+
+from app.enums.http_status import HttpStatus
+from app.services.circuit_breaker_service import CircuitBreaker
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class RouteClass:
+    """
+    Concurrency limit and CoDel queue of one class of routes in one process.
+
+    A request takes a slot right away if one is free. Otherwise it waits up to
+    ADMISSION_QUEUE_TIMEOUT_MS, or only up to ADMISSION_TARGET_DELAY_MS once the
+    queue has not been empty for longer than ADMISSION_QUEUE_TIMEOUT_MS. A
+    short burst is absorbed by the queue, a standing queue is cut down to the
+    target delay, so requests fail fast instead of piling up.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._last_empty = time.monotonic()
+
+    def acquire(self) -> bool:
+        """
+        Takes a slot, waiting for it as long as the queue allows.
+
+        Returns:
+            bool: Whether a slot was taken. A taken slot must be released.
+        """
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self._in_flight += 1
+                if not self._waiting:
+                    self._last_empty = time.monotonic()
+            return True
+
+        start = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+            overloaded = start - self._last_empty > AppConfig.ADMISSION_QUEUE_TIMEOUT_MS / 1000
+        timeout = (
+            AppConfig.ADMISSION_TARGET_DELAY_MS
+            if overloaded
+            else AppConfig.ADMISSION_QUEUE_TIMEOUT_MS
+        ) / 1000
+        acquired = self._slots.acquire(timeout=timeout)
+
+        with self._lock:
+            self._waiting -= 1
+            if not self._waiting:
+                self._last_empty = time.monotonic()
+            if acquired:
+                self._in_flight += 1
+        MetricsService.observe(
+            f"admission.{self.name}.queue_delay_seconds", time.monotonic() - start
+        )
+        return acquired
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "in_flight": self._in_flight, "waiting": self._waiting}
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds load before it reaches the database.
+
+    With ADMISSION_CONTROL_ENABLED set, every request of a limited route class
+    needs one of the class's slots (see ``RouteClass``) and is rejected with
+    503 and ``Retry-After`` when it cannot get one in time. Classes have their
+    own limits, so slow bulk reads cannot take the threads that cheap JWT
+    checks need. While the Postgres circuit breaker is open, requests of the
+    classes that need the database are rejected right away. Health checks,
+    the API docs and the change stream are not limited.
+    """
+
+    # Routes that only verify the JWT and touch Redis.
+    LIGHT_ENDPOINTS = {"Users_check_auth", "Users_logout", "Users_logout_all"}
+    BULK_ENDPOINTS = {
+        "Users_get_users",
+        "Users_get_users_batch",
+        "Users_batch_requests",
+        "Users_sync_users",
+        "Users_user_stats",
+        "Users_audit_log_entries",
+    }
+    UNLIMITED_ENDPOINTS = {
+        "Health_liveness",
+        "Health_readiness",
+        "Users_user_change_stream",
+        "doc",
+        "root",
+        "specs",
+        "static",
+        "restx_doc.static",
+    }
+
+    _route_classes: Dict[str, RouteClass] = {}
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registers the admission hooks on the app if admission control is enabled.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        if not AppConfig.ADMISSION_CONTROL_ENABLED:
+            return
+        cls._route_classes = {
+            "light": RouteClass("light", AppConfig.ADMISSION_LIGHT_MAX_CONCURRENCY),
+            "default": RouteClass("default", AppConfig.ADMISSION_DEFAULT_MAX_CONCURRENCY),
+            "bulk": RouteClass("bulk", AppConfig.ADMISSION_BULK_MAX_CONCURRENCY),
+        }
+        app.before_request(cls.admit)
+        app.teardown_request(cls.release)
+
+    @classmethod
+    def admit(cls) -> Optional[Response]:
+        route_class = cls._classify(request.endpoint)
+        if route_class is None:
+            return None
+
+        if route_class.name != "light":
+            database = CircuitBreaker.get("postgres")
+            if database.is_open():
+                MetricsService.increment(f"admission.{route_class.name}.rejected_unavailable")
+                return cls._reject(
+                    "The database is unavailable, please retry later.", database.retry_after()
+                )
+
+        if not route_class.acquire():
+            MetricsService.increment(f"admission.{route_class.name}.rejected")
+            return cls._reject(
+                "The service is overloaded, please retry later.",
+                AppConfig.ADMISSION_RETRY_AFTER_SECONDS,
+            )
+
+        MetricsService.increment(f"admission.{route_class.name}.admitted")
+        g.admission_slot = route_class
+        g.admission_environ = request.environ
+        return None
+
+    @staticmethod
+    def release(exception: Optional[BaseException]) -> None:
+        # Sub-requests dispatched in-process share ``g`` with their parent and
+        # tear down before it, they must not free the parent's slot.
+        if g.get("admission_environ") is not request.environ:
+            return
+        g.pop("admission_environ")
+        g.pop("admission_slot").release()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the limit, in-flight and waiting requests of every route class in this process.
+        """
+        return {name: route_class.stats() for name, route_class in cls._route_classes.items()}
+
+    @classmethod
+    def route_class_name(cls, endpoint: Optional[str]) -> Optional[str]:
+        """
+        Returns the route class of an endpoint: 'light', 'default' or 'bulk',
+        None for unlimited endpoints.
+        """
+        if endpoint is None or endpoint in cls.UNLIMITED_ENDPOINTS:
+            return None
+        if endpoint in cls.LIGHT_ENDPOINTS:
+            return "light"
+        if endpoint in cls.BULK_ENDPOINTS:
+            return "bulk"
+        return "default"
+
+    @classmethod
+    def _classify(cls, endpoint: Optional[str]) -> Optional[RouteClass]:
+        name = cls.route_class_name(endpoint)
+        return None if name is None else cls._route_classes[name]
+
+    @staticmethod
+    def _reject(message: str, retry_after: float) -> Response:
+        return Response(
+            json.dumps({"message": message}),
+            status=HttpStatus.SERVICE_UNAVAILABLE.value,
+            mimetype="application/json",
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+        )
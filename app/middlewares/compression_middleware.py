@@ -0,0 +1,178 @@
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+
+from config.app_config import AppConfig
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class StreamCompressor:
+    """
+    Incremental compressor for a single response body.
+
+    ``compress`` returns the compressed bytes of a chunk flushed to a block
+    boundary, so streamed chunks reach the client without waiting for the end
+    of the body. ``finish`` returns the trailing bytes of the stream.
+    """
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(
+                AppConfig.COMPRESSION_GZIP_LEVEL if level is None else level,
+                zlib.DEFLATED,
+                16 + zlib.MAX_WBITS,
+            )
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(
+                quality=AppConfig.COMPRESSION_BROTLI_QUALITY if level is None else level
+            )
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(
+                level=AppConfig.COMPRESSION_ZSTD_LEVEL if level is None else level
+            ).compressobj()
+        else:
+            raise ValueError(f"Unsupported content encoding '{encoding}'.")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._feed(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._feed(data) + self._compressor.flush()
+        return self._feed(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+    def _feed(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    @classmethod
+    def compress_body(
+        cls, encoding: str, data: bytes, level: Optional[int] = None
+    ) -> bytes:
+        """
+        Compresses a complete body in one call.
+
+        Args:
+            encoding (str): The content encoding to use ('gzip', 'br' or 'zstd').
+            data (bytes): The body to compress.
+            level (Optional[int]): The compression level, defaults to the configured one.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        compressor = cls(encoding, level)
+        return compressor._feed(data) + compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses according to the request's Accept-Encoding header.
+
+    gzip is always available, brotli and zstd are used when their packages are
+    installed. Bodies smaller than COMPRESSION_MIN_SIZE are sent as is, streamed
+    responses are compressed chunk by chunk.
+    """
+
+    COMPRESSIBLE_MIMETYPES = {
+        "application/json",
+        "application/javascript",
+        "application/xml",
+        "text/css",
+        "text/csv",
+        "text/event-stream",
+        "text/html",
+        "text/javascript",
+        "text/plain",
+        "text/xml",
+    }
+
+    @classmethod
+    def available_encodings(cls):
+        """
+        Returns the supported content encodings in order of server preference.
+        """
+        encodings = []
+        if zstandard is not None:
+            encodings.append("zstd")
+        if brotli is not None:
+            encodings.append("br")
+        encodings.append("gzip")
+        return encodings
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registers the compression hook on the app if compression is enabled.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        if not AppConfig.COMPRESSION_ENABLED:
+            return
+        app.after_request(cls.compress_response)
+
+    @classmethod
+    def compress_response(cls, response: Response) -> Response:
+        """
+        Compresses the response body with the best encoding accepted by the client.
+
+        Args:
+            response (Response): The response produced by the view.
+
+        Returns:
+            Response: The (possibly) compressed response.
+        """
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in cls.COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(cls.available_encodings())
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = cls._compress_stream(
+                encoding, response.iter_encoded()
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < AppConfig.COMPRESSION_MIN_SIZE:
+                return response
+            response.set_data(StreamCompressor.compress_body(encoding, data))
+
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def _compress_stream(encoding: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = StreamCompressor(encoding)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.finish()
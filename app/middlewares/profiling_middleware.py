@@ -0,0 +1,143 @@
+import cProfile
+import os
+import random
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from flask import Flask, Response, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    SamplingProfiler = None
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand.
+
+    With PROFILING_ENABLED set, a request is profiled when an admin sends the
+    PROFILING_HEADER header or when it is picked by PROFILING_SAMPLE_RATE. The
+    profile is written to ``<TEMP_STORAGE_PATH>/profiles`` with the route and
+    duration in its name: a speedscope JSON file from pyinstrument's sampling
+    profiler when it is installed, a cProfile pstats file otherwise. Requests
+    that are not profiled only pay for the trigger check.
+    """
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registers the profiling hooks on the app if profiling is enabled.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        if not AppConfig.PROFILING_ENABLED:
+            return
+        app.before_request(cls.start_profiler)
+        app.after_request(cls.stop_profiler)
+        app.teardown_request(cls.discard_profiler)
+
+    @classmethod
+    def start_profiler(cls) -> None:
+        if not cls._is_triggered():
+            return
+
+        if SamplingProfiler is not None:
+            profiler = SamplingProfiler(interval=AppConfig.PROFILING_SAMPLE_INTERVAL)
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g.profiler = profiler
+        g.profiler_started_at = time.perf_counter()
+        g.profiler_environ = request.environ
+
+    @classmethod
+    def stop_profiler(cls, response: Response) -> Response:
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+
+        duration_ms = (time.perf_counter() - g.pop("profiler_started_at")) * 1000
+        cls._stop(profiler)
+
+        try:
+            path = cls._write_profile(profiler, duration_ms)
+            response.headers["X-Profile-File"] = os.path.basename(path)
+            MetricsService.increment("profiling.profiles_written")
+        except OSError as e:
+            LoggerSetup.get_logger("general").error(
+                f"Failed to write the profile of {request.path}, err : {e}"
+            )
+        return response
+
+    @classmethod
+    def discard_profiler(cls, exception: Optional[BaseException]) -> None:
+        # Stops a profiler that stop_profiler never saw, because the request
+        # failed before the after request hooks. Otherwise it would keep
+        # profiling every later request of the thread. Sub-requests dispatched
+        # in-process share ``g`` with their parent and must leave it running.
+        if g.get("profiler_environ") is not request.environ:
+            return
+        g.pop("profiler_environ")
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            g.pop("profiler_started_at", None)
+            cls._stop(profiler)
+            MetricsService.increment("profiling.profiles_discarded")
+
+    @staticmethod
+    def _stop(profiler) -> None:
+        if SamplingProfiler is not None:
+            profiler.stop()
+        else:
+            profiler.disable()
+
+    @staticmethod
+    def _is_triggered() -> bool:
+        if AppConfig.PROFILING_SAMPLE_RATE and random.random() < AppConfig.PROFILING_SAMPLE_RATE:
+            return True
+        if AppConfig.PROFILING_HEADER not in request.headers:
+            return False
+
+        # Imported here, the user services depend on the models and the app
+        # factory imports the middlewares first.
+        from app.services.user_services.user_auth_service import UserAuthService
+        from app.services.user_services.user_crud_service import UserCRUDService
+
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+            return user_id is not None and UserAuthService.check_if_admin(
+                UserCRUDService.get_user(user_id)
+            )
+        except Exception:
+            return False
+
+    @staticmethod
+    def _write_profile(profiler, duration_ms: float) -> str:
+        directory = os.path.join(AppConfig.TEMP_STORAGE_PATH, "profiles")
+        os.makedirs(directory, exist_ok=True)
+
+        route = request.url_rule.rule if request.url_rule else request.path
+        route = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        name = f"{timestamp}_{request.method}_{route}_{duration_ms:.0f}ms"
+
+        if SamplingProfiler is not None:
+            path = os.path.join(directory, f"{name}.speedscope.json")
+            with open(path, "w") as file:
+                file.write(profiler.output(renderer=SpeedscopeRenderer()))
+        else:
+            path = os.path.join(directory, f"{name}.prof")
+            profiler.dump_stats(path)
+        return path
@@ -0,0 +1,44 @@
+import time
+
+from flask import Flask, Response, g, request
+
+from app.services.metrics_service import MetricsService
+
+
+class RequestMetricsMiddleware:
+    """
+    Records request counts, status codes and durations per endpoint.
+
+    Hooks run once per HTTP request, so requests dispatched in-process (e.g.
+    sub-requests of a batch) are measured as part of their parent request.
+    """
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registers the request timing hooks on the app.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        app.before_request(cls.start_timer)
+        app.after_request(cls.record_request)
+
+    @staticmethod
+    def start_timer() -> None:
+        g.request_started_at = time.perf_counter()
+
+    @staticmethod
+    def record_request(response: Response) -> Response:
+        started_at = g.pop("request_started_at", None)
+        if started_at is None:
+            return response
+
+        endpoint = request.endpoint or "unmatched"
+        MetricsService.increment("http.requests")
+        MetricsService.increment(f"http.responses.{response.status_code}")
+        MetricsService.observe(
+            f"http.request_duration_seconds.{endpoint}",
+            time.perf_counter() - started_at,
+        )
+        return response
@@ -0,0 +1,78 @@
+import json
+from typing import Optional
+
+from flask import Flask, Response, g, request
+
+from app.db_init import db
+from app.enums.http_status import HttpStatus
+from app.middlewares.admission_control_middleware import AdmissionControlMiddleware
+from app.services.statement_timeout_service import StatementTimeoutService
+from config.app_config import AppConfig
+
+
+class StatementTimeoutMiddleware:
+    """
+    Gives every request a deadline for its SQL.
+
+    With STATEMENT_TIMEOUT_ENABLED set, requests of the bulk route class get
+    REQUEST_DEADLINE_BULK_MS and the others REQUEST_DEADLINE_MS. Statements
+    still running at the deadline, or when the client has gone away, are
+    cancelled (see ``StatementTimeoutService``). In the transaction of a unit
+    of work the deadline is also applied with ``SET LOCAL statement_timeout``.
+    A request whose statement was cancelled and that failed gets a clean 504,
+    or 503 when its client disconnected. Health checks and the change stream
+    have no deadline.
+    """
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registers the deadline hooks on the app if statement timeouts are enabled.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        if not AppConfig.STATEMENT_TIMEOUT_ENABLED:
+            return
+        app.before_request(cls.start)
+        app.after_request(cls.respond)
+        app.teardown_request(cls.end)
+
+    @classmethod
+    def start(cls) -> None:
+        route_class = AdmissionControlMiddleware.route_class_name(request.endpoint)
+        if route_class is None:
+            return
+        timeout_ms = (
+            AppConfig.REQUEST_DEADLINE_BULK_MS
+            if route_class == "bulk"
+            else AppConfig.REQUEST_DEADLINE_MS
+        )
+        StatementTimeoutService.start_request(timeout_ms, request.environ)
+        g.statement_deadline_environ = request.environ
+        if db.in_transaction():
+            db.execute_sql("SELECT set_config('statement_timeout', %s, true)", (f"{timeout_ms}ms",))
+
+    @staticmethod
+    def respond(response: Response) -> Response:
+        reason = g.pop("statement_cancelled", None)
+        if reason is None or response.status_code < 400:
+            return response
+        if reason == "client_disconnected":
+            # Nobody reads it, the status is for the logs and metrics.
+            status, message = HttpStatus.SERVICE_UNAVAILABLE, "The request was cancelled."
+        else:
+            status, message = HttpStatus.GATEWAY_TIMEOUT, "The request took too long, please retry later."
+        return Response(
+            json.dumps({"message": message}),
+            status=status.value,
+            mimetype="application/json",
+        )
+
+    @staticmethod
+    def end(exception: Optional[BaseException]) -> None:
+        # Sub-requests dispatched in-process share ``g`` and the deadline of their parent.
+        if g.get("statement_deadline_environ") is not request.environ:
+            return
+        g.pop("statement_deadline_environ")
+        StatementTimeoutService.end_request()
@@ -0,0 +1,90 @@
+from typing import Optional
+
+import flask_jwt_extended.view_decorators as jwt_view_decorators
+from flask import Flask, Response, g, request
+from flask_restx import Api
+
+from app.services.tracing_service import TracingService
+from config.app_config import AppConfig
+
+
+class TracingMiddleware:
+    """
+    Traces HTTP requests.
+
+    With TRACING_ENABLED set, every request is a candidate root span, sampled
+    by TRACING_SAMPLE_RATE. A sampled request gets child spans for JWT
+    verification and response serialization, in addition to the SQL, Redis and
+    password hashing spans recorded by the services, and returns its trace ID
+    in the ``X-Trace-Id`` header. An incoming ``traceparent`` header is only
+    continued with TRACING_TRUST_TRACEPARENT, so clients cannot force tracing.
+    """
+
+    TRACE_ID_HEADER = "X-Trace-Id"
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registers the tracing hooks on the app if tracing is enabled.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        if not AppConfig.TRACING_ENABLED:
+            return
+        app.before_request(cls.start_trace)
+        app.after_request(cls.record_response)
+        app.teardown_request(cls.end_trace)
+
+        # jwt_required looks the function up on every call, so wrapping the
+        # module attribute covers all decorated views.
+        verify = jwt_view_decorators.verify_jwt_in_request
+        if not getattr(verify, "__traced__", False):
+            jwt_view_decorators.verify_jwt_in_request = TracingService.traced("jwt.verify")(
+                verify
+            )
+
+    @staticmethod
+    def init_api(api: Api) -> None:
+        """
+        Wraps the JSON representation of the API in a serialization span.
+
+        Args:
+            api (Api): The restx API.
+        """
+        if not AppConfig.TRACING_ENABLED:
+            return
+        output = api.representations["application/json"]
+        if not getattr(output, "__traced__", False):
+            api.representations["application/json"] = TracingService.traced(
+                "http.serialize"
+            )(output)
+
+    @staticmethod
+    def start_trace() -> None:
+        route = request.url_rule.rule if request.url_rule else request.path
+        g.trace = TracingService.start_trace(
+            f"{request.method} {route}",
+            request.headers.get("traceparent") if AppConfig.TRACING_TRUST_TRACEPARENT else None,
+            attributes={"http.method": request.method, "http.route": route},
+        )
+        g.trace_environ = request.environ
+
+    @classmethod
+    def record_response(cls, response: Response) -> Response:
+        handle = g.get("trace")
+        if handle is not None:
+            span = handle[0]
+            span.set_attribute("http.status_code", response.status_code)
+            span.error = response.status_code >= 500
+            response.headers[cls.TRACE_ID_HEADER] = span.trace_id
+        return response
+
+    @staticmethod
+    def end_trace(exception: Optional[BaseException]) -> None:
+        # Sub-requests dispatched in-process share ``g`` with their parent and
+        # tear down before it, they must not end the parent's trace.
+        if g.get("trace_environ") is not request.environ:
+            return
+        g.pop("trace_environ")
+        TracingService.end(g.pop("trace", None), exception)
@@ -0,0 +1,103 @@
+from typing import Any, Callable, Optional
+
+from flask import Flask, Response, g, has_request_context, request
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from config.app_config import AppConfig
+
+
+class UnitOfWorkMiddleware:
+    """
+    Runs every write request in a single database transaction.
+
+    When UNIT_OF_WORK_ENABLED is set, POST, PUT, PATCH and DELETE requests open
+    an ``atomic()`` block before the view runs. It is committed when the
+    response status is below 400 and rolled back otherwise, so all writes of a
+    request share one commit. Side effects registered with ``after_commit``
+    (model cache invalidation, change feed events) run once the transaction
+    is committed and are dropped on rollback.
+    """
+
+    WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    @classmethod
+    def init_app(cls, app: Flask) -> None:
+        """
+        Registers the transaction hooks on the app. They are no-ops while
+        UNIT_OF_WORK_ENABLED is off.
+
+        Args:
+            app (Flask): The Flask application.
+        """
+        app.before_request(cls.begin)
+        app.after_request(cls.finish)
+        app.teardown_request(cls.abort)
+
+    @classmethod
+    def begin(cls) -> None:
+        if not AppConfig.UNIT_OF_WORK_ENABLED or request.method not in cls.WRITE_METHODS:
+            return
+        transaction = db.transaction()
+        transaction.__enter__()
+        g.unit_of_work = transaction
+        g.unit_of_work_environ = request.environ
+        g.after_commit = []
+
+    @classmethod
+    def finish(cls, response: Response) -> Response:
+        transaction = g.pop("unit_of_work", None)
+        callbacks = g.pop("after_commit", [])
+        g.pop("unit_of_work_environ", None)
+        if transaction is None:
+            return response
+
+        if response.status_code >= 400:
+            transaction.rollback()
+            transaction.__exit__(None, None, None)
+            return response
+
+        try:
+            transaction.__exit__(None, None, None)
+        except Exception as e:
+            LoggerSetup.get_logger("general").error(
+                f"Failed to commit the unit of work of {request.path}, err : {e}"
+            )
+            return Response(
+                '{"message": "Internal server error: the changes could not be saved."}',
+                status=500,
+                mimetype="application/json",
+            )
+
+        for func, args in callbacks:
+            func(*args)
+        return response
+
+    @classmethod
+    def abort(cls, exception: Optional[BaseException]) -> None:
+        # Only reached with an open transaction when the view raised past the
+        # error handlers, so after_request did not run. Sub-requests dispatched
+        # in-process share ``g`` and must leave their parent's transaction open.
+        if g.get("unit_of_work_environ") is not request.environ:
+            return
+        transaction = g.pop("unit_of_work")
+        g.pop("unit_of_work_environ")
+        g.pop("after_commit", None)
+        if transaction is not None:
+            transaction.rollback()
+            transaction.__exit__(None, None, None)
+
+    @staticmethod
+    def after_commit(func: Callable[..., Any], *args: Any) -> None:
+        """
+        Runs ``func`` after the request's transaction commits, or immediately
+        when no unit of work is open.
+
+        Args:
+            func (Callable[..., Any]): The side effect to run.
+            *args (Any): Arguments passed to ``func``.
+        """
+        if has_request_context() and "unit_of_work" in g:
+            g.after_commit.append((func, args))
+        else:
+            func(*args)
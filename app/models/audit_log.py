@@ -0,0 +1,24 @@
+from peewee import BigAutoField, DateTimeField, IntegerField, TextField
+
+from .base import BaseModel
+
+
+class AuditLog(BaseModel):
+    """
+    Append-only record of an admin action. Rows are written in batches by
+    AuditLogService, a database trigger rejects updates and deletes.
+    """
+
+    id = BigAutoField()
+    occurred_at = DateTimeField()
+    actor_id = IntegerField(null=True)
+    action = TextField()
+    target_type = TextField(null=True)
+    target_id = TextField(null=True)
+    diff = TextField(null=True)
+
+    class Meta:
+        indexes = (
+            (("actor_id", "id"), False),
+            (("target_type", "target_id", "id"), False),
+        )
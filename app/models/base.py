@@ -1,15 +1,114 @@
-from datetime import datetime
-from peewee import Model, DateTimeField
+from peewee import SQL, Model, DateTimeField, ModelDelete, ModelUpdate
 from app.db_init import db
+from app.middlewares.unit_of_work_middleware import UnitOfWorkMiddleware
+from app.services.cache_services.model_cache_service import ModelCacheService
+from app.services.change_feed_service import ChangeFeedService
+from app.services.prepared_statement_service import PreparedStatementService
+
+
+class _CacheInvalidatingQuery:
+    """
+    Mixin for write queries of cached models. The changed primary keys are
+    collected with RETURNING and evicted from the model cache after execution.
+    Covers ``save``, ``delete_instance`` and bulk ``update``/``delete`` calls.
+    """
+
+    def _execute(self, database):
+        if not ModelCacheService.is_enabled(self.model):
+            return super()._execute(database)
+
+        if self._returning:
+            # The caller consumes the cursor, so the changed keys are unknown.
+            result = super()._execute(database)
+            ModelCacheService.invalidate_model(self.model)
+            return result
+
+        query = self.returning(self.model._meta.primary_key)
+        pks = [row[0] for row in database.execute(query)]
+        ModelCacheService.invalidate(self.model, pks)
+        # Evicted again once committed, in case the old row was re-cached meanwhile.
+        UnitOfWorkMiddleware.after_commit(ModelCacheService.invalidate, self.model, pks)
+        return len(pks)
+
+
+class CacheInvalidatingUpdate(_CacheInvalidatingQuery, ModelUpdate):
+    pass
+
+
+class CacheInvalidatingDelete(_CacheInvalidatingQuery, ModelDelete):
+    pass
 
 
 class BaseModel(Model):
-    created_at = DateTimeField(default=datetime.now)
-    updated_at = DateTimeField(default=datetime.now)
+    """
+    Base of all models.
+
+    ``save`` on an existing row writes only its dirty fields. ``created_at`` and
+    ``updated_at`` are set by the database (column default and an update
+    trigger), so instances hold the values they were loaded with.
+    """
+
+    created_at = DateTimeField(constraints=[SQL("DEFAULT CURRENT_TIMESTAMP")])
+    updated_at = DateTimeField(constraints=[SQL("DEFAULT CURRENT_TIMESTAMP")])
+
+    def save(self, force_insert=False, only=None):
+        created = self._pk is None or force_insert
+        if only is None and not created:
+            only = self.dirty_fields
+            if not only:
+                return 0
+        changed_fields = [
+            getattr(field, "name", field) for field in (only or self.dirty_fields)
+        ]
+
+        rows = super().save(force_insert=force_insert, only=only)
+
+        if rows and ChangeFeedService.is_enabled(type(self)):
+            UnitOfWorkMiddleware.after_commit(
+                ChangeFeedService.publish,
+                type(self),
+                self._pk,
+                "created" if created else "updated",
+                changed_fields,
+            )
+        return rows
+
+    def delete_instance(self, *args, **kwargs):
+        rows = super().delete_instance(*args, **kwargs)
+
+        if rows and ChangeFeedService.is_enabled(type(self)):
+            UnitOfWorkMiddleware.after_commit(
+                ChangeFeedService.publish, type(self), self._pk, "deleted"
+            )
+        return rows
+
+    @classmethod
+    def update(cls, __data=None, **update):
+        return CacheInvalidatingUpdate(cls, cls._normalize_data(__data, update))
+
+    @classmethod
+    def delete(cls):
+        return CacheInvalidatingDelete(cls)
+
+    @classmethod
+    def get_by_id(cls, pk):
+        if not ModelCacheService.is_enabled(cls):
+            return cls._select_by_id(pk)
+
+        instance = ModelCacheService.get(cls, pk)
+        if instance is None:
+            version = ModelCacheService.version(cls, pk)
+            instance = cls._select_by_id(pk)
+            # Rows read in an open transaction may hold uncommitted writes.
+            if version is not None and not db.in_transaction():
+                ModelCacheService.set(instance, version)
+        return instance
 
-    def save(self, *args, **kwargs):
-        self.updated_at = datetime.now()
-        return super().save(*args, **kwargs)
+    @classmethod
+    def _select_by_id(cls, pk):
+        return PreparedStatementService.get(
+            cls.select().where(cls._meta.primary_key == pk)
+        )
 
     class Meta:
         database = db
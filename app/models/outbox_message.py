@@ -0,0 +1,20 @@
+from peewee import SQL, BigAutoField, DateTimeField, IntegerField, TextField
+
+from .base import BaseModel
+
+
+class OutboxMessage(BaseModel):
+    """
+    A Celery task call written in the same transaction as the change that
+    caused it. OutboxService relays pending messages to the broker.
+    """
+
+    id = BigAutoField()
+    task_name = TextField()
+    payload = TextField()
+    dedup_key = TextField(null=True, unique=True)
+    attempts = IntegerField(default=0)
+    available_at = DateTimeField(constraints=[SQL("DEFAULT CURRENT_TIMESTAMP")])
+    dispatched_at = DateTimeField(null=True)
+    failed_at = DateTimeField(null=True)
+    last_error = TextField(null=True)
@@ -0,0 +1,20 @@
+from peewee import AutoField, BigIntegerField, FloatField, IntegerField
+
+from .base import BaseModel
+
+
+class UserArchiveRun(BaseModel):
+    """
+    The outcome of an archival run that moved users: how many, and the size
+    of the userprofile table and the latency of the admin user listing before
+    and after.
+    """
+
+    id = AutoField()
+    archived = IntegerField()
+    hot_rows_before = BigIntegerField()
+    hot_rows_after = BigIntegerField()
+    hot_bytes_before = BigIntegerField()
+    hot_bytes_after = BigIntegerField()
+    list_seconds_before = FloatField()
+    list_seconds_after = FloatField()
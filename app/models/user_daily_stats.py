@@ -0,0 +1,15 @@
+from peewee import DateField, IntegerField
+
+from .base import BaseModel
+
+
+class UserDailyStats(BaseModel):
+    """
+    User counts per registration day, kept up to date by UserStatsService
+    from the deltas the userprofile triggers record.
+    """
+
+    day = DateField(primary_key=True)
+    total = IntegerField(default=0)
+    active = IntegerField(default=0)
+    admins = IntegerField(default=0)
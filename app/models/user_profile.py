@@ -1,5 +1,6 @@
 from peewee import TextField, BooleanField
 
+from config.app_config import AppConfig
 from .base import BaseModel
 
 
@@ -10,3 +11,22 @@ class UserProfile(BaseModel):
     password = TextField(null=False)
     is_admin = BooleanField(default=False)
     is_active = BooleanField(default=True)
+
+    class Meta:
+        cache_ttl = AppConfig.MODEL_CACHE_TTL
+        cache_exclude = ("password",)
+        change_feed = True
+        filterable_fields = (
+            "id",
+            "name",
+            "surname",
+            "email",
+            "is_admin",
+            "is_active",
+            "created_at",
+            "updated_at",
+        )
+        indexes = (
+            (("created_at",), False),
+            (("updated_at", "id"), False),
+        )
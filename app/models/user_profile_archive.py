@@ -0,0 +1,24 @@
+from peewee import SQL, BooleanField, DateTimeField, IntegerField, TextField
+
+from .base import BaseModel
+from .user_profile import UserProfile
+
+
+class UserProfileArchive(BaseModel):
+    """
+    Deactivated user profiles moved out of the userprofile table by
+    UserArchiveService. Rows keep their ID, timestamps and password hash, so a
+    restored user is the user that was archived.
+    """
+
+    id = IntegerField(primary_key=True)
+    name = TextField(null=False)
+    surname = TextField(null=False)
+    email = TextField(unique=True)
+    password = TextField(null=False)
+    is_admin = BooleanField(default=False)
+    is_active = BooleanField(default=False)
+    archived_at = DateTimeField(constraints=[SQL("DEFAULT CURRENT_TIMESTAMP")])
+
+    class Meta:
+        filterable_fields = UserProfile._meta.filterable_fields
@@ -0,0 +1,15 @@
+from peewee import IntegerField
+
+from .base import BaseModel
+
+
+class UserProfileTombstone(BaseModel):
+    """
+    Records deleted user profiles for incremental sync. Rows are written by a
+    database trigger on the userprofile table, not by the application.
+    """
+
+    user_id = IntegerField(index=True)
+
+    class Meta:
+        indexes = ((("created_at", "id"), False),)
@@ -0,0 +1,15 @@
+from peewee import DateTimeField, IntegerField
+
+from .base import BaseModel
+
+
+class UserStatsSummary(BaseModel):
+    """
+    Single row with the user totals and the database time they were last
+    refreshed at, maintained by UserStatsService.
+    """
+
+    total = IntegerField(default=0)
+    active = IntegerField(default=0)
+    admins = IntegerField(default=0)
+    refreshed_at = DateTimeField(null=True)
@@ -0,0 +1,399 @@
+import re
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import psycopg2
+from peewee import Database
+from peewee_migrate import Migrator
+
+from app.logger_setup import LoggerSetup
+
+TIMEOUT_PATTERN = re.compile(r"^\d+\s*(ms|s|min|h)?$")
+PASSTHROUGH_KEYWORDS = ("SELECT", "SHOW", "WITH", "BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")
+TABLE_PATTERN = re.compile(
+    r'(?:CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?|ALTER\s+TABLE|UPDATE|DELETE\s+FROM|INSERT\s+INTO|DROP\s+TABLE|\bON)\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+
+class OnlineMigrations:
+    """
+    Helpers for migrations that must not block a large, busy table.
+
+    Use them inside migration files next to the regular ``migrator`` calls::
+
+        def migrate(migrator, database, *, fake=False):
+            OnlineMigrations.set_timeouts(migrator, lock_timeout="5s")
+            OnlineMigrations.add_index_concurrently(migrator, "userprofile", ["email", "is_active"])
+            OnlineMigrations.backfill(
+                migrator, "userprofile_fill_flag", "userprofile",
+                set_sql="flag = FALSE", where_sql="flag IS NULL",
+            )
+
+    Migrations run inside a transaction, so concurrent index builds and chunked
+    backfills run on a separate autocommit connection. Keep them in their own
+    migration file, otherwise they wait for locks taken earlier in the same
+    migration.
+    """
+
+    PROGRESS_TABLE = "online_migration_progress"
+
+    _dry_run_statements: Optional[List[Dict[str, Any]]] = None
+    _dry_run_execute_sql = None
+
+    @classmethod
+    def set_timeouts(
+        cls,
+        migrator: Migrator,
+        lock_timeout: Optional[str] = "5s",
+        statement_timeout: Optional[str] = None,
+    ) -> None:
+        """
+        Limits how long statements of the migration may wait for locks and run.
+
+        Args:
+            migrator (Migrator): The migrator passed to the migration.
+            lock_timeout (Optional[str]): Maximum wait for a lock, e.g. '5s'. None leaves it unchanged.
+            statement_timeout (Optional[str]): Maximum statement duration, e.g. '1min'. None leaves it unchanged.
+        """
+        for setting, value in (
+            ("lock_timeout", lock_timeout),
+            ("statement_timeout", statement_timeout),
+        ):
+            if value is not None:
+                migrator.sql(f"SET LOCAL {setting} = '{cls._check_timeout(value)}'")
+
+    @classmethod
+    def set_session_timeouts(
+        cls,
+        database: Database,
+        lock_timeout: Optional[str] = None,
+        statement_timeout: Optional[str] = None,
+    ) -> None:
+        """
+        Applies lock and statement timeouts to every migration run on the connection.
+
+        Args:
+            database (Database): The database the migrations run against.
+            lock_timeout (Optional[str]): Maximum wait for a lock, '0' disables it.
+            statement_timeout (Optional[str]): Maximum statement duration, '0' disables it.
+        """
+        for setting, value in (
+            ("lock_timeout", lock_timeout),
+            ("statement_timeout", statement_timeout),
+        ):
+            if value is not None:
+                database.execute_sql(f"SET {setting} = '{cls._check_timeout(value)}'")
+
+    @classmethod
+    def add_index_concurrently(
+        cls,
+        migrator: Migrator,
+        table: str,
+        columns: Sequence[str],
+        unique: bool = False,
+        name: Optional[str] = None,
+        lock_timeout: Optional[str] = None,
+        where_sql: Optional[str] = None,
+    ) -> None:
+        """
+        Creates an index without blocking writes to the table.
+
+        A failed or interrupted concurrent build leaves an invalid index behind,
+        which is dropped and built again when the migration is rerun.
+
+        Args:
+            migrator (Migrator): The migrator passed to the migration.
+            table (str): The table to index.
+            columns (Sequence[str]): The indexed columns, or expressions like
+                                     'lower(email) text_pattern_ops', which then need a name.
+            unique (bool): Whether the index is unique.
+            name (Optional[str]): The index name, defaults to peewee's '<table>_<columns>' naming.
+            lock_timeout (Optional[str]): Maximum wait for each lock of the build, None for no limit.
+                                          The build also waits for every older transaction to end
+                                          through such locks, which can take long on a busy database.
+            where_sql (Optional[str]): The condition of a partial index, None to index every row.
+        """
+        name = name or "_".join([table, *columns])
+        column_list = ", ".join(
+            f'"{column}"' if column.isidentifier() else column for column in columns
+        )
+        sql = (
+            f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "{table}" ({column_list})'
+        )
+        if where_sql:
+            sql += f" WHERE {where_sql}"
+        migrator.run(cls._create_index_autocommit, migrator, name, sql, lock_timeout)
+
+    @classmethod
+    def drop_index_concurrently(
+        cls, migrator: Migrator, name: str, lock_timeout: str = "5s"
+    ) -> None:
+        """
+        Drops an index without blocking reads and writes of its table.
+
+        Args:
+            migrator (Migrator): The migrator passed to the migration.
+            name (str): The name of the index to drop.
+            lock_timeout (str): Maximum wait for the lock on the index.
+        """
+        sql = f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'
+        migrator.run(cls._execute_autocommit, migrator, sql, lock_timeout)
+
+    @classmethod
+    def backfill(
+        cls,
+        migrator: Migrator,
+        name: str,
+        table: str,
+        set_sql: str,
+        where_sql: str = "TRUE",
+        batch_size: int = 1000,
+        sleep_seconds: float = 0.1,
+        lock_timeout: str = "5s",
+        statement_timeout: str = "30s",
+    ) -> None:
+        """
+        Updates rows in primary-key ranges, each range committed on its own.
+
+        Progress is stored under ``name`` after every batch, so a backfill that
+        was interrupted continues where it stopped when the migration is rerun.
+        The where clause should exclude rows that were already updated.
+
+        Args:
+            migrator (Migrator): The migrator passed to the migration.
+            name (str): A unique name of the backfill, used to store its progress.
+            table (str): The table to update, it must have an integer 'id' primary key.
+            set_sql (str): The SET clause, e.g. "is_active = TRUE".
+            where_sql (str): The condition selecting rows to update.
+            batch_size (int): The size of the primary-key range updated per batch.
+            sleep_seconds (float): Pause between batches to leave room for regular traffic.
+            lock_timeout (str): Maximum wait for row locks per batch.
+            statement_timeout (str): Maximum duration of a single batch.
+        """
+        migrator.run(
+            cls._run_backfill,
+            migrator,
+            name,
+            table,
+            set_sql,
+            where_sql,
+            batch_size,
+            sleep_seconds,
+            lock_timeout,
+            statement_timeout,
+        )
+
+    @classmethod
+    @contextmanager
+    def dry_run(cls, database: Database) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Records the statements of migrations instead of executing them.
+
+        Reads are executed so migrations can introspect the schema, every other
+        statement is recorded with an estimate of the rows it affects. Everything
+        runs in a transaction that is rolled back.
+
+        Args:
+            database (Database): The database the migrations run against.
+
+        Yields:
+            List[Dict[str, Any]]: The recorded statements with 'sql', 'params' and 'estimated_rows'.
+        """
+        statements: List[Dict[str, Any]] = []
+        original_execute_sql = database.execute_sql
+
+        def record_execute_sql(sql, params=None, *args, **kwargs):
+            if sql.lstrip().split(None, 1)[0].upper() in PASSTHROUGH_KEYWORDS:
+                return original_execute_sql(sql, params, *args, **kwargs)
+            statements.append(
+                {
+                    "sql": sql,
+                    "params": params,
+                    "estimated_rows": cls._estimate_rows(
+                        original_execute_sql, sql, params
+                    ),
+                }
+            )
+            return original_execute_sql("SELECT 1 WHERE FALSE")
+
+        cls._dry_run_statements = statements
+        cls._dry_run_execute_sql = original_execute_sql
+        database.execute_sql = record_execute_sql
+        try:
+            with database.atomic() as transaction:
+                yield statements
+                transaction.rollback()
+        finally:
+            del database.execute_sql
+            cls._dry_run_statements = None
+            cls._dry_run_execute_sql = None
+
+    @classmethod
+    def _execute_autocommit(
+        cls, migrator: Migrator, sql: str, lock_timeout: Optional[str]
+    ) -> None:
+        if cls._dry_run_statements is not None:
+            cls._dry_run_statements.append(
+                {
+                    "sql": sql,
+                    "params": None,
+                    "estimated_rows": cls._estimate_rows(
+                        cls._dry_run_execute_sql, sql, None
+                    ),
+                }
+            )
+            return
+
+        with cls._autocommit_connection(migrator.__database__, lock_timeout) as cursor:
+            LoggerSetup.get_logger("migrations").info(f"Executing: {sql}")
+            cursor.execute(sql)
+
+    @classmethod
+    def _create_index_autocommit(
+        cls, migrator: Migrator, name: str, sql: str, lock_timeout: Optional[str]
+    ) -> None:
+        if cls._dry_run_statements is None:
+            with cls._autocommit_connection(migrator.__database__, lock_timeout) as cursor:
+                cursor.execute(
+                    "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                    (f'"{name}"',),
+                )
+                row = cursor.fetchone()
+                if row is not None and not row[0]:
+                    drop_sql = f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'
+                    LoggerSetup.get_logger("migrations").warning(
+                        f"Index {name} is invalid after an earlier failed build, executing: {drop_sql}"
+                    )
+                    cursor.execute(drop_sql)
+        cls._execute_autocommit(migrator, sql, lock_timeout)
+
+    @classmethod
+    def _run_backfill(
+        cls,
+        migrator: Migrator,
+        name: str,
+        table: str,
+        set_sql: str,
+        where_sql: str,
+        batch_size: int,
+        sleep_seconds: float,
+        lock_timeout: str,
+        statement_timeout: str,
+    ) -> None:
+        update_sql = (
+            f'UPDATE "{table}" SET {set_sql} '
+            f"WHERE id > %s AND id <= %s AND ({where_sql})"
+        )
+
+        if cls._dry_run_statements is not None:
+            cls._dry_run_statements.append(
+                {
+                    "sql": f"{update_sql} -- in batches of {batch_size} ids",
+                    "params": None,
+                    "estimated_rows": cls._estimate_rows(
+                        cls._dry_run_execute_sql,
+                        f'SELECT 1 FROM "{table}" WHERE {where_sql}',
+                        None,
+                    ),
+                }
+            )
+            return
+
+        logger = LoggerSetup.get_logger("migrations")
+        with cls._autocommit_connection(
+            migrator.__database__, lock_timeout, statement_timeout
+        ) as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {cls.PROGRESS_TABLE} ("
+                "name TEXT PRIMARY KEY, last_id BIGINT NOT NULL, "
+                "rows_updated BIGINT NOT NULL DEFAULT 0, updated_at TIMESTAMP NOT NULL)"
+            )
+            cursor.execute(
+                f"SELECT last_id, rows_updated FROM {cls.PROGRESS_TABLE} WHERE name = %s",
+                (name,),
+            )
+            progress = cursor.fetchone()
+            last_id, rows_updated = progress if progress else (0, 0)
+
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM "{table}"')
+            max_id = cursor.fetchone()[0]
+            logger.info(f"Backfill {name}: resuming after id {last_id} of {max_id}.")
+
+            while last_id < max_id:
+                upper_id = last_id + batch_size
+                cursor.execute(update_sql, (last_id, upper_id))
+                rows_updated += cursor.rowcount
+                last_id = upper_id
+                cursor.execute(
+                    f"INSERT INTO {cls.PROGRESS_TABLE} (name, last_id, rows_updated, updated_at) "
+                    "VALUES (%s, %s, %s, LOCALTIMESTAMP) ON CONFLICT (name) DO UPDATE "
+                    "SET last_id = EXCLUDED.last_id, rows_updated = EXCLUDED.rows_updated, "
+                    "updated_at = EXCLUDED.updated_at",
+                    (name, last_id, rows_updated),
+                )
+                logger.info(
+                    f"Backfill {name}: {rows_updated} rows updated, up to id {min(last_id, max_id)}."
+                )
+                if sleep_seconds:
+                    time.sleep(sleep_seconds)
+
+    @classmethod
+    @contextmanager
+    def _autocommit_connection(
+        cls,
+        database: Database,
+        lock_timeout: Optional[str] = None,
+        statement_timeout: Optional[str] = None,
+    ):
+        connection = psycopg2.connect(dbname=database.database, **database.connect_params)
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                if lock_timeout:
+                    cursor.execute(f"SET lock_timeout = '{cls._check_timeout(lock_timeout)}'")
+                if statement_timeout:
+                    cursor.execute(
+                        f"SET statement_timeout = '{cls._check_timeout(statement_timeout)}'"
+                    )
+                yield cursor
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _estimate_rows(execute_sql, sql: str, params) -> Optional[int]:
+        """
+        Estimates rows touched by a statement: the planner's estimate for DML
+        and the table's row count from pg_class for DDL.
+        """
+        keyword = sql.lstrip().split(None, 1)[0].upper()
+        # A failed estimate must not abort the surrounding transaction.
+        execute_sql("SAVEPOINT online_migrations_estimate")
+        try:
+            if keyword in ("UPDATE", "DELETE", "INSERT", "SELECT"):
+                plan = execute_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).fetchone()[0]
+                node = plan[0]["Plan"]
+                if keyword != "SELECT" and node.get("Plans"):
+                    node = node["Plans"][0]
+                return int(node["Plan Rows"])
+
+            match = TABLE_PATTERN.search(sql)
+            if not match:
+                return None
+            row = execute_sql(
+                "SELECT reltuples FROM pg_class WHERE relname = %s", (match.group(1),)
+            ).fetchone()
+            return max(int(row[0]), 0) if row else 0
+        except Exception:
+            execute_sql("ROLLBACK TO SAVEPOINT online_migrations_estimate")
+            return None
+        finally:
+            execute_sql("RELEASE SAVEPOINT online_migrations_estimate")
+
+    @staticmethod
+    def _check_timeout(value: str) -> str:
+        if not TIMEOUT_PATTERN.match(str(value)):
+            raise ValueError(f"Invalid timeout '{value}', expected e.g. '500ms', '5s' or '1min'.")
+        return value
@@ -1,6 +1,10 @@
 from flask import Flask
 from flask_restx import Api
+from .endpoints.health_endpoints import health_namespace
+from .endpoints.metrics_endpoints import metrics_namespace
 from .endpoints.user_endpoints import user_namespace
+from .middlewares.tracing_middleware import TracingMiddleware
+from .validation_schemas.compiled_validators import CompiledValidators
 
 
 def init_app_routes(app: Flask) -> None:
@@ -11,7 +15,17 @@ def init_app_routes(app: Flask) -> None:
         description="A detailed description of the Flask API",
     )
     api.add_namespace(user_namespace, path="/user")
+    api.add_namespace(metrics_namespace, path="/metrics")
+    api.add_namespace(health_namespace, path="/health")
+
+    CompiledValidators.init_api(api)
+    TracingMiddleware.init_api(api)
 
     from flask_jwt_extended import JWTManager
 
+    from .services.user_services.token_revocation_service import (
+        TokenRevocationService,
+    )
+
     jwt = JWTManager(app)
+    jwt.token_in_blocklist_loader(TokenRevocationService.is_token_revoked)
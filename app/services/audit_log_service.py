@@ -0,0 +1,243 @@
+import atexit
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from flask import has_request_context
+from flask_jwt_extended import get_jwt_identity
+from peewee import PeeweeException
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.middlewares.unit_of_work_middleware import UnitOfWorkMiddleware
+from app.models.audit_log import AuditLog
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class AuditLogService:
+    """
+    Buffered audit log of admin actions.
+
+    ``record`` only appends the entry to an in-process buffer, so audited
+    requests do not wait for a database write. A background thread per process
+    inserts the buffer into the append-only auditlog table in batches, when
+    AUDIT_LOG_BATCH_SIZE entries are pending or every AUDIT_LOG_FLUSH_SECONDS,
+    and the buffer is drained when the process exits. Entries of a request
+    running in a unit of work are buffered only after its commit. If the
+    database is unavailable, entries stay buffered up to AUDIT_LOG_MAX_BUFFER,
+    after which the oldest are dropped and logged.
+    """
+
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _wakeup = threading.Event()
+    _buffer: Deque[Dict[str, Any]] = deque()
+    _flusher_pid: Optional[int] = None
+    _flusher_thread = None
+
+    @classmethod
+    def record(
+        cls,
+        action: str,
+        target_type: Optional[str] = None,
+        target_id: Any = None,
+        diff: Optional[Dict[str, Any]] = None,
+        actor_id: Optional[int] = None,
+    ) -> None:
+        """
+        Records an action in the audit log.
+
+        Args:
+            action (str): The action name, e.g. 'user.toggle_status'.
+            target_type (Optional[str]): The kind of object acted on, e.g. 'user'.
+            target_id (Any): The ID of the object acted on.
+            diff (Optional[Dict[str, Any]]): Changed fields as {field: [old, new]},
+                or the query of read actions. Never include secrets.
+            actor_id (Optional[int]): The acting user, the JWT identity of the request by default.
+        """
+        if not AppConfig.AUDIT_LOG_ENABLED:
+            return
+
+        if actor_id is None and has_request_context():
+            try:
+                actor_id = get_jwt_identity()
+            except RuntimeError:
+                # The request was not authenticated with a JWT.
+                actor_id = None
+
+        entry = {
+            "occurred_at": datetime.now(),
+            "actor_id": actor_id,
+            "action": action,
+            "target_type": target_type,
+            "target_id": str(target_id) if target_id is not None else None,
+            "diff": json.dumps(diff, default=str) if diff is not None else None,
+        }
+        UnitOfWorkMiddleware.after_commit(cls._enqueue, entry)
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Writes the buffered entries to the audit table in batches.
+
+        Returns:
+            int: The number of entries written. Entries of a failed batch are
+            put back at the front of the buffer.
+        """
+        written = 0
+        with cls._flush_lock:
+            while True:
+                with cls._lock:
+                    batch = [
+                        cls._buffer.popleft()
+                        for _ in range(min(len(cls._buffer), AppConfig.AUDIT_LOG_BATCH_SIZE))
+                    ]
+                if not batch:
+                    return written
+
+                try:
+                    cls._insert(batch)
+                except PeeweeException as e:
+                    with cls._lock:
+                        cls._buffer.extendleft(reversed(batch))
+                    MetricsService.increment("audit_log.flush_errors")
+                    LoggerSetup.get_logger("general").error(
+                        f"Failed to write {len(batch)} audit log entries, err : {e}"
+                    )
+                    return written
+
+                written += len(batch)
+                MetricsService.increment("audit_log.entries_written", len(batch))
+
+    @classmethod
+    def get_entries(
+        cls,
+        limit: int,
+        before: Optional[int] = None,
+        actor_id: Optional[int] = None,
+        action: Optional[str] = None,
+        target_type: Optional[str] = None,
+        target_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns audit log entries newest first, in keyset order by ID.
+
+        Args:
+            limit (int): The maximum number of entries returned.
+            before (Optional[int]): Only return entries older than this ID, the
+                                    ``next_cursor`` of the previous page.
+            actor_id (Optional[int]): Only return actions of this user.
+            action (Optional[str]): Only return this action.
+            target_type (Optional[str]): Only return actions on this kind of object.
+            target_id (Optional[str]): Only return actions on this object.
+
+        Returns:
+            Dict[str, Any]: The entries and the cursor of the next page, None on the last page.
+
+        Raises:
+            Exception: An exception indicating an internal server error if a database error occurs.
+        """
+        query = AuditLog.select()
+        if before is not None:
+            query = query.where(AuditLog.id < before)
+        if actor_id is not None:
+            query = query.where(AuditLog.actor_id == actor_id)
+        if action:
+            query = query.where(AuditLog.action == action)
+        if target_type:
+            query = query.where(AuditLog.target_type == target_type)
+        if target_id:
+            query = query.where(AuditLog.target_id == target_id)
+
+        try:
+            rows = list(query.order_by(AuditLog.id.desc()).limit(limit + 1))
+        except PeeweeException as e:
+            raise Exception(f"Failed to read the audit log: {e}")
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "entries": [
+                {
+                    "id": row.id,
+                    "occurred_at": row.occurred_at,
+                    "actor_id": row.actor_id,
+                    "action": row.action,
+                    "target_type": row.target_type,
+                    "target_id": row.target_id,
+                    "diff": json.loads(row.diff) if row.diff else None,
+                }
+                for row in rows
+            ],
+            "next_cursor": rows[-1].id if has_more else None,
+        }
+
+    @classmethod
+    def pending(cls) -> int:
+        """
+        Returns the number of entries waiting to be written.
+        """
+        with cls._lock:
+            return len(cls._buffer)
+
+    @classmethod
+    def _enqueue(cls, entry: Dict[str, Any]) -> None:
+        cls._ensure_flusher()
+        with cls._lock:
+            cls._buffer.append(entry)
+            dropped = 0
+            while len(cls._buffer) > AppConfig.AUDIT_LOG_MAX_BUFFER:
+                cls._buffer.popleft()
+                dropped += 1
+            pending = len(cls._buffer)
+
+        if dropped:
+            MetricsService.increment("audit_log.entries_dropped", dropped)
+            LoggerSetup.get_logger("general").error(
+                f"Audit log buffer is full, dropped the {dropped} oldest entries"
+            )
+        if pending >= AppConfig.AUDIT_LOG_BATCH_SIZE:
+            cls._wakeup.set()
+
+    @staticmethod
+    def _insert(batch: List[Dict[str, Any]]) -> None:
+        # The flusher thread only holds a connection while it writes.
+        opened = db.is_closed()
+        try:
+            with db.atomic():
+                AuditLog.insert_many(batch).execute()
+        finally:
+            if opened:
+                db.close()
+
+    @classmethod
+    def _ensure_flusher(cls) -> None:
+        # Started lazily and per pid, so forked gunicorn workers each get their own.
+        if cls._flusher_pid == os.getpid():
+            return
+
+        with cls._lock:
+            if cls._flusher_pid == os.getpid():
+                return
+            # Entries copied from the parent are flushed by the parent.
+            cls._buffer.clear()
+            cls._flusher_thread = threading.Thread(
+                target=cls._run, name="audit-log-flusher", daemon=True
+            )
+            cls._flusher_thread.start()
+            atexit.register(cls.flush)
+            cls._flusher_pid = os.getpid()
+
+    @classmethod
+    def _run(cls) -> None:
+        while True:
+            cls._wakeup.wait(AppConfig.AUDIT_LOG_FLUSH_SECONDS)
+            cls._wakeup.clear()
+            try:
+                cls.flush()
+            except Exception as e:
+                LoggerSetup.get_logger("general").error(f"Audit log flush failed, err : {e}")
@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Tuple, Type
-from peewee import ModelSelect, Model, DoesNotExist
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple, Type
+from peewee import ModelSelect, Model, DoesNotExist, SelectBase, Value
 from peewee import OperationalError, TextField
 from functools import reduce
 from operator import or_
 
+from app.services.base_crud_services.filter_compiler import FilterCompiler
+from app.services.prepared_statement_service import PreparedStatementService
+from app.services.statement_timeout_service import StatementTimeoutService
+from config.app_config import AppConfig
+
 
 class BasePaginationService(ABC):
 
@@ -19,6 +25,7 @@ class BasePaginationService(ABC):
         sort_order: str,
         search: str,
         filters: Dict[str, Any],
+        archive_model: Optional[Type[Model]] = None,
     ) -> Tuple[List[Model], int, int]:
         """
         Retrieves rows from the database applying pagination, sorting, searching, and filtering.
@@ -30,7 +37,9 @@ class BasePaginationService(ABC):
             sort_field (str): The field to sort the results by.
             sort_order (str): The order of sorting ('asc' for ascending, 'desc' for descending).
             search (str): A search term to filter the results.
-            filters (Dict[str, Any]): A dictionary of filters to apply to the query.
+            filters (Dict[str, Any]): A filter expression to apply to the query, see FilterCompiler.
+            archive_model (Optional[Type[Model]]): A model with the same fields holding archived rows,
+                                                   which are then included, see ``union_archive``.
 
         Returns:
             Tuple[List[Model], int, int]: A tuple containing the list of models, the total number of entries,
@@ -41,20 +50,77 @@ class BasePaginationService(ABC):
             query = model.select()
             query = cls.filter_query(query, model, filters)
             query = cls.search_query(query, model, search)
-            total_entries = query.count()
-            query = cls.sort_query(query, model, sort_field, sort_order)
-            models_list = cls.paginate_query(query, page, per_page)
+            if archive_model is not None:
+                query = cls.union_archive(query, model, archive_model, search, filters)
+            # The listing is prepared when its statement text is fixed, as for the
+            # default {"is_active": true} filter. Searches, ``in`` lists and nested
+            # expressions would add a statement per combination.
+            prepared = (
+                not search
+                and archive_model is None
+                and (not filters or FilterCompiler.has_fixed_sql(filters))
+            )
+            # Other filters and searches can scan the whole table, they get a time budget.
+            budget = (
+                nullcontext()
+                if prepared
+                else StatementTimeoutService.budget(
+                    f"search.{model.__name__}", AppConfig.STATEMENT_TIMEOUT_SEARCH_MS
+                )
+            )
+            with budget:
+                total_entries = (
+                    PreparedStatementService.count(query) if prepared else query.count()
+                )
+                query = cls.sort_query(query, model, sort_field, sort_order)
+                models_list = cls.paginate_query(query, page, per_page, prepared)
             total_pages = (total_entries + per_page - 1) // per_page
             return (models_list, total_entries, total_pages)
         except AttributeError as e:
             raise ValueError(f"Invalid field name: {e}")
+        except ValueError:
+            raise
         except OperationalError as e:
             raise ValueError(f"Database operational error: {e}")
         except Exception as e:
             raise Exception(f"An unexpected error occurred: {e}")
 
+    @classmethod
+    def union_archive(
+        cls,
+        query: ModelSelect,
+        model: Type[Model],
+        archive_model: Type[Model],
+        search: str,
+        filters: Dict[str, Any],
+    ) -> SelectBase:
+        """
+        Appends the matching archived rows to the query with UNION ALL. Every
+        row gets an ``is_archived`` attribute telling which table it came from.
+
+        Args:
+            query (ModelSelect): The filtered and searched query of the model.
+            model (Type[Model]): The model class the query selects from.
+            archive_model (Type[Model]): The model class of the archived rows, having every field of ``model``.
+            search (str): The search term, applied to the archived rows too.
+            filters (Dict[str, Any]): The filter expression, applied to the archived rows too.
+
+        Returns:
+            SelectBase: The combined query, rows are returned as instances of ``model``.
+        """
+        fields = model._meta.sorted_fields
+        archived = archive_model.select(
+            *[archive_model._meta.fields[field.name] for field in fields],
+            Value(True).alias("is_archived"),
+        )
+        archived = cls.filter_query(archived, archive_model, filters)
+        archived = cls.search_query(archived, archive_model, search)
+        return query.select(*fields, Value(False).alias("is_archived")).union_all(archived)
+
     @staticmethod
-    def paginate_query(query: ModelSelect, page: int, per_page: int) -> List[Model]:
+    def paginate_query(
+        query: ModelSelect, page: int, per_page: int, prepared: bool = False
+    ) -> List[Model]:
         """
         Applies pagination to the given query.
 
@@ -62,6 +128,7 @@ class BasePaginationService(ABC):
             query (ModelSelect): The Peewee query to paginate.
             page (int): The page number for pagination.
             per_page (int): The number of items per page.
+            prepared (bool): Whether to run the query as a prepared statement.
 
         Returns:
             List[Model]: A list of models for the given page.
@@ -72,7 +139,8 @@ class BasePaginationService(ABC):
         """
 
         try:
-            return list(query.paginate(page, per_page))
+            query = query.paginate(page, per_page)
+            return PreparedStatementService.fetch(query) if prepared else list(query)
         except DoesNotExist:
             raise ValueError("Requested page does not exist")
         except Exception as e:
@@ -155,31 +223,23 @@ class BasePaginationService(ABC):
         query: ModelSelect, model: Type[Model], filters: Dict[str, Any]
     ) -> ModelSelect:
         """
-        Applies filters to the query based on the provided filter dictionary.
+        Applies a filter expression to the query as a single where clause.
 
         Args:
             query (ModelSelect): The Peewee query to filter.
             model (Type[Model]): The model class containing the fields to filter on.
-            filters (Dict[str, Any]): A dictionary of filters where keys are field names and values are the filter values.
+            filters (Dict[str, Any]): A filter expression, e.g. {"is_active": true} or
+                {"or": [{"is_admin": true}, {"created_at": {"gte": "2024-01-01"}}]}.
+                See FilterCompiler for the supported operators.
 
         Returns:
             ModelSelect: The filtered query.
 
         Raises:
-            ValueError: If a filter field does not exist in the model.
+            ValueError: If the expression is invalid or a filter field is not filterable in the model.
         """
 
-        if filters is None:
+        if not filters:
             return query
 
-        try:
-            for key, value in filters.items():
-                if not hasattr(model, key):
-                    raise AttributeError(
-                        f"Error in filter query. Field '{key}' does not exist in the model {model.__name__}."
-                    )
-                field = getattr(model, key)
-                query = query.where(field == value)
-            return query
-        except AttributeError as e:
-            raise ValueError(str(e))
+        return query.where(FilterCompiler.compile(model, filters))
@@ -0,0 +1,167 @@
+from functools import lru_cache, reduce
+from operator import and_, or_
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Type
+
+from peewee import Expression, Field, Model
+
+
+class FilterCompiler:
+    """
+    Compiles filter expressions sent by clients into a single peewee expression.
+
+    A filter expression is a JSON object where:
+        - ``{"field": value}`` matches rows where the field equals the value,
+        - ``{"field": {"<operator>": value}}`` applies one of ``eq``, ``ne``, ``in``,
+          ``gt``, ``gte``, ``lt``, ``lte``, ``between`` or ``is_null``,
+        - ``{"and": [...]}`` and ``{"or": [...]}`` combine nested expressions,
+        - several keys in one object are combined with ``and``.
+
+    Expressions are split into a shape (fields, operators and nesting) and the
+    values. Validation and compilation are done once per shape and cached, so
+    repeated requests only bind new values.
+    """
+
+    OPERATORS: Dict[str, Callable[[Field, Any], Expression]] = {
+        "eq": lambda field, value: field == value,
+        "ne": lambda field, value: field != value,
+        "in": lambda field, value: field.in_(value),
+        "gt": lambda field, value: field > value,
+        "gte": lambda field, value: field >= value,
+        "lt": lambda field, value: field < value,
+        "lte": lambda field, value: field <= value,
+        "between": lambda field, value: field.between(*value),
+        "is_null": lambda field, value: field.is_null(value),
+    }
+    LOGICAL_OPERATORS = {"and": and_, "or": or_}
+
+    @classmethod
+    def compile(cls, model: Type[Model], filters: Dict[str, Any]) -> Expression:
+        """
+        Compiles a filter expression for the given model.
+
+        Args:
+            model (Type[Model]): The model class the filters apply to.
+            filters (Dict[str, Any]): The filter expression.
+
+        Returns:
+            Expression: A peewee expression usable in a ``where`` clause.
+
+        Raises:
+            ValueError: If the expression is malformed or uses a field that is not filterable.
+        """
+        values: List[Any] = []
+        shape = cls._normalize(filters, values)
+        return cls._compile_shape(model, shape)(iter(values))
+
+    @classmethod
+    def has_fixed_sql(cls, filters: Dict[str, Any]) -> bool:
+        """
+        Checks if the SQL of a filter expression only depends on its shape, so
+        every request with the same shape runs the same statement text. That is
+        the case for field conditions combined with ``and``, unless they use
+        ``in``, whose placeholders follow the list length, or compare to null.
+
+        Args:
+            filters (Dict[str, Any]): The filter expression.
+
+        Returns:
+            bool: True if the expression compiles to a fixed statement text.
+        """
+        values: List[Any] = []
+        try:
+            shape = cls._normalize(filters, values)
+        except ValueError:
+            return False
+        conditions = shape[1] if shape[0] == "and" else (shape,)
+        return all(
+            condition[0] == "field" and condition[2] != "in" and value is not None
+            for condition, value in zip(conditions, values)
+        )
+
+    @classmethod
+    def _normalize(cls, node: Any, values: List[Any]) -> Tuple:
+        if not isinstance(node, dict) or not node:
+            raise ValueError("Filter expression must be a non-empty JSON object.")
+
+        parts = []
+        for key in sorted(node):
+            value = node[key]
+            if key in cls.LOGICAL_OPERATORS:
+                if not isinstance(value, list) or not value:
+                    raise ValueError(
+                        f"Filter operator '{key}' expects a non-empty list of filter expressions."
+                    )
+                parts.append(
+                    (key, tuple(cls._normalize(child, values) for child in value))
+                )
+            elif isinstance(value, dict):
+                if not value:
+                    raise ValueError(f"Filter for field '{key}' has no operators.")
+                for operator_name in sorted(value):
+                    values.append(value[operator_name])
+                    parts.append(("field", key, operator_name))
+            else:
+                values.append(value)
+                parts.append(("field", key, "eq"))
+
+        return ("and", tuple(parts)) if len(parts) > 1 else parts[0]
+
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _compile_shape(
+        cls, model: Type[Model], shape: Tuple
+    ) -> Callable[[Iterator[Any]], Expression]:
+        if shape[0] in cls.LOGICAL_OPERATORS:
+            combine = cls.LOGICAL_OPERATORS[shape[0]]
+            children = [cls._compile_shape(model, child) for child in shape[1]]
+            return lambda values: reduce(
+                combine, [child(values) for child in children]
+            )
+
+        _, field_name, operator_name = shape
+        field = cls._get_field(model, field_name)
+        if operator_name not in cls.OPERATORS:
+            raise ValueError(
+                f"Unknown filter operator '{operator_name}' for field '{field_name}'."
+            )
+        build = cls.OPERATORS[operator_name]
+
+        def build_condition(values: Iterator[Any]) -> Expression:
+            value = next(values)
+            cls._check_value(field_name, operator_name, value)
+            return build(field, value)
+
+        return build_condition
+
+    @staticmethod
+    def _get_field(model: Type[Model], field_name: str) -> Field:
+        if field_name not in model._meta.fields:
+            raise ValueError(
+                f"Error in filter query. Field '{field_name}' does not exist in the model {model.__name__}."
+            )
+        filterable_fields = getattr(model._meta, "filterable_fields", None)
+        if filterable_fields is not None and field_name not in filterable_fields:
+            raise ValueError(
+                f"Error in filter query. Field '{field_name}' is not filterable in the model {model.__name__}."
+            )
+        return model._meta.fields[field_name]
+
+    @staticmethod
+    def _check_value(field_name: str, operator_name: str, value: Any) -> None:
+        if operator_name == "in":
+            valid = isinstance(value, list)
+            expected = "a list of values"
+        elif operator_name == "between":
+            valid = isinstance(value, list) and len(value) == 2
+            expected = "a list of two values"
+        elif operator_name == "is_null":
+            valid = isinstance(value, bool)
+            expected = "true or false"
+        else:
+            valid = not isinstance(value, (list, dict))
+            expected = "a single value"
+
+        if not valid:
+            raise ValueError(
+                f"Filter operator '{operator_name}' for field '{field_name}' expects {expected}."
+            )
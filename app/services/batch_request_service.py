@@ -0,0 +1,105 @@
+from typing import Any, Dict, List
+
+from flask import current_app, request
+from werkzeug.test import EnvironBuilder
+
+from app.db_init import db
+from app.enums.http_status import HttpStatus
+from app.services.metrics_service import MetricsService
+
+
+class BatchRequestService:
+    """
+    Dispatches a list of sub-requests in-process, within the current request.
+
+    Sub-requests are sent with the cookies and headers of the batch request, so
+    they share its identity, and they run on the same thread, so they share its
+    database connection. Their JWT is verified again, revocation included, so
+    a sub-request after a logout in the same batch is rejected. Endpoints that
+    stream their response, like the change stream, are rejected. Request hooks
+    do not run for sub-requests, which keeps the whole batch a single request
+    in metrics. Each sub-request runs in its
+    own transaction (a savepoint inside a unit of work) that is rolled back
+    when it fails, so one failing sub-request does not affect the others.
+    """
+
+    FORWARDED_HEADERS = ("Cookie", "Authorization", "X-CSRF-TOKEN")
+
+    @classmethod
+    def dispatch(
+        cls, sub_requests: List[Dict[str, Any]], allowed_prefix: str, batch_path: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Dispatches every sub-request and collects its status and body.
+
+        Args:
+            sub_requests (List[Dict[str, Any]]): Sub-requests with 'method', 'path' and optional 'query' and 'body'.
+            allowed_prefix (str): The URL prefix every sub-request path must start with.
+            batch_path (str): The path of the batch endpoint itself, which can not be nested.
+
+        Returns:
+            List[Dict[str, Any]]: A 'status' and 'body' for every sub-request, in the same order.
+        """
+        headers = {
+            name: request.headers[name]
+            for name in cls.FORWARDED_HEADERS
+            if name in request.headers
+        }
+        MetricsService.increment("batch.sub_requests", len(sub_requests))
+
+        return [
+            cls._dispatch_one(sub_request, headers, allowed_prefix, batch_path)
+            for sub_request in sub_requests
+        ]
+
+    @classmethod
+    def _dispatch_one(
+        cls,
+        sub_request: Dict[str, Any],
+        headers: Dict[str, str],
+        allowed_prefix: str,
+        batch_path: str,
+    ) -> Dict[str, Any]:
+        path = sub_request.get("path", "")
+        method = sub_request.get("method", "GET").upper()
+
+        if not path.startswith(allowed_prefix) or path.rstrip("/") == batch_path.rstrip("/"):
+            return {
+                "status": HttpStatus.BAD_REQUEST.value,
+                "body": {"message": f"Path '{path}' can not be used in a batch."},
+            }
+
+        builder = EnvironBuilder(
+            path=path,
+            method=method,
+            query_string=sub_request.get("query"),
+            json=sub_request.get("body"),
+            headers=headers,
+        )
+        environ = builder.get_environ()
+        app = current_app._get_current_object()
+
+        with db.atomic() as transaction:
+            with app.request_context(environ):
+                try:
+                    response = app.make_response(app.dispatch_request())
+                except Exception as e:
+                    response = app.make_response(app.handle_user_exception(e))
+            if response.is_streamed:
+                # Reading a stream such as the change feed would never end.
+                response.close()
+                transaction.rollback()
+                return {
+                    "status": HttpStatus.BAD_REQUEST.value,
+                    "body": {
+                        "message": f"Path '{path}' streams its response and can not be used in a batch."
+                    },
+                }
+            if response.status_code >= 400:
+                transaction.rollback()
+
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+
+        return {"status": response.status_code, "body": body}
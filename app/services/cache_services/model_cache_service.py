@@ -0,0 +1,439 @@
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+import redis
+from flask import current_app, has_app_context
+from peewee import Field, Model
+
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class ModelCacheService:
+    """
+    Two level read-through cache for primary-key lookups of opt-in models.
+
+    L1 is a small in-process LRU, L2 is Redis shared by every web and Celery worker.
+    Writes delete the Redis entry and publish the key on a pub/sub channel so every
+    process evicts its L1 copy as well. Models opt in with ``cache_ttl`` in their Meta
+    and can keep secret fields out of the cache with ``cache_exclude``. Instances
+    built from the cache have those fields unset.
+
+    Every invalidation also bumps a version of the row (and of the whole table
+    for ``invalidate_model``) in Redis. A reader takes the ``version`` before it
+    selects the row, and ``set`` only stores the row if the version is still
+    the same, so a row read before a write committed is never cached after its
+    invalidation. Invalidations that fail on a Redis error are retried before
+    the next cache call of the process, which does not use the cache until
+    they went through.
+    """
+
+    KEY_PREFIX = "model_cache"
+    VERSION_KEY_PREFIX = "model_cache_version"
+    INVALIDATION_CHANNEL = "model_cache:invalidate"
+    # KEYS: entry, row version, table version. ARGV: version read, payload, ttl.
+    SET_IF_CURRENT_SCRIPT = """
+        local current = (redis.call('GET', KEYS[2]) or '0') .. ':' .. (redis.call('GET', KEYS[3]) or '0')
+        if current ~= ARGV[1] then
+            return 0
+        end
+        redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+        return 1
+    """
+
+    _lock = threading.Lock()
+    _listener_lock = threading.Lock()
+    _l1: "OrderedDict[Tuple[str, str], Tuple[float, float, Dict[str, Any]]]" = (
+        OrderedDict()
+    )
+    _listener_pid: Optional[int] = None
+    _listener_thread = None
+    # (model, primary key) pairs whose invalidation failed, None as key for the whole model.
+    _pending_invalidations: Set[Tuple[Type[Model], Any]] = set()
+
+    @classmethod
+    def is_enabled(cls, model: Type[Model]) -> bool:
+        """
+        Checks if lookups for the given model should go through the cache.
+
+        Args:
+            model (Type[Model]): The model class to check.
+
+        Returns:
+            bool: True if caching is enabled globally, for the model and an app context is available.
+        """
+        return (
+            AppConfig.MODEL_CACHE_ENABLED
+            and getattr(model._meta, "cache_ttl", None)
+            and has_app_context()
+        )
+
+    @classmethod
+    def get(cls, model: Type[Model], pk: Any) -> Optional[Model]:
+        """
+        Returns a cached instance of the model, or None on a cache miss.
+
+        Args:
+            model (Type[Model]): The model class to look up.
+            pk (Any): The primary key of the row.
+
+        Returns:
+            Optional[Model]: A fresh model instance built from the cached data, None if not cached.
+        """
+        try:
+            redis_client = cls._get_redis()
+        except redis.RedisError as e:
+            MetricsService.increment("model_cache.errors")
+            LoggerSetup.get_logger("general").warning(f"Model cache unavailable: {e}")
+            return None
+
+        l1_key = (model._meta.table_name, str(pk))
+        now = time.monotonic()
+
+        with cls._lock:
+            entry = cls._l1.get(l1_key)
+            if entry is not None:
+                expires_at, cached_at, data = entry
+                if expires_at > now:
+                    cls._l1.move_to_end(l1_key)
+                else:
+                    del cls._l1[l1_key]
+                    entry = None
+
+        if entry is not None:
+            MetricsService.increment("model_cache.l1_hits")
+            MetricsService.observe("model_cache.l1_entry_age_seconds", now - cached_at)
+            return cls._build_instance(model, data)
+
+        try:
+            payload = redis_client.get(cls._redis_key(model, pk))
+        except redis.RedisError as e:
+            MetricsService.increment("model_cache.errors")
+            LoggerSetup.get_logger("general").warning(f"Model cache read failed: {e}")
+            return None
+
+        data = cls._deserialize(model, payload) if payload else None
+        if data is None:
+            MetricsService.increment("model_cache.misses")
+            return None
+
+        MetricsService.increment("model_cache.l2_hits")
+        cls._store_l1(l1_key, data)
+        return cls._build_instance(model, data)
+
+    @classmethod
+    def version(cls, model: Type[Model], pk: Any) -> Optional[str]:
+        """
+        Returns the invalidation version of a row, to be read before the row is
+        selected and passed to ``set``.
+
+        Args:
+            model (Type[Model]): The model class of the row.
+            pk (Any): The primary key of the row.
+
+        Returns:
+            Optional[str]: The version, None if Redis is unavailable.
+        """
+        table_name = model._meta.table_name
+        try:
+            row_version, table_version = cls._get_redis().mget(
+                cls._version_key(table_name, pk), cls._version_key(table_name)
+            )
+        except redis.RedisError as e:
+            MetricsService.increment("model_cache.errors")
+            LoggerSetup.get_logger("general").warning(f"Model cache unavailable: {e}")
+            return None
+        return f"{int(row_version or 0)}:{int(table_version or 0)}"
+
+    @classmethod
+    def set(cls, instance: Model, version: str) -> None:
+        """
+        Stores the instance in both cache levels, unless its row was invalidated
+        after ``version`` was read.
+
+        Args:
+            instance (Model): The model instance loaded from the database.
+            version (str): The ``version`` of the row, read before it was selected.
+        """
+        model = type(instance)
+        table_name = model._meta.table_name
+        data = {
+            field.name: instance.__data__.get(field.name)
+            for field in cls._cached_fields(model)
+        }
+
+        try:
+            redis_client = cls._get_redis()
+            stored = redis_client.register_script(cls.SET_IF_CURRENT_SCRIPT)(
+                keys=[
+                    cls._redis_key(model, instance._pk),
+                    cls._version_key(table_name, instance._pk),
+                    cls._version_key(table_name),
+                ],
+                args=[version, cls._serialize(model, data), int(model._meta.cache_ttl)],
+            )
+        except redis.RedisError as e:
+            MetricsService.increment("model_cache.errors")
+            LoggerSetup.get_logger("general").warning(f"Model cache write failed: {e}")
+            return
+
+        if not stored:
+            MetricsService.increment("model_cache.stale_writes_skipped")
+            return
+        cls._store_l1((table_name, str(instance._pk)), data)
+
+    @classmethod
+    def invalidate(cls, model: Type[Model], pks: Iterable[Any]) -> None:
+        """
+        Removes the given rows from Redis and broadcasts the eviction to every process.
+
+        Args:
+            model (Type[Model]): The model class the rows belong to.
+            pks (Iterable[Any]): Primary keys of the rows that were changed or deleted.
+        """
+        pks = list(pks)
+        if not pks:
+            return
+
+        table_name = model._meta.table_name
+        cls._evict_l1(table_name, pks)
+
+        try:
+            redis_client = cls._get_redis()
+            published_at = time.time()
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.delete(*[cls._redis_key(model, pk) for pk in pks])
+            for pk in pks:
+                # Readers that took the old version can no longer cache the row.
+                pipeline.incr(cls._version_key(table_name, pk))
+                pipeline.expire(cls._version_key(table_name, pk), cls._version_ttl(model))
+                pipeline.publish(
+                    cls.INVALIDATION_CHANNEL,
+                    json.dumps([table_name, pk, published_at], default=str),
+                )
+            pipeline.execute()
+            MetricsService.increment("model_cache.invalidations_sent", len(pks))
+        except redis.RedisError as e:
+            MetricsService.increment("model_cache.errors")
+            LoggerSetup.get_logger("general").error(
+                f"Model cache invalidation failed for {table_name} {pks}, retrying later: {e}"
+            )
+            with cls._lock:
+                cls._pending_invalidations.update((model, pk) for pk in pks)
+
+    @classmethod
+    def invalidate_model(cls, model: Type[Model]) -> None:
+        """
+        Drops every cached row of the model. Used when the changed primary keys are unknown.
+
+        Args:
+            model (Type[Model]): The model class to flush.
+        """
+        table_name = model._meta.table_name
+        with cls._lock:
+            for key in [key for key in cls._l1 if key[0] == table_name]:
+                del cls._l1[key]
+
+        try:
+            redis_client = cls._get_redis()
+            redis_client.incr(cls._version_key(table_name))
+            redis_client.expire(cls._version_key(table_name), cls._version_ttl(model))
+            keys = list(redis_client.scan_iter(f"{cls.KEY_PREFIX}:{table_name}:*"))
+            if keys:
+                redis_client.delete(*keys)
+            redis_client.publish(
+                cls.INVALIDATION_CHANNEL, json.dumps([table_name, None, time.time()])
+            )
+            MetricsService.increment("model_cache.model_flushes")
+        except redis.RedisError as e:
+            MetricsService.increment("model_cache.errors")
+            LoggerSetup.get_logger("general").error(
+                f"Model cache flush failed for {table_name}, retrying later: {e}"
+            )
+            with cls._lock:
+                cls._pending_invalidations.add((model, None))
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Returns hit ratio and staleness statistics for the current process.
+
+        Returns:
+            Dict[str, Any]: Hit counters, hit ratio, L1 size and staleness observations.
+        """
+        l1_hits = MetricsService.get_counter("model_cache.l1_hits")
+        l2_hits = MetricsService.get_counter("model_cache.l2_hits")
+        misses = MetricsService.get_counter("model_cache.misses")
+        lookups = l1_hits + l2_hits + misses
+        observations = MetricsService.snapshot()["observations"]
+
+        with cls._lock:
+            l1_size = len(cls._l1)
+
+        return {
+            "l1_hits": l1_hits,
+            "l2_hits": l2_hits,
+            "misses": misses,
+            "hit_ratio": (l1_hits + l2_hits) / lookups if lookups else None,
+            "l1_size": l1_size,
+            "invalidations_sent": MetricsService.get_counter(
+                "model_cache.invalidations_sent"
+            ),
+            "invalidations_received": MetricsService.get_counter(
+                "model_cache.invalidations_received"
+            ),
+            "l1_entry_age_seconds": observations.get(
+                "model_cache.l1_entry_age_seconds"
+            ),
+            "invalidation_lag_seconds": observations.get(
+                "model_cache.invalidation_lag_seconds"
+            ),
+        }
+
+    @classmethod
+    def _get_redis(cls) -> redis.Redis:
+        redis_client = current_app.redis
+        cls._ensure_listener(redis_client)
+        if cls._pending_invalidations:
+            cls._retry_invalidations()
+        return redis_client
+
+    @classmethod
+    def _retry_invalidations(cls) -> None:
+        # Other processes may still serve the rows from Redis, so the failed
+        # invalidations are sent before this process uses the cache again.
+        with cls._lock:
+            pending = list(cls._pending_invalidations)
+            cls._pending_invalidations.clear()
+        by_model: Dict[Type[Model], List[Any]] = {}
+        for model, pk in pending:
+            by_model.setdefault(model, []).append(pk)
+        for model, pks in by_model.items():
+            if None in pks:
+                cls.invalidate_model(model)
+            else:
+                cls.invalidate(model, pks)
+        if cls._pending_invalidations:
+            raise redis.ConnectionError("Model cache invalidations are still pending")
+
+    @classmethod
+    def _ensure_listener(cls, redis_client: redis.Redis) -> None:
+        # The listener is started lazily and per pid, so forked gunicorn and
+        # Celery workers each get their own subscriber thread.
+        if cls._listener_pid == os.getpid():
+            return
+
+        with cls._listener_lock:
+            if cls._listener_pid == os.getpid():
+                return
+            with cls._lock:
+                cls._l1.clear()
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{cls.INVALIDATION_CHANNEL: cls._on_invalidation})
+            cls._listener_thread = pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=cls._on_listener_error,
+            )
+            cls._listener_pid = os.getpid()
+
+    @classmethod
+    def _on_invalidation(cls, message: Dict[str, Any]) -> None:
+        table_name, pk, published_at = json.loads(message["data"])
+        MetricsService.increment("model_cache.invalidations_received")
+        MetricsService.observe(
+            "model_cache.invalidation_lag_seconds", max(time.time() - published_at, 0)
+        )
+
+        if pk is None:
+            with cls._lock:
+                for key in [key for key in cls._l1 if key[0] == table_name]:
+                    del cls._l1[key]
+        else:
+            cls._evict_l1(table_name, [pk])
+
+    @classmethod
+    def _on_listener_error(cls, exception, pubsub, thread) -> None:
+        # Anything published while the connection was down is lost, so drop
+        # the whole L1. The worker thread reconnects on its next poll.
+        MetricsService.increment("model_cache.listener_errors")
+        LoggerSetup.get_logger("general").error(
+            f"Model cache invalidation listener error: {exception}"
+        )
+        with cls._lock:
+            cls._l1.clear()
+        time.sleep(1.0)
+
+    @classmethod
+    def _store_l1(cls, l1_key: Tuple[str, str], data: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with cls._lock:
+            cls._l1[l1_key] = (now + AppConfig.MODEL_CACHE_L1_TTL, now, data)
+            cls._l1.move_to_end(l1_key)
+            while len(cls._l1) > AppConfig.MODEL_CACHE_L1_MAX_SIZE:
+                cls._l1.popitem(last=False)
+
+    @classmethod
+    def _evict_l1(cls, table_name: str, pks: Iterable[Any]) -> None:
+        with cls._lock:
+            for pk in pks:
+                cls._l1.pop((table_name, str(pk)), None)
+
+    @classmethod
+    def _redis_key(cls, model: Type[Model], pk: Any) -> str:
+        return f"{cls.KEY_PREFIX}:{model._meta.table_name}:{pk}"
+
+    @classmethod
+    def _version_key(cls, table_name: str, pk: Any = None) -> str:
+        if pk is None:
+            return f"{cls.VERSION_KEY_PREFIX}:{table_name}"
+        return f"{cls.VERSION_KEY_PREFIX}:{table_name}:{pk}"
+
+    @staticmethod
+    def _version_ttl(model: Type[Model]) -> int:
+        # Only reads in flight compare versions, an expired version only makes
+        # them skip the write.
+        return int(getattr(model._meta, "cache_ttl", None) or AppConfig.MODEL_CACHE_TTL)
+
+    @staticmethod
+    def _cached_fields(model: Type[Model]) -> List[Field]:
+        excluded = getattr(model._meta, "cache_exclude", ())
+        return [field for field in model._meta.sorted_fields if field.name not in excluded]
+
+    @classmethod
+    def _fingerprint(cls, model: Type[Model]) -> int:
+        return zlib.crc32(
+            ",".join(field.name for field in cls._cached_fields(model)).encode()
+        )
+
+    @classmethod
+    def _serialize(cls, model: Type[Model], data: Dict[str, Any]) -> bytes:
+        # Values are stored positionally in field order behind a schema
+        # fingerprint, which keeps payloads small and lets a deploy that
+        # changes the columns treat old entries as misses.
+        values = [data.get(field.name) for field in cls._cached_fields(model)]
+        return json.dumps(
+            [cls._fingerprint(model), *values], separators=(",", ":"), default=str
+        ).encode()
+
+    @classmethod
+    def _deserialize(cls, model: Type[Model], payload: bytes) -> Optional[Dict[str, Any]]:
+        fingerprint, *values = json.loads(payload)
+        if fingerprint != cls._fingerprint(model):
+            return None
+        return {
+            field.name: field.python_value(value) if value is not None else None
+            for field, value in zip(cls._cached_fields(model), values)
+        }
+
+    @staticmethod
+    def _build_instance(model: Type[Model], data: Dict[str, Any]) -> Model:
+        instance = model(__no_default__=1, **data)
+        instance._dirty.clear()
+        return instance
@@ -1,5 +1,15 @@
 from flask import Flask
 from celery import Celery, Task
+from celery.signals import before_task_publish, task_postrun, task_prerun
+
+from app.services.memory_diagnostics_service import MemoryDiagnosticsService
+from app.services.tracing_service import TracingService
+from app.tasks.memory_diagnostics_task import memory_diagnostics_task
+from app.tasks.outbox_relay_task import relay_outbox_task
+from app.tasks.user_archive_task import archive_inactive_users_task
+from app.tasks.user_stats_task import refresh_user_stats_task
+from app.tasks.user_sync_task import purge_user_tombstones_task
+from config.app_config import AppConfig
 
 
 class CeleryService:
@@ -7,7 +17,14 @@ class CeleryService:
     def celery_init_app(app: Flask) -> Celery:
         class FlaskTask(Task):
             def __call__(self, *args: object, **kwargs: object) -> object:
-                with app.app_context():
+                # Continues the trace of the request or task that sent it, see
+                # TracingService.inject_headers.
+                with app.app_context(), TracingService.trace(
+                    self.name,
+                    self.request.get("traceparent"),
+                    kind="consumer",
+                    attributes={"celery.task_id": self.request.id},
+                ):
                     return self.run(*args, **kwargs)
 
         celery_app = Celery(app.name, task_cls=FlaskTask)
@@ -15,7 +32,58 @@ class CeleryService:
             broker_url=app.config.get("CELERY_BROKER_URL"),
             result_backend=app.config.get("CELERY_RESULT_BACKEND"),
             task_ignore_result=app.config.get("CELERY_TASK_IGNORE_RESULT", True),
+            # Prefork replaces a worker process after the task that pushed it
+            # over this resident memory (in KiB).
+            worker_max_memory_per_child=(
+                AppConfig.CELERY_WORKER_MAX_MEMORY_PER_CHILD_MB * 1024 or None
+            ),
+            # Consumed only by the single-process celery_diagnostics_worker, so
+            # consecutive memory snapshots are taken in the same process.
+            task_routes={
+                memory_diagnostics_task.name: {"queue": AppConfig.MEMORY_DIAGNOSTICS_QUEUE},
+            },
+            # Run with `celery -A app.make_celery beat`. A refresh that could
+            # not start before the next one is due is dropped.
+            beat_schedule={
+                "refresh-user-stats": {
+                    "task": refresh_user_stats_task.name,
+                    "schedule": AppConfig.USER_STATS_REFRESH_SECONDS,
+                    "options": {"expires": AppConfig.USER_STATS_REFRESH_SECONDS},
+                },
+                "relay-outbox": {
+                    "task": relay_outbox_task.name,
+                    "schedule": AppConfig.OUTBOX_RELAY_SECONDS,
+                    "options": {"expires": AppConfig.OUTBOX_RELAY_SECONDS},
+                },
+                "archive-inactive-users": {
+                    "task": archive_inactive_users_task.name,
+                    "schedule": AppConfig.USER_ARCHIVE_INTERVAL_SECONDS,
+                    "options": {"expires": AppConfig.USER_ARCHIVE_INTERVAL_SECONDS},
+                },
+                "purge-user-tombstones": {
+                    "task": purge_user_tombstones_task.name,
+                    "schedule": AppConfig.USER_SYNC_TOMBSTONE_PURGE_SECONDS,
+                    "options": {"expires": AppConfig.USER_SYNC_TOMBSTONE_PURGE_SECONDS},
+                },
+            },
         )
+        if AppConfig.TRACING_ENABLED:
+            before_task_publish.connect(
+                TracingService.inject_headers,
+                weak=False,
+                dispatch_uid="tracing_inject_headers",
+            )
+        if AppConfig.MEMORY_TASK_TRACKING_ENABLED:
+            task_prerun.connect(
+                MemoryDiagnosticsService.track_task_start,
+                weak=False,
+                dispatch_uid="memory_diagnostics_task_start",
+            )
+            task_postrun.connect(
+                MemoryDiagnosticsService.track_task_end,
+                weak=False,
+                dispatch_uid="memory_diagnostics_task_end",
+            )
         celery_app.set_default()
         app.extensions["celery"] = celery_app
         return celery_app
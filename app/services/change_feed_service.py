@@ -0,0 +1,193 @@
+import json
+import os
+import queue
+import threading
+from typing import Any, Iterator, List, Optional, Tuple, Type
+
+import redis
+from flask import current_app, has_app_context
+from peewee import Model
+
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class _FeedClient:
+    def __init__(self):
+        self.queue: "queue.Queue[Tuple[str, str]]" = queue.Queue(
+            maxsize=AppConfig.CHANGE_FEED_CLIENT_QUEUE_SIZE
+        )
+        self.dropped = False
+
+
+class ChangeFeedService:
+    """
+    Live feed of model changes for server-sent events.
+
+    Writes of models with ``change_feed = True`` in their Meta are appended to a
+    capped Redis stream. Each process runs a single listener thread that reads
+    the stream and fans events out to the bounded queues of its connected
+    clients. Clients that fall behind are dropped instead of buffered, and can
+    reconnect with Last-Event-ID to replay what they missed from the stream.
+    """
+
+    STREAM_KEY = "change_feed:events"
+
+    _lock = threading.Lock()
+    _clients: List[_FeedClient] = []
+    _listener_pid: Optional[int] = None
+
+    @classmethod
+    def is_enabled(cls, model: Type[Model]) -> bool:
+        """
+        Checks if writes of the given model should be published to the feed.
+        """
+        return (
+            AppConfig.CHANGE_FEED_ENABLED
+            and getattr(model._meta, "change_feed", False)
+            and has_app_context()
+        )
+
+    @classmethod
+    def publish(
+        cls, model: Type[Model], pk: Any, action: str, fields: Optional[List[str]] = None
+    ) -> None:
+        """
+        Appends a change event to the feed. Field values are never published.
+
+        Args:
+            model (Type[Model]): The model class that was changed.
+            pk (Any): The primary key of the changed row.
+            action (str): The kind of change ('created', 'updated' or 'deleted').
+            fields (Optional[List[str]]): Names of the changed fields.
+        """
+        event = {
+            "model": model._meta.table_name,
+            "id": pk,
+            "action": action,
+            "fields": fields or [],
+        }
+        try:
+            current_app.redis.xadd(
+                cls.STREAM_KEY,
+                {"data": json.dumps(event, default=str)},
+                maxlen=AppConfig.CHANGE_FEED_MAX_LEN,
+                approximate=True,
+            )
+            MetricsService.increment("change_feed.published")
+        except redis.RedisError as e:
+            MetricsService.increment("change_feed.errors")
+            LoggerSetup.get_logger("general").error(
+                f"Failed to publish change event {event}: {e}"
+            )
+
+    @classmethod
+    def stream(cls, redis_client: redis.Redis, last_event_id: Optional[str]) -> Iterator[str]:
+        """
+        Yields server-sent events for one client until it disconnects or is dropped.
+
+        Args:
+            redis_client (redis.Redis): The Redis client used to replay missed events.
+            last_event_id (Optional[str]): The last event ID the client received, if resuming.
+
+        Yields:
+            str: Server-sent event messages, including heartbeat comments.
+        """
+        cls._ensure_listener(redis_client)
+        client = _FeedClient()
+        with cls._lock:
+            cls._clients.append(client)
+        MetricsService.set_gauge("change_feed.clients", len(cls._clients))
+
+        try:
+            yield f"retry: {AppConfig.CHANGE_FEED_RETRY_MS}\n\n"
+
+            # The client is registered before replaying, so events published
+            # meanwhile are queued and de-duplicated by ID below.
+            last_sent = last_event_id
+            if last_event_id:
+                replay = redis_client.xrange(
+                    cls.STREAM_KEY,
+                    min=f"({last_event_id}",
+                    count=AppConfig.CHANGE_FEED_MAX_LEN,
+                )
+                for event_id, fields in replay:
+                    event_id = event_id.decode()
+                    yield cls._format_event(event_id, fields[b"data"].decode())
+                    last_sent = event_id
+
+            while True:
+                if client.dropped:
+                    MetricsService.increment("change_feed.clients_dropped")
+                    yield 'event: dropped\ndata: {"message": "Client too slow, reconnect to resume."}\n\n'
+                    return
+                try:
+                    event_id, data = client.queue.get(
+                        timeout=AppConfig.CHANGE_FEED_HEARTBEAT_SECONDS
+                    )
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if last_sent and cls._parse_id(event_id) <= cls._parse_id(last_sent):
+                    continue
+                yield cls._format_event(event_id, data)
+                last_sent = event_id
+        finally:
+            with cls._lock:
+                if client in cls._clients:
+                    cls._clients.remove(client)
+            MetricsService.set_gauge("change_feed.clients", len(cls._clients))
+
+    @classmethod
+    def _ensure_listener(cls, redis_client: redis.Redis) -> None:
+        with cls._lock:
+            if cls._listener_pid == os.getpid():
+                return
+            cls._clients = []
+            latest = redis_client.xrevrange(cls.STREAM_KEY, count=1)
+            last_id = latest[0][0].decode() if latest else "0-0"
+            threading.Thread(
+                target=cls._listen, args=(redis_client, last_id), daemon=True
+            ).start()
+            cls._listener_pid = os.getpid()
+
+    @classmethod
+    def _listen(cls, redis_client: redis.Redis, last_id: str) -> None:
+        # Reading from an explicit ID instead of "$" keeps events published
+        # between two blocking reads.
+        logger = LoggerSetup.get_logger("general")
+        while True:
+            try:
+                response = redis_client.xread(
+                    {cls.STREAM_KEY: last_id}, block=5000, count=100
+                )
+            except redis.RedisError as e:
+                MetricsService.increment("change_feed.errors")
+                logger.error(f"Change feed listener error: {e}")
+                threading.Event().wait(1.0)
+                continue
+
+            for _, events in response or []:
+                for event_id, fields in events:
+                    last_id = event_id.decode()
+                    cls._fan_out(last_id, fields[b"data"].decode())
+
+    @classmethod
+    def _fan_out(cls, event_id: str, data: str) -> None:
+        with cls._lock:
+            clients = list(cls._clients)
+        for client in clients:
+            try:
+                client.queue.put_nowait((event_id, data))
+            except queue.Full:
+                client.dropped = True
+
+    @staticmethod
+    def _format_event(event_id: str, data: str) -> str:
+        return f"id: {event_id}\nevent: change\ndata: {data}\n\n"
+
+    @staticmethod
+    def _parse_id(event_id: str) -> Tuple[int, int]:
+        milliseconds, _, sequence = event_id.partition("-")
+        return int(milliseconds), int(sequence or 0)
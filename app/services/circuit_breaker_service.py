@@ -0,0 +1,236 @@
+import threading
+import time
+from typing import Any, Dict
+
+import redis
+from peewee import InterfaceError, OperationalError
+
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from app.services.tracing_service import TracedPipeline, TracedPostgresqlDatabase, TracedRedis
+from config.app_config import AppConfig
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a dependency whose circuit breaker is open.
+    """
+
+
+class DatabaseCircuitOpenError(CircuitOpenError, OperationalError):
+    """
+    Raised by the database while Postgres is considered down. Being an
+    ``OperationalError``, it is handled wherever database errors are.
+    """
+
+
+class RedisCircuitOpenError(CircuitOpenError, redis.ConnectionError):
+    """
+    Raised by the Redis client while Redis is considered down. Being a
+    ``redis.ConnectionError``, callers that degrade on Redis errors (the model
+    cache, token revocation checks) do so without waiting for a timeout.
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-process circuit breaker of a dependency.
+
+    After CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failed calls the circuit
+    opens and calls fail immediately for CIRCUIT_BREAKER_COOLDOWN_SECONDS. Then
+    a single trial call is let through: the circuit closes when it succeeds
+    and opens again when it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _registry: Dict[str, "CircuitBreaker"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @classmethod
+    def get(cls, name: str) -> "CircuitBreaker":
+        """
+        Returns the breaker of a dependency, created on first use.
+        """
+        breaker = cls._registry.get(name)
+        if breaker is None:
+            with cls._registry_lock:
+                breaker = cls._registry.setdefault(name, cls(name))
+        return breaker
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the state, consecutive failures and remaining cooldown of every breaker.
+        """
+        return {
+            name: {
+                "state": breaker._state,
+                "failures": breaker._failures,
+                "retry_after_seconds": breaker.retry_after(),
+            }
+            for name, breaker in list(cls._registry.items())
+        }
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call may be made now. Moves an open circuit whose
+        cooldown is over to half-open and lets the caller make the trial call.
+        """
+        if self._state == self.CLOSED or not AppConfig.CIRCUIT_BREAKER_ENABLED:
+            return True
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self.retry_after() == 0:
+                self._state = self.HALF_OPEN
+                return True
+        MetricsService.increment(f"circuit_breaker.{self.name}.rejected")
+        return False
+
+    def retry_after(self) -> float:
+        """
+        Returns the seconds until the circuit lets a call through again, 0 if it does now.
+        """
+        if self._state != self.OPEN:
+            return 0.0
+        elapsed = time.monotonic() - self._opened_at
+        return max(AppConfig.CIRCUIT_BREAKER_COOLDOWN_SECONDS - elapsed, 0.0)
+
+    def is_open(self) -> bool:
+        """
+        Returns whether calls are currently rejected without a trial.
+        """
+        return AppConfig.CIRCUIT_BREAKER_ENABLED and self.retry_after() > 0
+
+    def record_success(self) -> None:
+        if self._state == self.CLOSED and not self._failures:
+            return
+        with self._lock:
+            if self._state != self.CLOSED:
+                LoggerSetup.get_logger("general").info(f"Circuit breaker {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED
+                and self._failures >= AppConfig.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                opened = True
+            else:
+                opened = False
+        if opened:
+            MetricsService.increment(f"circuit_breaker.{self.name}.opened")
+            LoggerSetup.get_logger("general").error(
+                f"Circuit breaker {self.name} opened after {self._failures} consecutive failures"
+            )
+
+
+class GuardedPostgresqlDatabase(TracedPostgresqlDatabase):
+    """
+    Database whose statements go through the 'postgres' circuit breaker.
+    Errors of the connection count as failures: SQLSTATE class 08, a server
+    shutting down or not accepting connections (57P0x), and driver errors
+    without a SQLSTATE, such as a closed connection. Other errors (constraint
+    violations, bad SQL, lock timeouts, deadlocks, serialization failures)
+    mean Postgres answered. So do cancelled statements, which are counted by
+    StatementTimeoutService instead.
+    """
+
+    CONNECTION_FAILURE_CLASSES = ("08", "57P")
+
+    def execute_sql(self, sql, params=None, commit=None):
+        breaker = CircuitBreaker.get("postgres")
+        if not breaker.allow():
+            raise DatabaseCircuitOpenError("Postgres is unavailable (circuit breaker open)")
+        failed = False
+        try:
+            return super().execute_sql(sql, params, commit)
+        except (OperationalError, InterfaceError) as e:
+            # Imported here, the service itself needs the database of app.db_init.
+            from app.services.statement_timeout_service import StatementTimeoutService
+
+            if StatementTimeoutService.is_query_canceled(e):
+                StatementTimeoutService.record_cancellation()
+                raise
+            failed = self.is_connection_failure(e)
+            if failed:
+                breaker.record_failure()
+            raise
+        finally:
+            if not failed:
+                breaker.record_success()
+
+    @classmethod
+    def is_connection_failure(cls, error: Exception) -> bool:
+        """
+        Returns whether a database error means Postgres could not be reached.
+        """
+        if isinstance(error, InterfaceError):
+            return True
+        pgcode = getattr(getattr(error, "orig", None), "pgcode", None)
+        return pgcode is None or pgcode.startswith(cls.CONNECTION_FAILURE_CLASSES)
+
+    def _initialize_connection(self, conn):
+        from app.services.statement_timeout_service import StatementTimeoutService
+
+        StatementTimeoutService.on_connect(conn)
+
+
+class GuardedRedis(TracedRedis):
+    """
+    Redis client whose commands and pipelines go through the 'redis' circuit breaker.
+    """
+
+    FAILURES = (redis.ConnectionError, redis.TimeoutError)
+
+    def execute_command(self, *args, **options):
+        breaker = CircuitBreaker.get("redis")
+        if not breaker.allow():
+            raise RedisCircuitOpenError("Redis is unavailable (circuit breaker open)")
+        failed = False
+        try:
+            return super().execute_command(*args, **options)
+        except self.FAILURES:
+            failed = True
+            breaker.record_failure()
+            raise
+        finally:
+            if not failed:
+                breaker.record_success()
+
+    def pipeline(self, transaction=True, shard_hint=None) -> "GuardedPipeline":
+        return GuardedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class GuardedPipeline(TracedPipeline):
+    def execute(self, raise_on_error=True):
+        breaker = CircuitBreaker.get("redis")
+        if not breaker.allow():
+            raise RedisCircuitOpenError("Redis is unavailable (circuit breaker open)")
+        failed = False
+        try:
+            return super().execute(raise_on_error)
+        except GuardedRedis.FAILURES:
+            failed = True
+            breaker.record_failure()
+            raise
+        finally:
+            if not failed:
+                breaker.record_success()
@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask
+
+from app.db_init import db
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class HealthCheckService:
+    """
+    Readiness report of the services the app depends on.
+
+    Postgres, Redis, the Celery broker and the Celery workers are probed
+    concurrently, each bounded by HEALTH_CHECK_TIMEOUT_SECONDS. Only the
+    dependencies in HEALTH_CHECK_CRITICAL fail readiness. The others, by
+    default the Celery broker and workers, only make the report 'degraded',
+    since the web tier still serves requests without them. The report is
+    cached for HEALTH_CHECK_CACHE_SECONDS and refreshed by a single caller at a
+    time, so frequent load balancer probes do not multiply the load on the
+    dependencies.
+
+    Every probe runs in a daemon thread of its own that is abandoned when it
+    times out. A probe still running from an earlier report is waited for
+    instead of starting another, so a hanging dependency holds one thread and
+    does not delay the probes of the others.
+    """
+
+    _lock = threading.Lock()
+    _in_flight: Dict[str, Future] = {}
+    _report: Optional[Dict[str, Any]] = None
+    _checked_at = 0.0
+
+    @classmethod
+    def get_report(cls, app: Flask, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Returns the readiness report, probing the dependencies if the cached one expired.
+
+        Args:
+            app (Flask): The Flask application holding the Redis and Celery clients.
+            use_cache (bool): Whether a cached report may be returned.
+
+        Returns:
+            Dict[str, Any]: 'status' ('ok', 'degraded' if only non-critical dependencies
+            failed, or 'error'), 'checked_at' and a 'checks' entry with status,
+            latency, criticality and details for every dependency.
+        """
+        with cls._lock:
+            if (
+                use_cache
+                and cls._report is not None
+                and time.monotonic() - cls._checked_at < AppConfig.HEALTH_CHECK_CACHE_SECONDS
+            ):
+                return cls._report
+
+            cls._report = cls._probe_all(app)
+            cls._checked_at = time.monotonic()
+            return cls._report
+
+    @classmethod
+    def _probe_all(cls, app: Flask) -> Dict[str, Any]:
+        probes: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {
+            "database": cls._probe_database,
+            "redis": app.redis.ping,
+            "celery_broker": lambda: cls._probe_celery_broker(app),
+            "celery_workers": lambda: cls._probe_celery_workers(app),
+        }
+        futures = {name: cls._start(name, probe) for name, probe in probes.items()}
+
+        timeout = AppConfig.HEALTH_CHECK_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout
+        checks = {}
+        for name, future in futures.items():
+            try:
+                checks[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                checks[name] = {
+                    "status": "error",
+                    "latency_ms": round(timeout * 1000, 2),
+                    "error": f"Timed out after {timeout}s.",
+                }
+            checks[name]["critical"] = name in AppConfig.HEALTH_CHECK_CRITICAL
+            MetricsService.increment(f"health.{name}.{checks[name]['status']}")
+
+        failed = [check for check in checks.values() if check["status"] != "ok"]
+        if any(check["critical"] for check in failed):
+            status = "error"
+        elif failed:
+            status = "degraded"
+        else:
+            status = "ok"
+        return {"status": status, "checked_at": time.time(), "checks": checks}
+
+    @classmethod
+    def _start(cls, name: str, probe: Callable[[], Optional[Dict[str, Any]]]) -> Future:
+        future = cls._in_flight.get(name)
+        if future is not None and not future.done():
+            return future
+
+        future = Future()
+        threading.Thread(
+            target=lambda: future.set_result(cls._timed(probe)),
+            name=f"health-check-{name}",
+            daemon=True,
+        ).start()
+        cls._in_flight[name] = future
+        return future
+
+    @staticmethod
+    def _timed(probe: Callable[[], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            details = probe()
+            result = {"status": "ok"}
+            if isinstance(details, dict):
+                result.update(details)
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    @staticmethod
+    def _probe_database() -> None:
+        # Every probe has a thread of its own, so its connection is closed
+        # rather than left to the thread's exit.
+        db.connect(reuse_if_open=True)
+        try:
+            db.execute_sql("SELECT 1").fetchone()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _probe_celery_broker(app: Flask) -> None:
+        with app.celery_client.connection_for_read() as connection:
+            connection.ensure_connection(
+                max_retries=1, timeout=AppConfig.HEALTH_CHECK_TIMEOUT_SECONDS
+            )
+
+    @staticmethod
+    def _probe_celery_workers(app: Flask) -> Dict[str, Any]:
+        replies = app.celery_client.control.ping(
+            timeout=AppConfig.HEALTH_CHECK_TIMEOUT_SECONDS / 2
+        )
+        workers = sorted(hostname for reply in replies for hostname in reply)
+        if not workers:
+            raise RuntimeError("No Celery workers replied.")
+        return {"workers": workers}
@@ -0,0 +1,204 @@
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class MemoryDiagnosticsService:
+    """
+    Memory diagnostics of the current process based on ``tracemalloc``.
+
+    Tracing starts with the first snapshot (or at startup with PYTHONTRACEMALLOC),
+    so processes that are never inspected pay nothing. The last
+    MEMORY_SNAPSHOT_LIMIT snapshots are kept, and reports compare the newest one
+    with the previous and with the oldest snapshot to show which allocation
+    sites keep growing. Celery tasks are additionally tracked by the resident
+    memory they add to their worker process.
+    """
+
+    SNAPSHOT_FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+    KEY_TYPES = ("lineno", "filename", "traceback")
+
+    _lock = threading.Lock()
+    _snapshots: List[Tuple[float, tracemalloc.Snapshot]] = []
+    _task_rss: Dict[str, int] = {}
+
+    @classmethod
+    def take_snapshot(cls, limit: int = 10, key_type: str = "lineno") -> Dict[str, Any]:
+        """
+        Takes a snapshot of the traced allocations, starting tracing if needed.
+
+        Args:
+            limit (int): The number of allocation sites listed per section.
+            key_type (str): How allocations are grouped ('lineno', 'filename' or 'traceback').
+
+        Returns:
+            Dict[str, Any]: The report described in ``get_report``.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(AppConfig.MEMORY_TRACEMALLOC_FRAMES)
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(cls.SNAPSHOT_FILTERS)
+        with cls._lock:
+            cls._snapshots.append((time.time(), snapshot))
+            del cls._snapshots[: -AppConfig.MEMORY_SNAPSHOT_LIMIT]
+        return cls.get_report(limit, key_type)
+
+    @classmethod
+    def get_report(cls, limit: int = 10, key_type: str = "lineno") -> Dict[str, Any]:
+        """
+        Builds a report from the snapshots taken so far, without taking a new one.
+
+        Args:
+            limit (int): The number of allocation sites listed per section.
+            key_type (str): How allocations are grouped ('lineno', 'filename' or 'traceback').
+
+        Returns:
+            Dict[str, Any]: Process and tracing totals, the kept snapshots, the
+            top allocation sites of the newest snapshot and its growth since
+            the previous and the oldest snapshot.
+
+        Raises:
+            ValueError: If the key type is not supported.
+        """
+        if key_type not in cls.KEY_TYPES:
+            raise ValueError(
+                f"Invalid key type '{key_type}', expected one of {', '.join(cls.KEY_TYPES)}."
+            )
+
+        with cls._lock:
+            snapshots = list(cls._snapshots)
+
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "pid": os.getpid(),
+            "tracing": tracemalloc.is_tracing(),
+            "rss_bytes": cls.current_rss_bytes(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "snapshots": [
+                {
+                    "taken_at": taken_at,
+                    "size_bytes": sum(
+                        stat.size for stat in snapshot.statistics("filename")
+                    ),
+                }
+                for taken_at, snapshot in snapshots
+            ],
+            "top": [],
+            "growth_since_previous": [],
+            "growth_since_first": [],
+        }
+        if not snapshots:
+            return report
+
+        newest = snapshots[-1][1]
+        report["top"] = [
+            cls._format_stat(stat) for stat in newest.statistics(key_type)[:limit]
+        ]
+        if len(snapshots) > 1:
+            report["growth_since_previous"] = cls._growth(
+                newest, snapshots[-2][1], key_type, limit
+            )
+            report["growth_since_first"] = cls._growth(
+                newest, snapshots[0][1], key_type, limit
+            )
+        return report
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Stops tracing and drops the kept snapshots.
+        """
+        with cls._lock:
+            cls._snapshots = []
+        tracemalloc.stop()
+
+    @staticmethod
+    def current_rss_bytes() -> int:
+        """
+        Returns the resident memory of the process, or its peak where the
+        current value is not available.
+        """
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @classmethod
+    def track_task_start(cls, task_id: Optional[str] = None, **kwargs) -> None:
+        """
+        Records the resident memory before a Celery task runs (task_prerun signal).
+        """
+        if task_id is not None:
+            cls._task_rss[task_id] = cls.current_rss_bytes()
+
+    @classmethod
+    def track_task_end(cls, task_id: Optional[str] = None, task=None, **kwargs) -> None:
+        """
+        Records how much resident memory a Celery task added (task_postrun signal)
+        and logs tasks that grew the process by more than MEMORY_TASK_RSS_WARNING_MB
+        or left it above CELERY_WORKER_MAX_MEMORY_PER_CHILD_MB, which makes Celery
+        replace the worker process.
+        """
+        rss_before = cls._task_rss.pop(task_id, None)
+        if rss_before is None or task is None:
+            return
+
+        rss_after = cls.current_rss_bytes()
+        growth = rss_after - rss_before
+        MetricsService.observe(f"celery.task_rss_growth_bytes.{task.name}", growth)
+
+        logger = LoggerSetup.get_logger("general")
+        max_memory = AppConfig.CELERY_WORKER_MAX_MEMORY_PER_CHILD_MB * 1024 * 1024
+        if max_memory and rss_after > max_memory:
+            logger.warning(
+                f"Task {task.name} [{task_id}] left worker {os.getpid()} at {rss_after} bytes RSS "
+                f"(+{growth}), above the recycling threshold, the worker process will be replaced."
+            )
+        elif growth > AppConfig.MEMORY_TASK_RSS_WARNING_MB * 1024 * 1024:
+            logger.warning(
+                f"Task {task.name} [{task_id}] grew worker {os.getpid()} by {growth} bytes RSS "
+                f"to {rss_after} bytes."
+            )
+
+    @classmethod
+    def _growth(
+        cls,
+        newest: tracemalloc.Snapshot,
+        older: tracemalloc.Snapshot,
+        key_type: str,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        return [
+            cls._format_stat(stat)
+            for stat in newest.compare_to(older, key_type)[:limit]
+        ]
+
+    @staticmethod
+    def _format_stat(stat) -> Dict[str, Any]:
+        formatted = {
+            "site": (
+                str(stat.traceback)
+                if len(stat.traceback) == 1
+                else stat.traceback.format()
+            ),
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        if hasattr(stat, "size_diff"):
+            formatted["size_diff_bytes"] = stat.size_diff
+            formatted["count_diff"] = stat.count_diff
+        return formatted
@@ -0,0 +1,93 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+
+class MetricsService:
+    """
+    Process-local registry for counters, gauges and timing observations.
+
+    Values are kept per worker process, so every gunicorn or Celery worker
+    reports its own numbers.
+    """
+
+    _lock = threading.Lock()
+    _counters: Dict[str, float] = defaultdict(float)
+    _gauges: Dict[str, float] = {}
+    _observations: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def increment(cls, name: str, value: float = 1) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The name of the counter.
+            value (float): The amount to add to the counter.
+        """
+        with cls._lock:
+            cls._counters[name] += value
+
+    @classmethod
+    def set_gauge(cls, name: str, value: float) -> None:
+        """
+        Sets a gauge to the given value.
+
+        Args:
+            name (str): The name of the gauge.
+            value (float): The current value of the gauge.
+        """
+        with cls._lock:
+            cls._gauges[name] = value
+
+    @classmethod
+    def observe(cls, name: str, value: float) -> None:
+        """
+        Records a single observation (usually a duration in seconds).
+
+        Args:
+            name (str): The name of the observed metric.
+            value (float): The observed value.
+        """
+        with cls._lock:
+            observation = cls._observations.get(name)
+            if observation is None:
+                cls._observations[name] = {
+                    "count": 1,
+                    "sum": value,
+                    "max": value,
+                }
+                return
+            observation["count"] += 1
+            observation["sum"] += value
+            observation["max"] = max(observation["max"], value)
+
+    @classmethod
+    def get_counter(cls, name: str) -> float:
+        """
+        Returns the current value of a counter, 0 if it was never incremented.
+        """
+        with cls._lock:
+            return cls._counters.get(name, 0)
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Any]:
+        """
+        Returns a copy of all metrics collected by the current process.
+
+        Returns:
+            Dict[str, Any]: Counters, gauges and observations (count, sum, avg and max).
+        """
+        with cls._lock:
+            observations = {
+                name: {
+                    **observation,
+                    "avg": observation["sum"] / observation["count"],
+                }
+                for name, observation in cls._observations.items()
+            }
+            return {
+                "counters": dict(cls._counters),
+                "gauges": dict(cls._gauges),
+                "observations": observations,
+            }
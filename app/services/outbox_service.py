@@ -0,0 +1,246 @@
+import functools
+import json
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import redis
+from flask import current_app
+from peewee import PeeweeException
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.models.outbox_message import OutboxMessage
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class OutboxService:
+    """
+    Transactional outbox for Celery tasks caused by database changes.
+
+    ``enqueue`` writes the task call to the outboxmessage table in the
+    transaction of the change, so requests do not wait for the broker and no
+    task is sent for a change that is rolled back. ``relay`` runs from Celery
+    beat every OUTBOX_RELAY_SECONDS, claims pending messages in batches with
+    ``FOR UPDATE SKIP LOCKED``, so several relays never send the same message
+    concurrently, and sends them with the task ID ``outbox-<id>``. Failed
+    sends are retried with exponential backoff up to OUTBOX_MAX_ATTEMPTS.
+
+    Delivery is at least once: a message sent right before its relay crashed
+    is sent again. Tasks wrapped in ``deduplicated`` skip task IDs that
+    already ran.
+    """
+
+    TASK_ID_PREFIX = "outbox-"
+    DELIVERED_KEY_PREFIX = "outbox:delivered"
+
+    CLAIM_SQL = """
+        SELECT id, task_name, payload, attempts,
+               EXTRACT(EPOCH FROM LOCALTIMESTAMP - created_at)
+        FROM outboxmessage
+        WHERE dispatched_at IS NULL AND failed_at IS NULL AND available_at <= LOCALTIMESTAMP
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    """
+    MARK_DISPATCHED_SQL = """
+        UPDATE outboxmessage SET
+            dispatched_at = LOCALTIMESTAMP,
+            attempts = attempts + 1,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = ANY(%s)
+    """
+    MARK_FAILED_SQL = """
+        UPDATE outboxmessage SET
+            attempts = attempts + 1,
+            available_at = LOCALTIMESTAMP + make_interval(secs => %s),
+            failed_at = CASE WHEN attempts + 1 >= %s THEN LOCALTIMESTAMP END,
+            last_error = %s,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+    """
+    PURGE_SQL = """
+        DELETE FROM outboxmessage WHERE id IN (
+            SELECT id FROM outboxmessage
+            WHERE dispatched_at < LOCALTIMESTAMP - make_interval(hours => %s)
+            LIMIT %s
+        )
+    """
+    STATS_SQL = """
+        SELECT
+            (SELECT COUNT(*) FROM outboxmessage
+             WHERE dispatched_at IS NULL AND failed_at IS NULL),
+            (SELECT EXTRACT(EPOCH FROM LOCALTIMESTAMP - MIN(created_at)) FROM outboxmessage
+             WHERE dispatched_at IS NULL AND failed_at IS NULL),
+            (SELECT COUNT(*) FROM outboxmessage
+             WHERE dispatched_at IS NULL AND failed_at IS NOT NULL),
+            (SELECT COUNT(*) FROM outboxmessage
+             WHERE dispatched_at >= LOCALTIMESTAMP - INTERVAL '1 minute')
+    """
+
+    @staticmethod
+    def enqueue(
+        task_name: str, kwargs: Dict[str, Any], dedup_key: Optional[str] = None
+    ) -> None:
+        """
+        Adds a task call to the outbox. Must be called inside the transaction
+        of the change that causes it.
+
+        Args:
+            task_name (str): The registered name of the Celery task.
+            kwargs (Dict[str, Any]): The JSON serializable keyword arguments of the task.
+            dedup_key (Optional[str]): A key identifying the event, e.g. 'user.registered:42'.
+                                       A message whose key is already in the outbox is
+                                       not added again.
+        """
+        OutboxMessage.insert(
+            task_name=task_name,
+            payload=json.dumps(kwargs),
+            dedup_key=dedup_key,
+        ).on_conflict_ignore().execute()
+
+    @classmethod
+    def relay(cls) -> int:
+        """
+        Sends pending outbox messages to the broker, up to OUTBOX_MAX_BATCHES
+        batches of OUTBOX_BATCH_SIZE, and purges messages dispatched more than
+        OUTBOX_RETENTION_HOURS ago.
+
+        Returns:
+            int: The number of messages sent.
+        """
+        start = time.perf_counter()
+        dispatched = 0
+        for _ in range(AppConfig.OUTBOX_MAX_BATCHES):
+            sent, complete = cls._relay_batch()
+            dispatched += sent
+            if not complete:
+                break
+
+        with db.atomic():
+            db.execute_sql(
+                cls.PURGE_SQL,
+                (AppConfig.OUTBOX_RETENTION_HOURS, AppConfig.OUTBOX_BATCH_SIZE),
+            )
+        MetricsService.observe("outbox.relay_seconds", time.perf_counter() - start)
+        return dispatched
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """
+        Returns the state of the outbox, shared by all processes.
+
+        Returns:
+            Dict[str, Any]: The number of pending and failed messages, the age in
+                            seconds of the oldest pending message (the relay lag)
+                            and the number of messages dispatched in the last minute.
+
+        Raises:
+            Exception: An exception indicating an internal server error if a database error occurs.
+        """
+        try:
+            pending, lag, failed, dispatched = db.execute_sql(cls.STATS_SQL).fetchone()
+        except PeeweeException as e:
+            LoggerSetup.get_logger("general").error(f"Failed to read outbox stats: {e}")
+            raise Exception(f"Failed to read outbox stats: {e}")
+
+        return {
+            "pending": pending,
+            "failed": failed,
+            "lag_seconds": float(lag) if lag is not None else 0.0,
+            "dispatched_last_minute": dispatched,
+        }
+
+    @classmethod
+    def deduplicated(cls, func: Callable) -> Callable:
+        """
+        Decorates a bound Celery task so a message relayed more than once runs once.
+
+        The first run of a task ID sent by the relay claims it in Redis for
+        OUTBOX_DEDUP_TTL_SECONDS, later runs with the same ID return None. The
+        claim is released when the task raises, so Celery retries run again.
+        Tasks called directly, not through the outbox, are not deduplicated.
+        """
+
+        @functools.wraps(func)
+        def wrapper(task, *args, **kwargs):
+            task_id = task.request.id or ""
+            if not task_id.startswith(cls.TASK_ID_PREFIX):
+                return func(task, *args, **kwargs)
+
+            key = f"{cls.DELIVERED_KEY_PREFIX}:{task_id}"
+            try:
+                claimed = current_app.redis.set(
+                    key, 1, nx=True, ex=AppConfig.OUTBOX_DEDUP_TTL_SECONDS
+                )
+            except redis.RedisError as e:
+                # Running twice is safer than not running at all.
+                LoggerSetup.get_logger("general").error(
+                    f"Failed to claim outbox task {task_id}, err : {e}"
+                )
+                claimed = True
+            if not claimed:
+                MetricsService.increment("outbox.duplicates_skipped")
+                return None
+
+            try:
+                return func(task, *args, **kwargs)
+            except Exception:
+                try:
+                    current_app.redis.delete(key)
+                except redis.RedisError:
+                    pass
+                raise
+
+        return wrapper
+
+    @classmethod
+    def _relay_batch(cls) -> Tuple[int, bool]:
+        # Returns the number of messages sent and whether the batch was full
+        # and sent without errors, i.e. whether more may be pending.
+        logger = LoggerSetup.get_logger("general")
+        celery_app = current_app.extensions["celery"]
+        sent_ids = []
+        with db.atomic():
+            rows = db.execute_sql(cls.CLAIM_SQL, (AppConfig.OUTBOX_BATCH_SIZE,)).fetchall()
+            for message_id, task_name, payload, attempts, age in rows:
+                try:
+                    # The relay retries itself, Celery must not block on a
+                    # broker that is down.
+                    celery_app.send_task(
+                        task_name,
+                        kwargs=json.loads(payload),
+                        task_id=f"{cls.TASK_ID_PREFIX}{message_id}",
+                        retry=False,
+                    )
+                except Exception as e:
+                    backoff = min(
+                        AppConfig.OUTBOX_RETRY_BASE_SECONDS * 2**attempts,
+                        AppConfig.OUTBOX_RETRY_MAX_SECONDS,
+                    )
+                    db.execute_sql(
+                        cls.MARK_FAILED_SQL,
+                        (backoff, AppConfig.OUTBOX_MAX_ATTEMPTS, str(e), message_id),
+                    )
+                    MetricsService.increment("outbox.dispatch_errors")
+                    if attempts + 1 >= AppConfig.OUTBOX_MAX_ATTEMPTS:
+                        MetricsService.increment("outbox.failed")
+                        logger.error(
+                            f"Giving up on outbox message {message_id} ({task_name}) "
+                            f"after {attempts + 1} attempts, err : {e}"
+                        )
+                    else:
+                        logger.warning(
+                            f"Failed to send outbox message {message_id} ({task_name}), "
+                            f"retrying in {backoff}s, err : {e}"
+                        )
+                    break
+
+                sent_ids.append(message_id)
+                MetricsService.observe("outbox.lag_seconds", float(age))
+
+            if sent_ids:
+                db.execute_sql(cls.MARK_DISPATCHED_SQL, (sent_ids,))
+
+        MetricsService.increment("outbox.dispatched", len(sent_ids))
+        return len(sent_ids), len(sent_ids) == AppConfig.OUTBOX_BATCH_SIZE
@@ -0,0 +1,230 @@
+import hashlib
+import itertools
+import re
+from typing import Any, List, Optional, Sequence, Set, Tuple
+
+from peewee import (
+    SQL,
+    Database,
+    Model,
+    ModelSelect,
+    PostgresqlDatabase,
+    Select,
+    fn,
+)
+
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class PreparedStatementService:
+    """
+    Runs hot-path selects as server-side prepared statements.
+
+    A statement is identified by the SQL text peewee generates for a query, so
+    every query with the same shape shares one ``PREPARE``d statement and only
+    its parameters change between calls. Statements are prepared lazily, once
+    per database connection, and tracked on peewee's per-thread connection
+    state, so a reconnect starts from an empty set. A statement the server no
+    longer knows (a new session behind a proxy, ``DISCARD ALL``) or whose
+    result type changed after a migration is prepared again and, outside of a
+    transaction, retried once.
+    """
+
+    NAME_PREFIX = "ps_"
+    UNDEFINED_STATEMENT = "26000"
+    RESULT_TYPE_CHANGED = "0A000"
+    PLACEHOLDER_PATTERN = re.compile(r"%[%s]")
+
+    @classmethod
+    def is_enabled(cls, database: Database) -> bool:
+        """
+        Checks if queries on the given database should run as prepared statements.
+
+        Args:
+            database (Database): The database the query is bound to.
+
+        Returns:
+            bool: True if prepared statements are enabled and the database is PostgreSQL.
+        """
+        return AppConfig.PREPARED_STATEMENTS_ENABLED and isinstance(
+            database, PostgresqlDatabase
+        )
+
+    @classmethod
+    def fetch(cls, query: ModelSelect) -> List[Model]:
+        """
+        Executes a model select as a prepared statement.
+
+        Args:
+            query (ModelSelect): The query to execute.
+
+        Returns:
+            List[Model]: The selected model instances, as ``list(query)`` would return them.
+        """
+        database = query.model._meta.database
+        if not cls.is_enabled(database):
+            return list(query)
+
+        sql, params = query.sql()
+        cursor = cls.execute(database, sql, params)
+        return list(query._get_cursor_wrapper(cursor))
+
+    @classmethod
+    def get(cls, query: ModelSelect) -> Model:
+        """
+        Executes a model select as a prepared statement and returns the first row.
+
+        Args:
+            query (ModelSelect): The query to execute.
+
+        Returns:
+            Model: The first model instance matching the query.
+
+        Raises:
+            DoesNotExist: The model's DoesNotExist if no row matches, like ``query.get()``.
+        """
+        rows = cls.fetch(query.limit(1))
+        if not rows:
+            raise query.model.DoesNotExist(
+                f"{query.model.__name__} instance matching query does not exist"
+            )
+        return rows[0]
+
+    @classmethod
+    def count(cls, query: ModelSelect) -> int:
+        """
+        Counts the rows of a model select as a prepared statement.
+
+        Args:
+            query (ModelSelect): The query whose rows are counted.
+
+        Returns:
+            int: The number of rows, as ``query.count()`` would return it.
+        """
+        database = query.model._meta.database
+        if not cls.is_enabled(database):
+            return query.count()
+
+        # Same statement as peewee's count(), built here to get at its SQL.
+        wrapped = query.order_by().alias("_wrapped").select(SQL("1"))
+        sql, params = Select([wrapped], [fn.COUNT(SQL("1"))]).bind(database).sql()
+        row = cls.execute(database, sql, params).fetchone()
+        return row[0] if row else 0
+
+    @classmethod
+    def execute(cls, database: Database, sql: str, params: Sequence[Any] = ()):
+        """
+        Executes the SQL through a statement prepared on the current connection.
+
+        Args:
+            database (Database): The database to execute on.
+            sql (str): The statement with psycopg2 ``%s`` placeholders.
+            params (Sequence[Any]): The statement parameters.
+
+        Returns:
+            The cursor holding the results.
+        """
+        name = cls.statement_name(sql)
+        cls._prepare(database, name, sql)
+        try:
+            cursor = database.execute_sql(cls.execute_statement_sql(name, params), params)
+        except Exception as e:
+            if not cls._recover(database, name, e):
+                raise
+            cls._prepare(database, name, sql)
+            MetricsService.increment("prepared_statements.retries")
+            cursor = database.execute_sql(cls.execute_statement_sql(name, params), params)
+        MetricsService.increment("prepared_statements.executions")
+        return cursor
+
+    @classmethod
+    def statement_name(cls, sql: str) -> str:
+        """
+        Returns the server-side name of the statement prepared for the SQL text.
+        """
+        return cls.NAME_PREFIX + hashlib.sha1(sql.encode()).hexdigest()[:16]
+
+    @classmethod
+    def deallocate_all(cls, database: Database) -> None:
+        """
+        Drops every statement prepared on the current connection.
+
+        Args:
+            database (Database): The database whose connection is cleaned up.
+        """
+        if database.is_closed():
+            return
+        database.execute_sql("DEALLOCATE ALL")
+        prepared, stale = cls._connection_state(database)
+        prepared.clear()
+        stale.clear()
+
+    @classmethod
+    def _prepare(cls, database: Database, name: str, sql: str) -> None:
+        prepared, stale = cls._connection_state(database)
+        if name in prepared:
+            return
+
+        if name in stale:
+            database.execute_sql(f"DEALLOCATE {name}")
+            stale.discard(name)
+
+        counter = itertools.count(1)
+        statement = cls.PLACEHOLDER_PATTERN.sub(
+            lambda match: match.group() if match.group() == "%%" else f"${next(counter)}",
+            sql,
+        )
+        database.execute_sql(f"PREPARE {name} AS {statement}")
+        prepared.add(name)
+        MetricsService.increment("prepared_statements.prepared")
+
+    @classmethod
+    def _recover(cls, database: Database, name: str, error: Exception) -> bool:
+        pgcode = cls._pgcode(error)
+        if pgcode not in (cls.UNDEFINED_STATEMENT, cls.RESULT_TYPE_CHANGED):
+            return False
+
+        prepared, stale = cls._connection_state(database)
+        prepared.discard(name)
+        if pgcode == cls.RESULT_TYPE_CHANGED:
+            # The old statement still exists on the server and is dropped
+            # before the next PREPARE under the same name.
+            stale.add(name)
+
+        LoggerSetup.get_logger("general").warning(
+            f"Prepared statement {name} is no longer valid, preparing it again: {error}"
+        )
+        MetricsService.increment("prepared_statements.invalidated")
+        # A failed statement aborts the surrounding transaction, so only
+        # statements outside of one can be retried right away.
+        return not database.in_transaction()
+
+    @staticmethod
+    def _connection_state(database: Database) -> Tuple[Set[str], Set[str]]:
+        # Keyed on the connection object, which peewee replaces on reconnect.
+        connection = database.connection()
+        state = getattr(database._state, "prepared_statements", None)
+        if state is None or state[0] is not connection:
+            state = (connection, set(), set())
+            database._state.prepared_statements = state
+        return state[1], state[2]
+
+    @staticmethod
+    def execute_statement_sql(name: str, params: Sequence[Any]) -> str:
+        """
+        Returns the EXECUTE statement for the prepared statement and parameters.
+        """
+        if not params:
+            return f"EXECUTE {name}"
+        return f"EXECUTE {name}({', '.join(['%s'] * len(params))})"
+
+    @staticmethod
+    def _pgcode(error: Exception) -> Optional[str]:
+        # peewee wraps the driver error and keeps the original in ``orig``.
+        for candidate in (error, getattr(error, "orig", None), error.__context__):
+            pgcode = getattr(candidate, "pgcode", None)
+            if pgcode:
+                return pgcode
+        return None
@@ -0,0 +1,242 @@
+import os
+import selectors
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+
+from flask import g, has_request_context, request
+from peewee import OperationalError
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class _Deadline:
+    __slots__ = ("expires_at", "client", "connection", "cancel_reason", "done", "lock")
+
+    def __init__(self, expires_at: float, client: Optional[socket.socket], connection: Any):
+        self.expires_at = expires_at
+        self.client = client
+        self.connection = connection
+        self.cancel_reason: Optional[str] = None
+        self.done = False
+        self.lock = threading.Lock()
+
+
+class StatementTimeoutService:
+    """
+    Time budgets for the SQL of requests and service calls.
+
+    Every request gets a deadline from its route class (REQUEST_DEADLINE_MS,
+    REQUEST_DEADLINE_BULK_MS). A watchdog thread per process cancels the
+    running statement of a request once its deadline has passed or its client
+    has disconnected, and keeps cancelling on every check until the request
+    ends, so statements started later are stopped too. Service calls that can run away, like admin searches,
+    run in ``budget``: a transaction with ``SET LOCAL statement_timeout``, so
+    Postgres itself stops them after the smaller of their budget and the time
+    left to the request. Cancelled statements raise ``OperationalError`` with
+    SQLSTATE 57014. They are counted in metrics and turned into a 504
+    response by StatementTimeoutMiddleware.
+    """
+
+    QUERY_CANCELED = "57014"
+
+    _local = threading.local()
+    _lock = threading.Lock()
+    _deadlines: Set[_Deadline] = set()
+    _watchdog_pid: Optional[int] = None
+
+    @classmethod
+    @contextmanager
+    def budget(cls, name: str, timeout_ms: int) -> Iterator[None]:
+        """
+        Runs the block in a transaction whose statements are cancelled after
+        ``timeout_ms``, or the time left to the request if that is shorter.
+
+        Args:
+            name (str): The name of the service call, used in metrics.
+            timeout_ms (int): The budget in milliseconds, 0 for no budget of its own.
+        """
+        remaining = cls.remaining_ms()
+        if remaining is not None:
+            # A passed deadline still sets a timeout, so the statement fails at once.
+            timeout_ms = min(timeout_ms, remaining) if timeout_ms else remaining
+        if not AppConfig.STATEMENT_TIMEOUT_ENABLED or not timeout_ms:
+            yield
+            return
+
+        nested = db.in_transaction()
+        with db.atomic():
+            if nested:
+                previous = db.execute_sql("SHOW statement_timeout").fetchone()[0]
+            db.execute_sql("SELECT set_config('statement_timeout', %s, true)", (f"{max(timeout_ms, 1)}ms",))
+            try:
+                yield
+            except OperationalError as e:
+                if cls.is_query_canceled(e):
+                    MetricsService.increment(f"statement_timeout.budget_exceeded.{name}")
+                raise
+            if nested:
+                # SET LOCAL lasts until the outer transaction ends.
+                db.execute_sql("SELECT set_config('statement_timeout', %s, true)", (previous,))
+
+    @classmethod
+    def start_request(cls, timeout_ms: int, environ: Dict[str, Any]) -> None:
+        """
+        Sets the deadline of the request handled by the current thread.
+
+        Args:
+            timeout_ms (int): The time budget of the request in milliseconds.
+            environ (Dict[str, Any]): The WSGI environ, used to watch the client connection.
+        """
+        cls._ensure_watchdog()
+        deadline = _Deadline(
+            time.monotonic() + timeout_ms / 1000,
+            cls._client_socket(environ),
+            None if db.is_closed() else db.connection(),
+        )
+        cls._local.deadline = deadline
+        with cls._lock:
+            cls._deadlines.add(deadline)
+
+    @classmethod
+    def end_request(cls) -> Optional[str]:
+        """
+        Clears the deadline of the current thread's request.
+
+        Returns:
+            Optional[str]: Why a statement of the request was cancelled, if one was.
+        """
+        deadline = getattr(cls._local, "deadline", None)
+        if deadline is None:
+            return None
+        cls._local.deadline = None
+        with cls._lock:
+            cls._deadlines.discard(deadline)
+        with deadline.lock:
+            deadline.done = True
+        return deadline.cancel_reason
+
+    @classmethod
+    def remaining_ms(cls) -> Optional[int]:
+        """
+        Returns the milliseconds left to the current request, None outside of a request.
+        """
+        deadline = getattr(cls._local, "deadline", None)
+        if deadline is None:
+            return None
+        return max(int((deadline.expires_at - time.monotonic()) * 1000), 0)
+
+    @classmethod
+    def on_connect(cls, connection: Any) -> None:
+        """
+        Lets the watchdog cancel statements of a connection opened during a request.
+        """
+        deadline = getattr(cls._local, "deadline", None)
+        if deadline is not None and deadline.connection is None:
+            deadline.connection = connection
+
+    @classmethod
+    def record_cancellation(cls) -> str:
+        """
+        Counts a cancelled statement of the current thread and flags its request.
+
+        Returns:
+            str: 'deadline' or 'client_disconnected' when the watchdog cancelled
+            it, 'statement_timeout' when Postgres did.
+        """
+        deadline = getattr(cls._local, "deadline", None)
+        reason = (deadline.cancel_reason if deadline else None) or "statement_timeout"
+        MetricsService.increment(f"statement_timeout.cancelled.{reason}")
+        if has_request_context():
+            MetricsService.increment(
+                f"statement_timeout.cancelled_by_endpoint.{request.endpoint or 'unmatched'}"
+            )
+            g.statement_cancelled = reason
+        return reason
+
+    @classmethod
+    def is_query_canceled(cls, error: BaseException) -> bool:
+        """
+        Returns whether a database error is a cancelled statement.
+        """
+        return getattr(getattr(error, "orig", None), "pgcode", None) == cls.QUERY_CANCELED
+
+    @staticmethod
+    def _client_socket(environ: Dict[str, Any]) -> Optional[socket.socket]:
+        client = environ.get("gunicorn.socket")
+        if client is None:
+            # The werkzeug server reads the request from a file over the socket.
+            raw = getattr(environ.get("wsgi.input"), "raw", None)
+            client = getattr(raw, "_sock", None)
+        return client if isinstance(client, socket.socket) else None
+
+    @staticmethod
+    def _disconnected(client: Optional[socket.socket]) -> bool:
+        # A socket the server already closed has no descriptor left to watch.
+        if client is None or client.fileno() < 0:
+            return False
+        try:
+            # Not select.select, which fails for descriptors above FD_SETSIZE.
+            with selectors.DefaultSelector() as selector:
+                selector.register(client, selectors.EVENT_READ)
+                readable = selector.select(0)
+            # A closed connection is readable with nothing to read.
+            return bool(readable) and client.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    @classmethod
+    def _ensure_watchdog(cls) -> None:
+        # Started lazily and per pid, so forked gunicorn workers each get their own.
+        if cls._watchdog_pid == os.getpid():
+            return
+        with cls._lock:
+            if cls._watchdog_pid == os.getpid():
+                return
+            cls._deadlines.clear()
+            threading.Thread(target=cls._run, name="statement-watchdog", daemon=True).start()
+            cls._watchdog_pid = os.getpid()
+
+    @classmethod
+    def _run(cls) -> None:
+        while True:
+            time.sleep(AppConfig.STATEMENT_CANCEL_CHECK_MS / 1000)
+            try:
+                cls._check_deadlines()
+            except Exception as e:
+                LoggerSetup.get_logger("general").error(f"Statement watchdog failed, err : {e}")
+
+    @classmethod
+    def _check_deadlines(cls) -> None:
+        now = time.monotonic()
+        with cls._lock:
+            deadlines = list(cls._deadlines)
+        for deadline in deadlines:
+            if deadline.connection is None:
+                continue
+            reason = deadline.cancel_reason
+            if reason is None:
+                if now >= deadline.expires_at:
+                    reason = "deadline"
+                elif cls._disconnected(deadline.client):
+                    reason = "client_disconnected"
+                else:
+                    continue
+            # A cancel only stops the statement running at that moment and is
+            # a no-op between statements, so it is sent again on every check
+            # until the request ends. Under the lock, so a request that already
+            # ended does not get the statement of the next request on its
+            # connection cancelled.
+            with deadline.lock:
+                if deadline.done:
+                    continue
+                first = deadline.cancel_reason is None
+                deadline.cancel_reason = reason
+                deadline.connection.cancel()
+            if first:
+                MetricsService.increment(f"statement_timeout.watchdog_cancels.{reason}")
@@ -0,0 +1,89 @@
+import json
+import os
+import urllib.request
+from typing import Any, Dict, List
+
+from config.app_config import AppConfig
+
+
+class JsonLinesExporter:
+    """
+    Appends finished spans as JSON lines to
+    ``<TEMP_STORAGE_PATH>/traces/spans-<pid>.jsonl``, one file per process so
+    concurrent workers never interleave their lines.
+    """
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        directory = os.path.join(AppConfig.TEMP_STORAGE_PATH, "traces")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"spans-{os.getpid()}.jsonl")
+        with open(path, "a") as file:
+            file.write("".join(json.dumps(span, default=str) + "\n" for span in spans))
+
+
+class OtlpHttpExporter:
+    """
+    Sends finished spans to an OpenTelemetry collector at TRACING_OTLP_ENDPOINT,
+    using OTLP over HTTP with JSON encoding.
+    """
+
+    KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+    TIMEOUT_SECONDS = 5
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": self._attributes(
+                            {"service.name": AppConfig.TRACING_SERVICE_NAME}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.services.tracing_service"},
+                            "spans": [self._span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            AppConfig.TRACING_OTLP_ENDPOINT,
+            data=json.dumps(body, default=str).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.TIMEOUT_SECONDS):
+            pass
+
+    @classmethod
+    def _span(cls, span: Dict[str, Any]) -> Dict[str, Any]:
+        otlp_span = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": cls.KINDS.get(span["kind"], 1),
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(span["end_ns"]),
+            "attributes": cls._attributes(span["attributes"]),
+            # 1 is OK, 2 is ERROR.
+            "status": {"code": 2 if span["error"] else 1},
+        }
+        if span["parent_id"]:
+            otlp_span["parentSpanId"] = span["parent_id"]
+        return otlp_span
+
+    @staticmethod
+    def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        converted = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                converted.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                converted.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                converted.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                converted.append({"key": key, "value": {"stringValue": str(value)}})
+        return converted
@@ -0,0 +1,401 @@
+import atexit
+import functools
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import redis
+from peewee import PostgresqlDatabase
+from redis.client import Pipeline
+
+from app.logger_setup import LoggerSetup
+from app.services.metrics_service import MetricsService
+from app.services.trace_exporters import JsonLinesExporter, OtlpHttpExporter
+from config.app_config import AppConfig
+
+
+class Span:
+    """
+    A timed operation of a trace. IDs are hex strings as in W3C trace context.
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "attributes",
+        "error",
+        "start_ns",
+        "end_ns",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: str,
+        attributes: Optional[Dict[str, Any]],
+    ):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.error = False
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.error = True
+        self.attributes["exception.type"] = type(error).__name__
+        self.attributes["exception.message"] = str(error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1_000_000,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+SpanHandle = Tuple[Span, Token]
+
+
+class TracingService:
+    """
+    Lightweight span-based tracing of requests and Celery tasks.
+
+    A trace starts at the root of an HTTP request or a Celery task and is
+    sampled there, with TRACING_SAMPLE_RATE. Tasks enqueued while a span is
+    active carry its W3C ``traceparent`` in their message headers and continue
+    the trace in the worker. Child spans (SQL queries, Redis commands, JWT
+    checks, password hashing) are only created inside a sampled trace, so
+    unsampled work pays for a single context variable lookup per call.
+
+    Finished spans are buffered in process and exported in batches by a
+    background thread every TRACING_FLUSH_SECONDS, to JSON lines files or an
+    OTLP collector (TRACING_EXPORTER). ``set_exporter`` plugs in any object
+    with an ``export(spans)`` method.
+    """
+
+    EXPORTERS = {"jsonl": JsonLinesExporter, "otlp": OtlpHttpExporter}
+    TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+    MAX_STATEMENT_LENGTH = 2000
+
+    _current: ContextVar[Optional[Span]] = ContextVar("tracing_current_span", default=None)
+    _lock = threading.Lock()
+    _wakeup = threading.Event()
+    _buffer: Deque[Dict[str, Any]] = deque()
+    _exporter = None
+    _flusher_pid: Optional[int] = None
+
+    @classmethod
+    def current_span(cls) -> Optional[Span]:
+        """
+        Returns the active span, None outside of a sampled trace.
+        """
+        return cls._current.get()
+
+    @classmethod
+    def start_trace(
+        cls,
+        name: str,
+        traceparent: Optional[str] = None,
+        kind: str = "server",
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Optional[SpanHandle]:
+        """
+        Starts the root span of a request or task, or a child span when a
+        trace is already active.
+
+        Args:
+            name (str): The name of the span.
+            traceparent (Optional[str]): The W3C traceparent of a remote parent.
+                                         A sampled parent is always continued.
+            kind (str): The span kind, 'server' for requests and 'consumer' for tasks.
+            attributes (Optional[Dict[str, Any]]): Initial attributes of the span.
+
+        Returns:
+            Optional[SpanHandle]: The span and the token to pass to ``end``,
+            None if tracing is disabled or the trace is not sampled.
+        """
+        if not AppConfig.TRACING_ENABLED:
+            return None
+        if cls._current.get() is not None:
+            return cls.start_span(name, kind, attributes)
+
+        match = cls.TRACEPARENT_PATTERN.match(traceparent or "")
+        if match and int(match.group(3), 16) & 1:
+            trace_id, parent_id = match.group(1), match.group(2)
+        elif random.random() < AppConfig.TRACING_SAMPLE_RATE:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        else:
+            return None
+
+        span = Span(name, trace_id, parent_id, kind, attributes)
+        return span, cls._current.set(span)
+
+    @classmethod
+    def start_span(
+        cls,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Optional[SpanHandle]:
+        """
+        Starts a child of the active span.
+
+        Returns:
+            Optional[SpanHandle]: The span and the token to pass to ``end``,
+            None outside of a sampled trace.
+        """
+        parent = cls._current.get()
+        if parent is None:
+            return None
+        span = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+        return span, cls._current.set(span)
+
+    @classmethod
+    def end(cls, handle: Optional[SpanHandle], error: Optional[BaseException] = None) -> None:
+        """
+        Ends a span started with ``start_trace`` or ``start_span`` and makes its
+        parent the active span again.
+
+        Args:
+            handle (Optional[SpanHandle]): The span and token, None is ignored.
+            error (Optional[BaseException]): The exception the operation failed with.
+        """
+        if handle is None:
+            return
+        span, token = handle
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.record_error(error)
+        try:
+            cls._current.reset(token)
+        except ValueError:
+            # Ended in another context than it was started in.
+            cls._current.set(None)
+        cls._enqueue(span.to_dict())
+
+    @classmethod
+    @contextmanager
+    def span(
+        cls,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "internal",
+    ) -> Iterator[Optional[Span]]:
+        """
+        Runs the block in a child span of the active span. Yields None outside
+        of a sampled trace.
+        """
+        handle = cls.start_span(name, kind, attributes)
+        if handle is None:
+            yield None
+            return
+        try:
+            yield handle[0]
+        except BaseException as e:
+            cls.end(handle, e)
+            raise
+        cls.end(handle)
+
+    @classmethod
+    @contextmanager
+    def trace(
+        cls,
+        name: str,
+        traceparent: Optional[str] = None,
+        kind: str = "server",
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Optional[Span]]:
+        """
+        Runs the block in a root span, see ``start_trace``.
+        """
+        handle = cls.start_trace(name, traceparent, kind, attributes)
+        if handle is None:
+            yield None
+            return
+        try:
+            yield handle[0]
+        except BaseException as e:
+            cls.end(handle, e)
+            raise
+        cls.end(handle)
+
+    @classmethod
+    def traced(cls, name: str) -> Callable:
+        """
+        Decorates a function so its calls inside a sampled trace get a span.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if cls._current.get() is None:
+                    return func(*args, **kwargs)
+                with cls.span(name):
+                    return func(*args, **kwargs)
+
+            wrapper.__traced__ = True
+            return wrapper
+
+        return decorator
+
+    @classmethod
+    def inject_headers(cls, headers: Optional[Dict[str, Any]] = None, **kwargs) -> None:
+        """
+        Adds the traceparent of the active span to the headers of a published
+        Celery task. Connected to Celery's ``before_task_publish`` signal.
+        """
+        span = cls._current.get()
+        if span is not None and headers is not None:
+            headers["traceparent"] = span.traceparent
+
+    @classmethod
+    def set_exporter(cls, exporter: Any) -> None:
+        """
+        Replaces the exporter chosen by TRACING_EXPORTER.
+
+        Args:
+            exporter (Any): An object whose ``export(spans)`` takes a list of span dicts.
+        """
+        cls._exporter = exporter
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Exports the buffered spans. Spans of a failed export are dropped.
+
+        Returns:
+            int: The number of spans exported.
+        """
+        with cls._lock:
+            spans = list(cls._buffer)
+            cls._buffer.clear()
+        if not spans:
+            return 0
+
+        if cls._exporter is None:
+            cls._exporter = cls.EXPORTERS[AppConfig.TRACING_EXPORTER]()
+        try:
+            cls._exporter.export(spans)
+        except Exception as e:
+            MetricsService.increment("tracing.export_errors")
+            LoggerSetup.get_logger("general").error(
+                f"Failed to export {len(spans)} spans, err : {e}"
+            )
+            return 0
+        MetricsService.increment("tracing.spans_exported", len(spans))
+        return len(spans)
+
+    @classmethod
+    def _enqueue(cls, span: Dict[str, Any]) -> None:
+        cls._ensure_flusher()
+        with cls._lock:
+            cls._buffer.append(span)
+            if len(cls._buffer) <= AppConfig.TRACING_MAX_BUFFER:
+                return
+            cls._buffer.popleft()
+        MetricsService.increment("tracing.spans_dropped")
+
+    @classmethod
+    def _ensure_flusher(cls) -> None:
+        # Started lazily and per pid, so forked gunicorn and Celery workers each get their own.
+        if cls._flusher_pid == os.getpid():
+            return
+
+        with cls._lock:
+            if cls._flusher_pid == os.getpid():
+                return
+            # Spans copied from the parent are exported by the parent.
+            cls._buffer.clear()
+            threading.Thread(target=cls._run, name="trace-exporter", daemon=True).start()
+            atexit.register(cls.flush)
+            cls._flusher_pid = os.getpid()
+
+    @classmethod
+    def _run(cls) -> None:
+        while True:
+            cls._wakeup.wait(AppConfig.TRACING_FLUSH_SECONDS)
+            cls._wakeup.clear()
+            try:
+                cls.flush()
+            except Exception as e:
+                LoggerSetup.get_logger("general").error(f"Span export failed, err : {e}")
+
+
+class TracedPostgresqlDatabase(PostgresqlDatabase):
+    """
+    ``PostgresqlDatabase`` recording a span per executed statement inside sampled traces.
+    """
+
+    def execute_sql(self, sql, params=None, commit=None):
+        if TracingService.current_span() is None:
+            return super().execute_sql(sql, params, commit)
+        with TracingService.span(
+            "db.query",
+            {
+                "db.system": "postgresql",
+                "db.statement": sql[: TracingService.MAX_STATEMENT_LENGTH],
+            },
+            kind="client",
+        ):
+            return super().execute_sql(sql, params, commit)
+
+
+class TracedRedis(redis.Redis):
+    """
+    Redis client recording a span per command or pipeline inside sampled
+    traces. Keys and values are not recorded.
+    """
+
+    def execute_command(self, *args, **options):
+        if TracingService.current_span() is None:
+            return super().execute_command(*args, **options)
+        with TracingService.span(
+            f"redis.{str(args[0]).lower()}", {"db.system": "redis"}, kind="client"
+        ):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None) -> "TracedPipeline":
+        return TracedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class TracedPipeline(Pipeline):
+    def execute(self, raise_on_error=True):
+        if TracingService.current_span() is None:
+            return super().execute(raise_on_error)
+        with TracingService.span(
+            "redis.pipeline",
+            {"db.system": "redis", "db.redis.commands": len(self.command_stack)},
+            kind="client",
+        ):
+            return super().execute(raise_on_error)
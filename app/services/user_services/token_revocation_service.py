@@ -0,0 +1,257 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import redis
+from flask import current_app
+
+from app.logger_setup import LoggerSetup
+from app.services.cache_services.bloom_filter import BloomFilter
+from app.services.metrics_service import MetricsService
+from config.app_config import AppConfig
+
+
+class TokenRevocationService:
+    """
+    Revocation of JWTs before they expire.
+
+    Revoked token IDs (``jti``) and per-user revocation counters are stored in
+    Redis with a TTL matching the token lifetime. Every token carries the
+    counter of its user at issue time in the ``rev`` claim, and revoking all
+    tokens of a user increments the counter, which rejects every token
+    issued before.
+    Every process keeps a Bloom filter of the revoked entries, kept up to date
+    through pub/sub, so the common "not revoked" answer needs no network I/O.
+    Only Bloom filter hits are confirmed against Redis. A background thread
+    rebuilds the filter, so requests never wait for the scan of Redis.
+    """
+
+    KEY_PREFIX = "token_revocation"
+    REVOCATION_CHANNEL = "token_revocation:revoked"
+    REVOCATION_CLAIM = "rev"
+
+    _lock = threading.Lock()
+    _filter: Optional[BloomFilter] = None
+    _pending_filter: Optional[BloomFilter] = None
+    _filter_built_at = 0.0
+    _filter_ready = False
+    _listener_pid: Optional[int] = None
+    _rebuild_wanted = threading.Event()
+
+    @classmethod
+    def revoke_token(cls, jwt_payload: Dict[str, Any]) -> None:
+        """
+        Revokes a single token until it expires.
+
+        Args:
+            jwt_payload (Dict[str, Any]): The decoded payload of the token to revoke.
+        """
+        ttl = int(jwt_payload["exp"] - time.time())
+        if ttl <= 0:
+            return
+
+        pipeline = current_app.redis.pipeline(transaction=False)
+        pipeline.set(cls._redis_key(f"jti:{jwt_payload['jti']}"), "1", ex=ttl)
+        cls._publish_revocation(pipeline, f"jti:{jwt_payload['jti']}")
+
+    @classmethod
+    def revoke_all_for_user(cls, user_id: int) -> None:
+        """
+        Revokes every token issued to the user so far. Tokens issued afterwards,
+        like the one of a login right after, carry the new counter and stay valid.
+
+        Args:
+            user_id (int): The ID of the user whose tokens are revoked.
+        """
+        key = cls._redis_key(f"user:{user_id}")
+        pipeline = current_app.redis.pipeline(transaction=False)
+        pipeline.incr(key)
+        pipeline.expire(key, cls._token_lifetime())
+        cls._publish_revocation(pipeline, f"user:{user_id}")
+
+    @classmethod
+    def token_claims(cls, user_id: int) -> Dict[str, Any]:
+        """
+        Returns the claims of a new token of the user, to pass as ``additional_claims``.
+
+        Args:
+            user_id (int): The ID of the user the token is issued to.
+
+        Returns:
+            Dict[str, Any]: The user's revocation counter in the ``rev`` claim.
+        """
+        key = cls._redis_key(f"user:{user_id}")
+        try:
+            pipeline = current_app.redis.pipeline(transaction=False)
+            pipeline.get(key)
+            # The counter must outlive every token carrying it, or a later
+            # revocation would start again from 1 and miss them.
+            pipeline.expire(key, cls._token_lifetime())
+            counter, _ = pipeline.execute()
+        except redis.RedisError as e:
+            # The token is then rejected once Redis is back if the user's
+            # tokens were ever revoked, and the user has to log in again.
+            MetricsService.increment("token_revocation.errors")
+            LoggerSetup.get_logger("general").error(
+                f"Token revocation counter unavailable for user {user_id}: {e}"
+            )
+            counter = None
+        return {cls.REVOCATION_CLAIM: int(counter or 0)}
+
+    @classmethod
+    def is_token_revoked(cls, jwt_header: Dict[str, Any], jwt_payload: Dict[str, Any]) -> bool:
+        """
+        Checks if the token was revoked. Registered as the JWT blocklist loader.
+
+        Args:
+            jwt_header (Dict[str, Any]): The decoded header of the token.
+            jwt_payload (Dict[str, Any]): The decoded payload of the token.
+
+        Returns:
+            bool: True if the token or all tokens of its user were revoked.
+        """
+        jti_entry = f"jti:{jwt_payload['jti']}"
+        user_entry = f"user:{jwt_payload['sub']}"
+
+        try:
+            redis_client = current_app.redis
+            cls._ensure_filter(redis_client)
+            bloom_filter = cls._filter
+            if (
+                cls._filter_ready
+                and jti_entry not in bloom_filter
+                and user_entry not in bloom_filter
+            ):
+                MetricsService.increment("token_revocation.bloom_negatives")
+                return False
+
+            MetricsService.increment("token_revocation.redis_checks")
+            jti_revoked, user_counter = redis_client.mget(
+                cls._redis_key(jti_entry), cls._redis_key(user_entry)
+            )
+        except redis.RedisError as e:
+            # Failing open keeps the API usable while Redis is down; tokens
+            # still expire after TOKEN_EXPIRATION_TIME.
+            MetricsService.increment("token_revocation.errors")
+            LoggerSetup.get_logger("general").error(
+                f"Token revocation check failed, allowing token: {e}"
+            )
+            return False
+
+        revoked = jti_revoked is not None or (
+            user_counter is not None
+            and jwt_payload.get(cls.REVOCATION_CLAIM, 0) < int(user_counter)
+        )
+        if not revoked:
+            MetricsService.increment("token_revocation.bloom_false_positives")
+        return revoked
+
+    @classmethod
+    def _publish_revocation(cls, pipeline, entry: str) -> None:
+        # Sends the pipeline holding the write of the entry together with its broadcast.
+        pipeline.publish(cls.REVOCATION_CHANNEL, json.dumps(entry))
+        pipeline.execute()
+        cls._add_to_filters(entry)
+        MetricsService.increment("token_revocation.revocations")
+
+    @classmethod
+    def _ensure_filter(cls, redis_client: redis.Redis) -> None:
+        if cls._listener_pid != os.getpid():
+            cls._start_listener(redis_client)
+        elif cls._filter_ready and cls._filter.count > cls._filter.capacity:
+            cls._rebuild_wanted.set()
+
+    @classmethod
+    def _start_listener(cls, redis_client: redis.Redis) -> None:
+        with cls._lock:
+            if cls._listener_pid == os.getpid():
+                return
+            cls._filter_ready = False
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{cls.REVOCATION_CHANNEL: cls._on_revocation})
+            pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=cls._on_listener_error,
+            )
+            threading.Thread(
+                target=cls._maintain_filter,
+                args=(redis_client,),
+                name="token-revocation-filter",
+                daemon=True,
+            ).start()
+            cls._listener_pid = os.getpid()
+
+    @classmethod
+    def _maintain_filter(cls, redis_client: redis.Redis) -> None:
+        # Checks go to Redis until the first build, then the old filter keeps
+        # answering while a new one is built.
+        while True:
+            expired = (
+                time.monotonic() - cls._filter_built_at
+                > AppConfig.TOKEN_REVOCATION_FILTER_REBUILD_INTERVAL
+            )
+            if not cls._filter_ready or expired or cls._filter.count > cls._filter.capacity:
+                try:
+                    cls._rebuild_filter(redis_client)
+                except redis.RedisError as e:
+                    MetricsService.increment("token_revocation.errors")
+                    LoggerSetup.get_logger("general").error(
+                        f"Token revocation filter rebuild failed: {e}"
+                    )
+            cls._rebuild_wanted.wait(1.0)
+            cls._rebuild_wanted.clear()
+
+    @classmethod
+    def _rebuild_filter(cls, redis_client: redis.Redis) -> None:
+        # Bloom filters cannot forget, so the filter is rebuilt from Redis
+        # periodically to drop expired entries. The listener writes into the
+        # pending filter while the keys are scanned, so nothing is lost.
+        with cls._lock:
+            try:
+                cls._pending_filter = BloomFilter(
+                    AppConfig.TOKEN_REVOCATION_FILTER_CAPACITY,
+                    AppConfig.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+                )
+                prefix_length = len(cls.KEY_PREFIX) + 1
+                for key in redis_client.scan_iter(f"{cls.KEY_PREFIX}:*:*", count=1000):
+                    cls._pending_filter.add(key.decode()[prefix_length:])
+
+                cls._filter = cls._pending_filter
+                cls._filter_built_at = time.monotonic()
+                cls._filter_ready = True
+                MetricsService.set_gauge("token_revocation.filter_entries", cls._filter.count)
+            finally:
+                cls._pending_filter = None
+
+    @classmethod
+    def _add_to_filters(cls, entry: str) -> None:
+        for bloom_filter in (cls._filter, cls._pending_filter):
+            if bloom_filter is not None:
+                bloom_filter.add(entry)
+
+    @classmethod
+    def _on_revocation(cls, message: Dict[str, Any]) -> None:
+        cls._add_to_filters(json.loads(message["data"]))
+
+    @classmethod
+    def _on_listener_error(cls, exception, pubsub, thread) -> None:
+        # Revocations published while disconnected were missed, so every check
+        # goes to Redis until the filter is rebuilt.
+        MetricsService.increment("token_revocation.listener_errors")
+        LoggerSetup.get_logger("general").error(
+            f"Token revocation listener error: {exception}"
+        )
+        cls._filter_ready = False
+        cls._rebuild_wanted.set()
+        time.sleep(1.0)
+
+    @staticmethod
+    def _token_lifetime() -> int:
+        return int(AppConfig.TOKEN_EXPIRATION_TIME) * 60
+
+    @classmethod
+    def _redis_key(cls, entry: str) -> str:
+        return f"{cls.KEY_PREFIX}:{entry}"
@@ -0,0 +1,255 @@
+import time
+from typing import Any, Dict
+
+from peewee import PeeweeException
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.middlewares.unit_of_work_middleware import UnitOfWorkMiddleware
+from app.models.user_archive_run import UserArchiveRun
+from app.models.user_profile import UserProfile
+from app.models.user_profile_archive import UserProfileArchive
+from app.services.cache_services.model_cache_service import ModelCacheService
+from app.services.change_feed_service import ChangeFeedService
+from app.services.metrics_service import MetricsService
+from app.services.user_services.user_pagination_service import UserPaginationService
+from config.app_config import AppConfig
+
+
+class UserArchiveService:
+    """
+    Keeps long deactivated users out of the userprofile table.
+
+    ``archive`` runs from Celery beat every USER_ARCHIVE_INTERVAL_SECONDS and
+    moves users inactive for more than USER_ARCHIVE_INACTIVE_DAYS to the
+    userprofilearchive table (migration 008), in batches of
+    USER_ARCHIVE_BATCH_SIZE, each in its own transaction. Lists, counts and
+    searches of users then only scan the users that can use the app.
+    Reactivating an archived user moves it back with ``restore``. Every run
+    that moved users records the row count and size of userprofile and the
+    latency of the admin user listing before and after it. Moved users are
+    published to the change feed as deleted and restored ones as created, as
+    ``delete_instance`` and ``save`` would.
+
+    An archived user's email is not free for new users. Registration and the
+    archiver take the same transaction-scoped advisory lock on an email
+    (``lock_email``), so a registration can not slip in between the archiver
+    deleting a user and committing its archived copy.
+    """
+
+    COLUMNS = "id, name, surname, email, password, is_admin, is_active, created_at"
+
+    ELIGIBLE_SQL = """
+        SELECT EXISTS (
+            SELECT 1 FROM userprofile
+            WHERE NOT is_active
+              AND updated_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+        )
+    """
+    EMAIL_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))"
+    # The emails are locked in a statement of their own, before any row is
+    # deleted. Otherwise a registration holding the lock of an email could wait
+    # for the deleted row while the archiver waits for the lock.
+    LOCK_BATCH_SQL = """
+        SELECT id, pg_advisory_xact_lock(hashtextextended(email, 0)) FROM (
+            SELECT id, email FROM userprofile
+            WHERE NOT is_active
+              AND updated_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+            ORDER BY updated_at
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        ) batch
+    """
+    ARCHIVE_BATCH_SQL = f"""
+        WITH moved AS (
+            DELETE FROM userprofile WHERE id = ANY(%s)
+            RETURNING {COLUMNS}, updated_at
+        )
+        INSERT INTO userprofilearchive ({COLUMNS}, updated_at)
+        SELECT {COLUMNS}, updated_at FROM moved
+    """
+    # The restored row gets a new updated_at, so incremental syncs see it again.
+    RESTORE_SQL = f"""
+        WITH restored AS (
+            DELETE FROM userprofilearchive WHERE id = %s
+            RETURNING {COLUMNS}
+        )
+        INSERT INTO userprofile ({COLUMNS})
+        SELECT {COLUMNS} FROM restored
+        RETURNING id
+    """
+    SIZE_SQL = "SELECT COUNT(*), pg_total_relation_size('userprofile') FROM userprofile"
+    STATS_SQL = """
+        SELECT relname, GREATEST(reltuples, 0)::bigint, pg_total_relation_size(oid)
+        FROM pg_class
+        WHERE relname IN ('userprofile', 'userprofilearchive') AND relkind = 'r'
+    """
+    LATENCY_SAMPLES = 3
+    RECENT_RUNS = 10
+
+    @classmethod
+    def archive(cls) -> int:
+        """
+        Moves the users inactive for longer than USER_ARCHIVE_INACTIVE_DAYS to the archive,
+        at most USER_ARCHIVE_MAX_BATCHES batches per run.
+
+        Returns:
+            int: The number of users archived.
+        """
+        days = AppConfig.USER_ARCHIVE_INACTIVE_DAYS
+        if not db.execute_sql(cls.ELIGIBLE_SQL, (days,)).fetchone()[0]:
+            return 0
+
+        hot_rows_before, hot_bytes_before = db.execute_sql(cls.SIZE_SQL).fetchone()
+        list_seconds_before = cls._measure_listing()
+
+        archived = 0
+        for _ in range(AppConfig.USER_ARCHIVE_MAX_BATCHES):
+            with db.atomic():
+                cursor = db.execute_sql(
+                    cls.LOCK_BATCH_SQL, (days, AppConfig.USER_ARCHIVE_BATCH_SIZE)
+                )
+                user_ids = [row[0] for row in cursor.fetchall()]
+                if user_ids:
+                    db.execute_sql(cls.ARCHIVE_BATCH_SQL, (user_ids,))
+            ModelCacheService.invalidate(UserProfile, user_ids)
+            if ChangeFeedService.is_enabled(UserProfile):
+                for user_id in user_ids:
+                    ChangeFeedService.publish(UserProfile, user_id, "deleted")
+            archived += len(user_ids)
+            if len(user_ids) < AppConfig.USER_ARCHIVE_BATCH_SIZE:
+                break
+
+        # Makes the freed space reusable and refreshes the planner statistics
+        # before the latency is measured again.
+        db.execute_sql("VACUUM (ANALYZE) userprofile")
+        hot_rows_after, hot_bytes_after = db.execute_sql(cls.SIZE_SQL).fetchone()
+        list_seconds_after = cls._measure_listing()
+
+        UserArchiveRun.create(
+            archived=archived,
+            hot_rows_before=hot_rows_before,
+            hot_rows_after=hot_rows_after,
+            hot_bytes_before=hot_bytes_before,
+            hot_bytes_after=hot_bytes_after,
+            list_seconds_before=list_seconds_before,
+            list_seconds_after=list_seconds_after,
+        )
+        MetricsService.increment("user_archive.archived", archived)
+        MetricsService.set_gauge("user_archive.hot_rows", hot_rows_after)
+        MetricsService.observe("user_archive.list_seconds", list_seconds_after)
+        LoggerSetup.get_logger("general").info(
+            f"Archived {archived} users: userprofile went from {hot_rows_before} rows "
+            f"({hot_bytes_before} bytes) to {hot_rows_after} rows ({hot_bytes_after} bytes), "
+            f"the user listing from {list_seconds_before * 1000:.1f} ms "
+            f"to {list_seconds_after * 1000:.1f} ms"
+        )
+        return archived
+
+    @classmethod
+    def restore(cls, user_id: int) -> UserProfile:
+        """
+        Moves an archived user back to the userprofile table. The user stays inactive.
+
+        Args:
+            user_id (int): The ID of the archived user.
+
+        Returns:
+            UserProfile: The restored user.
+
+        Raises:
+            DoesNotExist: If no user with this ID is archived.
+            Exception: An exception indicating an internal server error if a database error occurs.
+        """
+        try:
+            with db.atomic():
+                if db.execute_sql(cls.RESTORE_SQL, (user_id,)).fetchone() is None:
+                    raise UserProfile.DoesNotExist(f"No archived user with ID {user_id}")
+                user = UserProfile.select().where(UserProfile.id == user_id).get()
+        except UserProfile.DoesNotExist:
+            raise
+        except PeeweeException as e:
+            raise Exception("Internal server error occurred.") from e
+
+        if ChangeFeedService.is_enabled(UserProfile):
+            UnitOfWorkMiddleware.after_commit(
+                ChangeFeedService.publish,
+                UserProfile,
+                user.id,
+                "created",
+                [column.strip() for column in cls.COLUMNS.split(",")],
+            )
+        MetricsService.increment("user_archive.restored")
+        return user
+
+    @classmethod
+    def lock_email(cls, email: str) -> None:
+        """
+        Waits for and takes the lock of an email until the current transaction
+        ends. The archiver takes it on the emails of the users it moves.
+
+        Args:
+            email (str): The email to lock.
+        """
+        db.execute_sql(cls.EMAIL_LOCK_SQL, (email,))
+
+    @staticmethod
+    def is_email_archived(email: str) -> bool:
+        """
+        Returns whether an archived user has this email, which is then not free
+        for new users.
+        """
+        return UserProfileArchive.select().where(UserProfileArchive.email == email).exists()
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """
+        Returns the size of the user tables and the outcome of the latest archival runs.
+
+        Returns:
+            Dict[str, Any]: Estimated rows and bytes of userprofile and userprofilearchive,
+                            and the latest runs, newest first.
+
+        Raises:
+            Exception: An exception indicating an internal server error if a database error occurs.
+        """
+        try:
+            sizes = {
+                name: (rows, size) for name, rows, size in db.execute_sql(cls.STATS_SQL)
+            }
+            runs = list(
+                UserArchiveRun.select()
+                .order_by(UserArchiveRun.id.desc())
+                .limit(cls.RECENT_RUNS)
+            )
+        except PeeweeException as e:
+            LoggerSetup.get_logger("general").error(f"Failed to read archive stats: {e}")
+            raise Exception(f"Failed to read archive stats: {e}")
+
+        hot_rows, hot_bytes = sizes.get("userprofile", (0, 0))
+        archived_rows, archived_bytes = sizes.get("userprofilearchive", (0, 0))
+        return {
+            "hot_rows": hot_rows,
+            "hot_bytes": hot_bytes,
+            "archived_rows": archived_rows,
+            "archived_bytes": archived_bytes,
+            "runs": runs,
+        }
+
+    @classmethod
+    def _measure_listing(cls) -> float:
+        # The default admin listing (count and first page of active users),
+        # best of a few runs to leave out cold caches.
+        samples = []
+        for _ in range(cls.LATENCY_SAMPLES):
+            started_at = time.perf_counter()
+            UserPaginationService.get_rows(
+                page=1,
+                per_page=10,
+                sort_field="name",
+                sort_order="asc",
+                search="",
+                filters={"is_active": True},
+            )
+            samples.append(time.perf_counter() - started_at)
+        return min(samples)
@@ -2,11 +2,25 @@ from typing import Dict, Union
 from flask import make_response
 from werkzeug.security import generate_password_hash, check_password_hash
 from peewee import IntegrityError
-from flask_jwt_extended import create_access_token, jwt_required
+from flask_jwt_extended import (
+    create_access_token,
+    get_jwt,
+    get_jwt_identity,
+    jwt_required,
+)
 from datetime import timedelta
+from app.db_init import db
 from app.enums.http_status import HttpStatus
 from app.logger_setup import LoggerSetup
 from app.models.user_profile import UserProfile
+from app.services.outbox_service import OutboxService
+from app.services.prepared_statement_service import PreparedStatementService
+from app.services.tracing_service import TracingService
+from app.services.user_services.token_revocation_service import (
+    TokenRevocationService,
+)
+from app.services.user_services.user_archive_service import UserArchiveService
+from app.tasks.user_event_tasks import user_registered_task
 from config.app_config import AppConfig
 
 
@@ -32,21 +46,35 @@ class UserAuthService:
         surname = data.get("surname")
         email = data.get("email")
         password = data.get("password")
-        hashed_password = generate_password_hash(password)
+        hashed_password = UserAuthService.hash_password(password)
 
         try:
-            user = UserProfile.create(
-                name=name,
-                surname=surname,
-                email=email,
-                password=hashed_password,
-                is_admin=False,
-            )
-            user.save()
+            with db.atomic():
+                # Under the archiver's lock of the email, a user being archived
+                # is either still in userprofile or already in the archive.
+                UserArchiveService.lock_email(email)
+                if UserArchiveService.is_email_archived(email):
+                    return {
+                        "message": "This email is already used"
+                    }, HttpStatus.BAD_REQUEST.value
+
+                user = UserProfile.create(
+                    name=name,
+                    surname=surname,
+                    email=email,
+                    password=hashed_password,
+                    is_admin=False,
+                )
+                OutboxService.enqueue(
+                    user_registered_task.name,
+                    {"user_id": user.id},
+                    dedup_key=f"user.registered:{user.id}",
+                )
 
             access_token = create_access_token(
                 identity=user.id,
                 expires_delta=timedelta(minutes=int(AppConfig.TOKEN_EXPIRATION_TIME)),
+                additional_claims=TokenRevocationService.token_claims(user.id),
             )
 
             response = make_response(
@@ -83,13 +111,16 @@ class UserAuthService:
         password = data.get("password")
 
         try:
-            user = UserProfile.get(UserProfile.email == email)
-            if check_password_hash(user.password, password):
+            user = PreparedStatementService.get(
+                UserProfile.select().where(UserProfile.email == email)
+            )
+            if UserAuthService.check_password(user, password):
                 access_token = create_access_token(
                     identity=user.id,
                     expires_delta=timedelta(
                         minutes=int(AppConfig.TOKEN_EXPIRATION_TIME)
                     ),
+                    additional_claims=TokenRevocationService.token_claims(user.id),
                 )
 
                 response = make_response(
@@ -116,17 +147,38 @@ class UserAuthService:
     @jwt_required()
     def logout() -> make_response:
         """
-        Logs out the current user by removing the access token cookie.
+        Logs out the current user by revoking the current token and removing the access token cookie.
 
         Returns:
             make_response: A success message confirming the logout.
         """
+        TokenRevocationService.revoke_token(get_jwt())
+
         response = make_response(
             {"message": "User logged out successfully"}, HttpStatus.OK.value
         )
         response.set_cookie("access_token_cookie", "", expires=0, httponly=True)
         return response
 
+    @staticmethod
+    @jwt_required()
+    def logout_all() -> make_response:
+        """
+        Logs out the current user from every device by revoking all of their issued tokens.
+
+        Returns:
+            make_response: A success message confirming the logout.
+        """
+        TokenRevocationService.revoke_token(get_jwt())
+        TokenRevocationService.revoke_all_for_user(get_jwt_identity())
+
+        response = make_response(
+            {"message": "User logged out from all devices successfully"},
+            HttpStatus.OK.value,
+        )
+        response.set_cookie("access_token_cookie", "", expires=0, httponly=True)
+        return response
+
     @staticmethod
     def check_if_admin(user: UserProfile) -> bool:
         """
@@ -138,6 +190,21 @@ class UserAuthService:
         return user.is_admin
 
     @staticmethod
+    @TracingService.traced("auth.hash_password")
+    def hash_password(password: str) -> str:
+        """
+        Hashes a password for storage.
+
+        Args:
+            password (str): The plain text password.
+
+        Returns:
+            str: The salted password hash.
+        """
+        return generate_password_hash(password)
+
+    @staticmethod
+    @TracingService.traced("auth.check_password")
     def check_password(user: UserProfile, password: str) -> bool:
         """
         Checks if the provided password matches the current password of the user.
@@ -149,7 +216,15 @@ class UserAuthService:
         Returns:
             bool: True if the password matches, False otherwise.
         """
-        return check_password_hash(user.password, password)
+        password_hash = user.password
+        if password_hash is None:
+            # Users served from the model cache are stored without their password hash.
+            password_hash = (
+                UserProfile.select(UserProfile.password)
+                .where(UserProfile.id == user.id)
+                .scalar()
+            )
+        return check_password_hash(password_hash, password)
 
     @staticmethod
     def change_password(user: UserProfile, new_password: str) -> None:
@@ -163,6 +238,6 @@ class UserAuthService:
         Returns:
             None
         """
-        hashed_password = generate_password_hash(new_password)
+        hashed_password = UserAuthService.hash_password(new_password)
         user.password = hashed_password
         user.save()
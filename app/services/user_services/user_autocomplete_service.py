@@ -0,0 +1,84 @@
+from typing import Any, Dict, List
+
+from peewee import PeeweeException
+
+from app.db_init import db
+from app.services.metrics_service import MetricsService
+from app.services.prepared_statement_service import PreparedStatementService
+
+
+class UserAutocompleteService:
+    """
+    Typeahead lookup of users by the prefix of their name, surname or email.
+
+    Every column has an index on ``lower(column) text_pattern_ops`` (migration
+    010), so each lookup is three index range scans stopped after ``limit``
+    rows, without a count and without reading users that do not match. The
+    indexes are maintained by Postgres, so created and updated users are found
+    right away.
+
+    The prefix is matched as the range [prefix, prefix + U+10FFFF) of the
+    byte-wise ``~>=~`` and ``~<~`` operators rather than with ``LIKE``. Unlike
+    a ``LIKE`` pattern, the range can use the index in the generic plan of a
+    prepared statement.
+    """
+
+    UPPER_BOUND_SUFFIX = "\U0010ffff"
+    LOOKUP_SQL = """
+        (SELECT id, name, surname, email, is_active FROM userprofile
+         WHERE lower(name) ~>=~ %s AND lower(name) ~<~ %s
+         ORDER BY lower(name) USING ~<~ LIMIT %s)
+        UNION ALL
+        (SELECT id, name, surname, email, is_active FROM userprofile
+         WHERE lower(surname) ~>=~ %s AND lower(surname) ~<~ %s
+         ORDER BY lower(surname) USING ~<~ LIMIT %s)
+        UNION ALL
+        (SELECT id, name, surname, email, is_active FROM userprofile
+         WHERE lower(email) ~>=~ %s AND lower(email) ~<~ %s
+         ORDER BY lower(email) USING ~<~ LIMIT %s)
+    """
+
+    @classmethod
+    def lookup(cls, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Returns the users whose name, surname or email starts with the prefix,
+        ignoring case. Name matches come first, then surname and email
+        matches, each in alphabetical order.
+
+        Args:
+            prefix (str): The typed text.
+            limit (int): The maximum number of users returned.
+
+        Returns:
+            List[Dict[str, Any]]: The ID, name, surname, email and active status of the matching users.
+
+        Raises:
+            Exception: An exception indicating an internal server error if a database error occurs.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+
+        params = (prefix, prefix + cls.UPPER_BOUND_SUFFIX, limit) * 3
+        try:
+            if PreparedStatementService.is_enabled(db):
+                cursor = PreparedStatementService.execute(db, cls.LOOKUP_SQL, params)
+            else:
+                cursor = db.execute_sql(cls.LOOKUP_SQL, params)
+            rows = cursor.fetchall()
+        except PeeweeException as e:
+            raise Exception("Internal server error occurred.") from e
+
+        users = {}
+        for user_id, name, surname, email, is_active in rows:
+            # A user matching on several columns is listed at its first match.
+            if user_id not in users:
+                users[user_id] = {
+                    "id": user_id,
+                    "name": name,
+                    "surname": surname,
+                    "email": email,
+                    "is_active": is_active,
+                }
+        MetricsService.increment("user_autocomplete.lookups")
+        return list(users.values())[:limit]
@@ -1,8 +1,11 @@
-from typing import Dict, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 from app.models.user_profile import UserProfile
 from peewee import DoesNotExist, PeeweeException
 
+from app.db_init import db
+from app.services.outbox_service import OutboxService
 from app.services.user_services.user_auth_service import UserAuthService
+from app.tasks.user_event_tasks import user_status_changed_task
 
 
 class UserCRUDService:
@@ -27,6 +30,36 @@ class UserCRUDService:
         except PeeweeException as e:
             raise Exception("Internal server error occurred.") from e
 
+    @staticmethod
+    def get_users_by_ids(user_ids: List[int]) -> Tuple[List[UserProfile], List[int]]:
+        """
+        Retrieves many users with a single query, in the order of the requested IDs.
+
+        Args:
+            user_ids (List[int]): The IDs of the users to retrieve. Duplicates are returned once.
+
+        Returns:
+            Tuple[List[UserProfile], List[int]]: The found users ordered like the request and the IDs that were not found.
+
+        Raises:
+            Exception: An exception indicating an internal server error if a database or unexpected error occurs.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        if not unique_ids:
+            return [], []
+
+        try:
+            users_by_id = {
+                user.id: user
+                for user in UserProfile.select().where(UserProfile.id.in_(unique_ids))
+            }
+        except PeeweeException as e:
+            raise Exception("Internal server error occurred.") from e
+
+        users = [users_by_id[user_id] for user_id in unique_ids if user_id in users_by_id]
+        missing_ids = [user_id for user_id in unique_ids if user_id not in users_by_id]
+        return users, missing_ids
+
     @staticmethod
     def toggle_active_status(user: UserProfile) -> Tuple[bool, str]:
         """
@@ -47,7 +80,12 @@ class UserCRUDService:
                 user.is_active = True
                 message = "User status changed to active."
 
-            user.save()
+            with db.atomic():
+                user.save()
+                OutboxService.enqueue(
+                    user_status_changed_task.name,
+                    {"user_id": user.id, "is_active": user.is_active},
+                )
             return user.is_active, message
         except Exception as e:
             raise Exception(f"Error while toggling user status: {str(e)}")
@@ -1,5 +1,6 @@
 from typing import Any, Dict, List, Tuple
 from app.models.user_profile import UserProfile
+from app.models.user_profile_archive import UserProfileArchive
 from app.services.base_crud_services.base_pagination_service import (
     BasePaginationService,
 )
@@ -15,7 +16,15 @@ class UserPaginationService(BasePaginationService):
         sort_order: str,
         search: str,
         filters: Dict[str, Any],
+        include_archived: bool = False,
     ) -> Tuple[List[UserProfile], int, int]:
         return super().get_rows(
-            UserProfile, page, per_page, sort_field, sort_order, search, filters
+            UserProfile,
+            page,
+            per_page,
+            sort_field,
+            sort_order,
+            search,
+            filters,
+            UserProfileArchive if include_archived else None,
         )
@@ -0,0 +1,110 @@
+from datetime import timedelta
+from typing import Any, Dict
+
+from peewee import PeeweeException
+
+from app.db_init import db
+from app.logger_setup import LoggerSetup
+from app.models.user_daily_stats import UserDailyStats
+from app.models.user_stats_summary import UserStatsSummary
+from app.services.metrics_service import MetricsService
+
+
+class UserStatsService:
+    """
+    User statistics for the admin dashboard, served from precomputed aggregates.
+
+    Triggers on the userprofile table append the effect of every insert,
+    delete and relevant update to userstatsdelta (migration 005). ``refresh``
+    runs periodically from Celery beat and folds the pending deltas into the
+    per-day counts and the totals in a single statement, so its cost depends
+    on the writes since the last refresh, not on the number of users.
+    """
+
+    REFRESH_SQL = """
+        WITH consumed AS (
+            DELETE FROM userstatsdelta RETURNING day, total, active, admins
+        ), daily AS (
+            INSERT INTO userdailystats AS stats (day, total, active, admins)
+            SELECT day, SUM(total), SUM(active), SUM(admins)
+            FROM consumed
+            GROUP BY day
+            ON CONFLICT (day) DO UPDATE SET
+                total = stats.total + EXCLUDED.total,
+                active = stats.active + EXCLUDED.active,
+                admins = stats.admins + EXCLUDED.admins,
+                updated_at = CURRENT_TIMESTAMP
+        )
+        UPDATE userstatssummary SET
+            total = userstatssummary.total + COALESCE((SELECT SUM(total) FROM consumed), 0),
+            active = userstatssummary.active + COALESCE((SELECT SUM(active) FROM consumed), 0),
+            admins = userstatssummary.admins + COALESCE((SELECT SUM(admins) FROM consumed), 0),
+            refreshed_at = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING (SELECT COUNT(*) FROM consumed)
+    """
+
+    @classmethod
+    def refresh(cls) -> int:
+        """
+        Folds the pending user deltas into the aggregates.
+
+        Rows appended by transactions that commit while the refresh runs are
+        not visible to it and are left for the next refresh.
+
+        Returns:
+            int: The number of deltas folded in.
+        """
+        with db.atomic():
+            row = db.execute_sql(cls.REFRESH_SQL).fetchone()
+        folded = row[0] if row else 0
+        MetricsService.increment("user_stats.refreshes")
+        MetricsService.increment("user_stats.deltas_folded", folded)
+        return folded
+
+    @classmethod
+    def get_stats(cls, days: int) -> Dict[str, Any]:
+        """
+        Returns the user totals and registrations per day from the aggregates.
+
+        Args:
+            days (int): The number of days, including today, registrations are listed for.
+
+        Returns:
+            Dict[str, Any]: Total, active and admin user counts, registrations per day
+                            (oldest first, days without registrations included),
+                            the time the aggregates were refreshed at and their age in seconds.
+
+        Raises:
+            Exception: An exception indicating an internal server error if a database error occurs.
+        """
+        try:
+            today, now = db.execute_sql("SELECT CURRENT_DATE, LOCALTIMESTAMP").fetchone()
+            summary = UserStatsSummary.select().order_by(UserStatsSummary.id).first()
+            first_day = today - timedelta(days=days - 1)
+            registrations = {
+                row.day: row.total
+                for row in UserDailyStats.select(UserDailyStats.day, UserDailyStats.total)
+                .where(UserDailyStats.day >= first_day)
+            }
+        except PeeweeException as e:
+            LoggerSetup.get_logger("general").error(f"Failed to read user stats: {e}")
+            raise Exception(f"Failed to read user stats: {e}")
+
+        refreshed_at = summary.refreshed_at if summary else None
+        return {
+            "total": summary.total if summary else 0,
+            "active": summary.active if summary else 0,
+            "admins": summary.admins if summary else 0,
+            "registrations_per_day": [
+                {
+                    "day": first_day + timedelta(days=offset),
+                    "registrations": registrations.get(first_day + timedelta(days=offset), 0),
+                }
+                for offset in range(days)
+            ],
+            "refreshed_at": refreshed_at,
+            "age_seconds": (
+                (now - refreshed_at).total_seconds() if refreshed_at else None
+            ),
+        }
@@ -0,0 +1,204 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from peewee import PeeweeException, Tuple
+
+from app.db_init import db
+from app.models.user_profile import UserProfile
+from app.models.user_profile_tombstone import UserProfileTombstone
+from config.app_config import AppConfig
+
+
+class UserSyncService:
+    """
+    Incremental "changed since" sync of the user directory.
+
+    Changes are read in (updated_at, id) keyset order and deletions from the
+    tombstone table in (created_at, id) order, so a sync only touches rows
+    changed after the client's sync token. Both timestamps are the start time
+    of the writing transaction, which can commit long after it started. Rows
+    are therefore only returned once they are older than every transaction
+    still open, and at least USER_SYNC_SETTLE_SECONDS old. Every transaction
+    that commits later writes newer timestamps, so the token never passes a
+    row that is not committed yet.
+
+    Tombstones are purged after USER_SYNC_TOMBSTONE_RETENTION_DAYS by
+    ``purge_tombstones``. A token whose tombstone position is older than that
+    may have missed deletions, so it is rejected and the client has to sync
+    from scratch.
+    """
+
+    # Read in its own statement before the rows, so a transaction that commits
+    # in between is visible to the row query. The second column is the oldest
+    # tombstone position still accepted, an hour after the purge cutoff so a
+    # purge running during the sync does not remove tombstones the token needs.
+    WATERMARK_SQL = """
+        SELECT
+            LEAST(
+                LOCALTIMESTAMP - make_interval(secs => %s),
+                (
+                    SELECT MIN(xact_start)::timestamp FROM pg_stat_activity
+                    WHERE datname = current_database()
+                      AND backend_type = 'client backend'
+                      AND pid <> pg_backend_pid()
+                )
+            ),
+            LOCALTIMESTAMP - make_interval(days => %s) + INTERVAL '1 hour'
+    """
+    PURGE_TOMBSTONES_SQL = """
+        DELETE FROM userprofiletombstone WHERE id IN (
+            SELECT id FROM userprofiletombstone
+            WHERE created_at < LOCALTIMESTAMP - make_interval(days => %s)
+            LIMIT %s
+        )
+    """
+    PURGE_BATCH_SIZE = 10000
+    RESYNC_REQUIRED_MESSAGE = (
+        "The sync token is older than the tombstone retention, a full resync is required."
+    )
+
+    @classmethod
+    def get_changes(cls, sync_token: Optional[str], limit: int) -> Dict[str, Any]:
+        """
+        Returns the user changes made after the given sync token.
+
+        Args:
+            sync_token (Optional[str]): The token returned by the previous sync, None for a full sync.
+            limit (int): The maximum number of changed users and of deleted users returned.
+
+        Returns:
+            Dict[str, Any]: Changed active users, IDs of deleted or deactivated users,
+                            the next sync token and whether more changes are pending.
+
+        Raises:
+            ValueError: If the sync token is invalid, or too old and a full resync is required.
+            Exception: An exception indicating an internal server error if a database error occurs.
+        """
+        (
+            last_updated_at,
+            last_user_id,
+            last_tombstone_at,
+            last_tombstone_id,
+        ) = cls.decode_token(sync_token)
+        # Tokens issued before tombstones had a timestamp position can not be
+        # checked against the retention.
+        if sync_token and last_tombstone_at is None:
+            raise ValueError(cls.RESYNC_REQUIRED_MESSAGE)
+
+        try:
+            upper_bound, oldest_tombstone_at = db.execute_sql(
+                cls.WATERMARK_SQL,
+                (
+                    AppConfig.USER_SYNC_SETTLE_SECONDS,
+                    AppConfig.USER_SYNC_TOMBSTONE_RETENTION_DAYS,
+                ),
+            ).fetchone()
+            if last_tombstone_at is not None and last_tombstone_at < oldest_tombstone_at:
+                raise ValueError(cls.RESYNC_REQUIRED_MESSAGE)
+
+            query = UserProfile.select().where(UserProfile.updated_at < upper_bound)
+            if last_updated_at is not None:
+                query = query.where(
+                    Tuple(UserProfile.updated_at, UserProfile.id)
+                    > Tuple(last_updated_at, last_user_id)
+                )
+            changed = list(
+                query.order_by(UserProfile.updated_at, UserProfile.id).limit(limit + 1)
+            )
+
+            tombstone_query = UserProfileTombstone.select().where(
+                UserProfileTombstone.created_at < upper_bound
+            )
+            if last_tombstone_at is not None:
+                tombstone_query = tombstone_query.where(
+                    Tuple(UserProfileTombstone.created_at, UserProfileTombstone.id)
+                    > Tuple(last_tombstone_at, last_tombstone_id)
+                )
+            tombstones = list(
+                tombstone_query.order_by(
+                    UserProfileTombstone.created_at, UserProfileTombstone.id
+                ).limit(limit + 1)
+            )
+        except PeeweeException as e:
+            raise Exception("Internal server error occurred.") from e
+
+        tombstones_pending = len(tombstones) > limit
+        has_more = len(changed) > limit or tombstones_pending
+        changed = changed[:limit]
+        tombstones = tombstones[:limit]
+
+        if changed:
+            last_updated_at, last_user_id = changed[-1].updated_at, changed[-1].id
+        if tombstones_pending:
+            last_tombstone_at, last_tombstone_id = (
+                tombstones[-1].created_at,
+                tombstones[-1].id,
+            )
+        else:
+            # Every tombstone before the watermark was returned, so the token
+            # moves up to it and stays within the retention while nothing is deleted.
+            last_tombstone_at, last_tombstone_id = upper_bound, 0
+
+        return {
+            "users": [user for user in changed if user.is_active],
+            "deleted_ids": [user.id for user in changed if not user.is_active]
+            + [tombstone.user_id for tombstone in tombstones],
+            "sync_token": cls.encode_token(
+                last_updated_at, last_user_id, last_tombstone_at, last_tombstone_id
+            ),
+            "has_more": has_more,
+        }
+
+    @classmethod
+    def purge_tombstones(cls) -> int:
+        """
+        Deletes the tombstones older than USER_SYNC_TOMBSTONE_RETENTION_DAYS, in batches.
+
+        Returns:
+            int: The number of tombstones deleted.
+        """
+        purged = 0
+        while True:
+            with db.atomic():
+                deleted = db.execute_sql(
+                    cls.PURGE_TOMBSTONES_SQL,
+                    (AppConfig.USER_SYNC_TOMBSTONE_RETENTION_DAYS, cls.PURGE_BATCH_SIZE),
+                ).rowcount
+            purged += deleted
+            if deleted < cls.PURGE_BATCH_SIZE:
+                return purged
+
+    @staticmethod
+    def encode_token(
+        updated_at: Optional[datetime],
+        user_id: Optional[int],
+        tombstone_at: Optional[datetime],
+        tombstone_id: int,
+    ) -> str:
+        payload = [
+            updated_at.isoformat() if updated_at else None,
+            user_id,
+            tombstone_id,
+            tombstone_at.isoformat() if tombstone_at else None,
+        ]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    @staticmethod
+    def decode_token(sync_token: Optional[str]):
+        if not sync_token:
+            return None, None, None, 0
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(sync_token.encode()))
+            updated_at, user_id, tombstone_id = payload[:3]
+            tombstone_at = payload[3] if len(payload) > 3 else None
+            return (
+                datetime.fromisoformat(updated_at) if updated_at else None,
+                int(user_id) if user_id is not None else None,
+                datetime.fromisoformat(tombstone_at) if tombstone_at else None,
+                int(tombstone_id),
+            )
+        except (ValueError, TypeError):
+            raise ValueError("Invalid sync token.")
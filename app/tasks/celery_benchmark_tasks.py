@@ -0,0 +1,26 @@
+import time
+
+from celery import shared_task
+
+
+def _timings(task, enqueued_at: float, started_at: float) -> dict:
+    return {
+        "hostname": task.request.hostname,
+        "enqueued_at": enqueued_at,
+        "started_at": started_at,
+        "finished_at": time.time(),
+    }
+
+
+@shared_task(bind=True, ignore_result=False)
+def celery_benchmark_noop_task(self, enqueued_at):
+    return _timings(self, enqueued_at, time.time())
+
+
+@shared_task(bind=True, ignore_result=False)
+def celery_benchmark_cpu_task(self, enqueued_at, iterations):
+    started_at = time.time()
+    total = 0
+    for i in range(iterations):
+        total += i * i % 7
+    return _timings(self, enqueued_at, started_at)
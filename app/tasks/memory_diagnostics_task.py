@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from app.services.memory_diagnostics_service import MemoryDiagnosticsService
+
+
+@shared_task(bind=True, ignore_result=False)
+def memory_diagnostics_task(self, limit, key_type):
+    report = MemoryDiagnosticsService.take_snapshot(limit, key_type)
+    report["hostname"] = self.request.hostname
+    return report
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from app.services.outbox_service import OutboxService
+
+
+@shared_task(ignore_result=True)
+def relay_outbox_task():
+    return OutboxService.relay()
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from app.services.user_services.user_archive_service import UserArchiveService
+
+
+@shared_task(ignore_result=True)
+def archive_inactive_users_task():
+    return UserArchiveService.archive()
@@ -0,0 +1,21 @@
+from celery import shared_task
+
+from app.logger_setup import LoggerSetup
+from app.services.outbox_service import OutboxService
+
+# Side effects of user changes (welcome emails, CRM sync) belong in these
+# tasks. They are sent through the outbox, see OutboxService.
+
+
+@shared_task(bind=True, ignore_result=True)
+@OutboxService.deduplicated
+def user_registered_task(self, user_id):
+    LoggerSetup.get_logger("general").info(f"User {user_id} registered")
+
+
+@shared_task(bind=True, ignore_result=True)
+@OutboxService.deduplicated
+def user_status_changed_task(self, user_id, is_active):
+    LoggerSetup.get_logger("general").info(
+        f"User {user_id} status changed, active: {is_active}"
+    )
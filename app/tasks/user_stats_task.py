@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from app.services.user_services.user_stats_service import UserStatsService
+
+
+@shared_task(ignore_result=True)
+def refresh_user_stats_task():
+    return UserStatsService.refresh()
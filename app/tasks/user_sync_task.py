@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from app.services.user_services.user_sync_service import UserSyncService
+
+
+@shared_task(ignore_result=True)
+def purge_user_tombstones_task():
+    return UserSyncService.purge_tombstones()
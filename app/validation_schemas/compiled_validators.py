@@ -0,0 +1,177 @@
+from typing import Any, Callable, Dict, Optional
+
+from flask_restx import Api
+from flask_restx.model import ModelBase
+
+Checker = Callable[[Any], bool]
+
+
+class CompiledValidators:
+    """
+    Replaces the per-request JSON schema validation of restx models with
+    checker functions compiled once at startup.
+
+    restx rebuilds a model's schema and a ``Draft4Validator`` for every
+    ``expect(..., validate=True)`` request. The compiled checker only answers
+    "certainly valid": payloads it accepts skip jsonschema entirely, anything
+    else goes through the original ``Model.validate``, so invalid payloads get
+    the same 400 response and error messages as before. Schemas using keywords
+    the compiler does not know always take the original path.
+    """
+
+    TYPE_CHECKS: Dict[str, Checker] = {
+        "string": lambda value: type(value) is str,
+        "integer": lambda value: type(value) is int,
+        "number": lambda value: type(value) in (int, float),
+        "boolean": lambda value: type(value) is bool,
+        "object": lambda value: type(value) is dict,
+        "array": lambda value: type(value) is list,
+        "null": lambda value: value is None,
+    }
+    # Keywords that never change the validation result.
+    ANNOTATIONS = {
+        "description",
+        "example",
+        "default",
+        "title",
+        "readOnly",
+        "discriminator",
+        "x-mask",
+    }
+    DEFINITION_PREFIX = "#/definitions/"
+
+    @classmethod
+    def init_api(cls, api: Api) -> Dict[str, bool]:
+        """
+        Compiles a checker for every model registered on the API and installs
+        it in front of the model's ``validate``.
+
+        Args:
+            api (Api): The restx API, after all namespaces were added.
+
+        Returns:
+            Dict[str, bool]: The model names and whether a checker could be compiled.
+        """
+        compiled: Dict[str, Optional[Checker]] = {}
+        checkers: Dict[str, Checker] = {}
+        # Nested models are looked up by name at call time, so models can
+        # reference each other in any order.
+        context = {
+            "models": api.models,
+            "checkers": checkers,
+            "ignore_format": api.format_checker is None,
+        }
+        for name, model in api.models.items():
+            compiled[name] = cls.compile(model.__schema__, context)
+            if compiled[name] is not None:
+                checkers[name] = compiled[name]
+
+        for name, model in api.models.items():
+            if compiled[name] is not None:
+                model.validate = cls._validator(model, compiled[name])
+        return {name: checker is not None for name, checker in compiled.items()}
+
+    @classmethod
+    def compile(cls, schema: Dict[str, Any], context: Dict[str, Any]) -> Optional[Checker]:
+        """
+        Compiles a JSON schema into a function returning True for values that
+        are certainly valid.
+
+        Args:
+            schema (Dict[str, Any]): The JSON schema of a model or field.
+            context (Dict[str, Any]): The registered models and their compiled checkers.
+
+        Returns:
+            Optional[Checker]: The checker, None if the schema uses unsupported keywords.
+        """
+        checks = []
+        for keyword, value in schema.items():
+            if keyword in cls.ANNOTATIONS:
+                continue
+            if keyword == "format" and context["ignore_format"]:
+                continue
+
+            if keyword == "type":
+                if not isinstance(value, str) or value not in cls.TYPE_CHECKS:
+                    return None
+                checks.append(cls.TYPE_CHECKS[value])
+            elif keyword == "enum":
+                if not all(type(option) is str for option in value):
+                    return None
+                options = frozenset(value)
+                checks.append(lambda v, options=options: type(v) is str and v in options)
+            elif keyword == "required":
+                required = tuple(value)
+                checks.append(
+                    lambda v, required=required: type(v) is dict
+                    and all(name in v for name in required)
+                )
+            elif keyword == "properties":
+                properties = {}
+                for name, property_schema in value.items():
+                    properties[name] = cls.compile(property_schema, context)
+                    if properties[name] is None:
+                        return None
+                checks.append(cls._properties_check(properties))
+            elif keyword == "additionalProperties" and value is False:
+                allowed = frozenset(schema.get("properties", {}))
+                checks.append(
+                    lambda v, allowed=allowed: type(v) is dict and allowed.issuperset(v)
+                )
+            elif keyword == "items" and isinstance(value, dict):
+                item_check = cls.compile(value, context)
+                if item_check is None:
+                    return None
+                checks.append(
+                    lambda v, item_check=item_check: type(v) is list
+                    and all(item_check(item) for item in v)
+                )
+            elif keyword == "allOf":
+                sub_checks = tuple(cls.compile(sub_schema, context) for sub_schema in value)
+                if None in sub_checks:
+                    return None
+                checks.append(
+                    lambda v, sub_checks=sub_checks: all(check(v) for check in sub_checks)
+                )
+            elif keyword == "$ref" and value.startswith(cls.DEFINITION_PREFIX):
+                name = value[len(cls.DEFINITION_PREFIX):]
+                if name not in context["models"]:
+                    return None
+                checks.append(cls._reference_check(name, context["checkers"]))
+            else:
+                return None
+
+        checks = tuple(checks)
+        return lambda value: all(check(value) for check in checks)
+
+    @staticmethod
+    def _properties_check(properties: Dict[str, Checker]) -> Checker:
+        items = tuple(properties.items())
+
+        def check(value):
+            # Like jsonschema, properties only apply to objects.
+            if type(value) is not dict:
+                return True
+            return all(name not in value or checker(value[name]) for name, checker in items)
+
+        return check
+
+    @staticmethod
+    def _reference_check(name: str, checkers: Dict[str, Checker]) -> Checker:
+        def check(value):
+            checker = checkers.get(name)
+            return checker is not None and checker(value)
+
+        return check
+
+    @staticmethod
+    def _validator(model: ModelBase, checker: Checker):
+        # Taken from the class, so compiling again does not stack wrappers.
+        original = type(model).validate.__get__(model)
+
+        def validate(data, resolver=None, format_checker=None):
+            if checker(data):
+                return
+            original(data, resolver, format_checker)
+
+        return validate
@@ -0,0 +1,46 @@
+from flask_restx import fields
+
+
+def create_health_models(namespace):
+    liveness_response_model = namespace.model(
+        "LivenessResponse",
+        {
+            "status": fields.String(
+                description="Always 'ok' while the process serves requests",
+                example="ok",
+            ),
+        },
+    )
+
+    readiness_response_model = namespace.model(
+        "ReadinessResponse",
+        {
+            "status": fields.String(
+                description="'ok' if every dependency is healthy, 'degraded' if only non-critical ones failed, 'error' otherwise",
+                example="ok",
+            ),
+            "checked_at": fields.Float(
+                description="Unix time of the probe, reports are cached for a short interval",
+                example=1760000000.0,
+            ),
+            "checks": fields.Raw(
+                description="Status, latency_ms, critical and error or details of each dependency",
+                example={
+                    "database": {"status": "ok", "latency_ms": 1.2, "critical": True},
+                    "redis": {"status": "ok", "latency_ms": 0.4, "critical": True},
+                    "celery_broker": {"status": "ok", "latency_ms": 3.1, "critical": False},
+                    "celery_workers": {
+                        "status": "ok",
+                        "latency_ms": 502.7,
+                        "critical": False,
+                        "workers": ["celery@worker-1"],
+                    },
+                },
+            ),
+        },
+    )
+
+    return {
+        "liveness_response": liveness_response_model,
+        "readiness_response": readiness_response_model,
+    }
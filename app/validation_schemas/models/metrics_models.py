@@ -0,0 +1,155 @@
+from flask_restx import fields
+
+from app.validation_schemas.typed_request_parser import TypedRequestParser
+
+
+def create_metrics_models(namespace):
+    metrics_response_model = namespace.model(
+        "MetricsResponse",
+        {
+            "pid": fields.Integer(
+                description="ID of the worker process that served the request",
+                example=12,
+            ),
+            "metrics": fields.Raw(
+                description="Counters, gauges and observations collected by this process"
+            ),
+            "model_cache": fields.Raw(
+                description="Hit ratio and staleness statistics of the model cache"
+            ),
+            "circuit_breakers": fields.Raw(
+                description="State of the Postgres and Redis circuit breakers of this process"
+            ),
+            "admission": fields.Raw(
+                description="Concurrency limit, in-flight and queued requests per route class"
+            ),
+        },
+    )
+
+    memory_report_model = namespace.model(
+        "MemoryReport",
+        {
+            "pid": fields.Integer(
+                description="ID of the worker process that served the request",
+                example=12,
+            ),
+            "tracing": fields.Boolean(
+                description="Whether tracemalloc is tracing allocations", example=True
+            ),
+            "rss_bytes": fields.Integer(description="Resident memory of the process"),
+            "traced_bytes": fields.Integer(
+                description="Memory currently traced by tracemalloc"
+            ),
+            "traced_peak_bytes": fields.Integer(
+                description="Peak memory traced by tracemalloc"
+            ),
+            "snapshots": fields.Raw(
+                description="Time and total size of the kept snapshots"
+            ),
+            "top": fields.Raw(
+                description="Largest allocation sites of the newest snapshot"
+            ),
+            "growth_since_previous": fields.Raw(
+                description="Allocation sites that grew the most since the previous snapshot"
+            ),
+            "growth_since_first": fields.Raw(
+                description="Allocation sites that grew the most since the oldest kept snapshot"
+            ),
+        },
+    )
+
+    outbox_stats_model = namespace.model(
+        "OutboxStats",
+        {
+            "pending": fields.Integer(
+                description="Messages waiting to be sent to the broker", example=0
+            ),
+            "failed": fields.Integer(
+                description="Messages given up on after OUTBOX_MAX_ATTEMPTS", example=0
+            ),
+            "lag_seconds": fields.Float(
+                description="Age of the oldest pending message, 0 when none are pending",
+                example=0.4,
+            ),
+            "dispatched_last_minute": fields.Integer(
+                description="Messages sent to the broker in the last minute", example=120
+            ),
+        },
+    )
+
+    user_archive_run_model = namespace.model(
+        "UserArchiveRun",
+        {
+            "created_at": fields.DateTime(
+                dt_format="iso8601", description="Time the run started"
+            ),
+            "archived": fields.Integer(description="Users moved to the archive", example=5000),
+            "hot_rows_before": fields.Integer(
+                description="Rows of userprofile before the run", example=120000
+            ),
+            "hot_rows_after": fields.Integer(
+                description="Rows of userprofile after the run", example=115000
+            ),
+            "hot_bytes_before": fields.Integer(
+                description="Size of userprofile with its indexes before the run"
+            ),
+            "hot_bytes_after": fields.Integer(
+                description="Size of userprofile with its indexes after the run"
+            ),
+            "list_seconds_before": fields.Float(
+                description="Latency of the default admin user listing before the run",
+                example=0.012,
+            ),
+            "list_seconds_after": fields.Float(
+                description="Latency of the default admin user listing after the run",
+                example=0.009,
+            ),
+        },
+    )
+
+    user_archive_stats_model = namespace.model(
+        "UserArchiveStats",
+        {
+            "hot_rows": fields.Integer(
+                description="Estimated rows of userprofile", example=115000
+            ),
+            "hot_bytes": fields.Integer(description="Size of userprofile with its indexes"),
+            "archived_rows": fields.Integer(
+                description="Estimated rows of userprofilearchive", example=5000
+            ),
+            "archived_bytes": fields.Integer(
+                description="Size of userprofilearchive with its indexes"
+            ),
+            "runs": fields.List(
+                fields.Nested(user_archive_run_model),
+                description="Latest runs that archived users, newest first",
+            ),
+        },
+    )
+
+    return {
+        "metrics_response": metrics_response_model,
+        "memory_report": memory_report_model,
+        "outbox_stats": outbox_stats_model,
+        "user_archive_stats": user_archive_stats_model,
+    }
+
+
+def create_memory_parser():
+    memory_parser = TypedRequestParser(bundle_errors=True)
+    memory_parser.add_argument(
+        "limit",
+        type=int,
+        default=10,
+        required=False,
+        help="Number of allocation sites listed per section",
+    )
+    memory_parser.add_argument(
+        "key_type",
+        type=str,
+        default="lineno",
+        choices=("lineno", "filename", "traceback"),
+        required=False,
+        help="Group allocations by line, file or traceback",
+    )
+    return memory_parser
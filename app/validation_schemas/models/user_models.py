@@ -1,6 +1,7 @@
 from datetime import datetime
-from flask_restx import fields
-from flask_restx import reqparse
+from flask_restx import fields, inputs
+
+from app.validation_schemas.typed_request_parser import TypedRequestParser
 
 
 def create_user_models(namespace):
@@ -130,10 +131,22 @@ def create_user_models(namespace):
         },
     )
 
+    user_list_item_model = namespace.clone(
+        "UserListItem",
+        user_profile_model,
+        {
+            "is_archived": fields.Boolean(
+                default=False,
+                description="Flag noting if the user is archived, see include_archived",
+                example=False,
+            ),
+        },
+    )
+
     user_response_model = namespace.model(
         "UserPaginationResponse",
         {
-            "users": fields.List(fields.Nested(user_profile_model)),
+            "users": fields.List(fields.Nested(user_list_item_model)),
             "total_entries": fields.Integer(
                 description="Total number of users", example=100
             ),
@@ -143,6 +156,198 @@ def create_user_models(namespace):
         },
     )
 
+    users_batch_request_model = namespace.model(
+        "UsersBatchRequest",
+        {
+            "ids": fields.List(
+                fields.Integer,
+                required=True,
+                description="IDs of the users to retrieve",
+                example=[1, 2, 3],
+            ),
+        },
+    )
+
+    users_batch_response_model = namespace.model(
+        "UsersBatchResponse",
+        {
+            "users": fields.List(
+                fields.Nested(user_profile_model),
+                description="Found users, in the order of the requested IDs",
+            ),
+            "missing_ids": fields.List(
+                fields.Integer,
+                description="Requested IDs that do not belong to any user",
+                example=[3],
+            ),
+        },
+    )
+
+    batch_sub_request_model = namespace.model(
+        "BatchSubRequest",
+        {
+            "method": fields.String(
+                description="HTTP method of the sub-request",
+                enum=["GET", "POST", "PUT", "DELETE"],
+                default="GET",
+                example="GET",
+            ),
+            "path": fields.String(
+                required=True,
+                description="Path of a user endpoint",
+                example="/user/get_myself/",
+            ),
+            "query": fields.Raw(
+                description="Query string arguments of the sub-request",
+                example={"page": 1, "per_page": 10},
+            ),
+            "body": fields.Raw(description="JSON body of the sub-request"),
+        },
+    )
+
+    batch_request_model = namespace.model(
+        "BatchRequest",
+        {
+            "requests": fields.List(
+                fields.Nested(batch_sub_request_model),
+                required=True,
+                description="Sub-requests dispatched in order",
+            ),
+        },
+    )
+
+    batch_sub_response_model = namespace.model(
+        "BatchSubResponse",
+        {
+            "status": fields.Integer(
+                description="HTTP status code of the sub-request", example=200
+            ),
+            "body": fields.Raw(description="Response body of the sub-request"),
+        },
+    )
+
+    batch_response_model = namespace.model(
+        "BatchResponse",
+        {
+            "responses": fields.List(
+                fields.Nested(batch_sub_response_model),
+                description="Responses in the order of the sub-requests",
+            ),
+        },
+    )
+
+    users_sync_response_model = namespace.model(
+        "UsersSyncResponse",
+        {
+            "users": fields.List(
+                fields.Nested(user_profile_model),
+                description="Users created or changed since the sync token",
+            ),
+            "deleted_ids": fields.List(
+                fields.Integer,
+                description="IDs of users deleted or deactivated since the sync token",
+                example=[7],
+            ),
+            "sync_token": fields.String(
+                description="Token to pass as 'since' in the next sync request"
+            ),
+            "has_more": fields.Boolean(
+                description="True if more changes are pending and the sync should be repeated right away",
+                example=False,
+            ),
+        },
+    )
+
+    user_autocomplete_item_model = namespace.model(
+        "UserAutocompleteItem",
+        {
+            "id": fields.Integer(description="ID of the user profile", example=2),
+            "name": fields.String(description="First name of the user", example="John"),
+            "surname": fields.String(description="Surname of the user", example="Doe"),
+            "email": fields.String(
+                description="Email address of the user", example="john.doe@mail.com"
+            ),
+            "is_active": fields.Boolean(
+                description="Flag noting if the user is active or not", example=True
+            ),
+        },
+    )
+
+    user_autocomplete_response_model = namespace.model(
+        "UserAutocompleteResponse",
+        {
+            "users": fields.List(
+                fields.Nested(user_autocomplete_item_model),
+                description="Users whose name, surname or email starts with the query, name matches first",
+            ),
+        },
+    )
+
+    user_registrations_day_model = namespace.model(
+        "UserRegistrationsDay",
+        {
+            "day": fields.Date(description="Registration day", example="2024-01-31"),
+            "registrations": fields.Integer(
+                description="Users registered on the day that still exist", example=12
+            ),
+        },
+    )
+
+    user_stats_response_model = namespace.model(
+        "UserStatsResponse",
+        {
+            "total": fields.Integer(description="Total number of users", example=100),
+            "active": fields.Integer(description="Number of active users", example=90),
+            "admins": fields.Integer(description="Number of admins", example=2),
+            "registrations_per_day": fields.List(
+                fields.Nested(user_registrations_day_model),
+                description="Registrations per day, oldest first",
+            ),
+            "refreshed_at": fields.DateTime(
+                dt_format="iso8601",
+                description="Database time the statistics were last refreshed at",
+                example=datetime.now().isoformat(),
+            ),
+            "age_seconds": fields.Float(
+                description="Seconds since the statistics were last refreshed",
+                example=12.5,
+            ),
+        },
+    )
+
+    audit_entry_model = namespace.model(
+        "AuditEntry",
+        {
+            "id": fields.Integer(description="ID of the entry, increasing over time", example=42),
+            "occurred_at": fields.DateTime(
+                dt_format="iso8601",
+                description="Time the action was taken",
+                example=datetime.now().isoformat(),
+            ),
+            "actor_id": fields.Integer(description="ID of the acting user", example=1),
+            "action": fields.String(description="Action name", example="user.toggle_status"),
+            "target_type": fields.String(description="Kind of object acted on", example="user"),
+            "target_id": fields.String(description="ID of the object acted on", example="2"),
+            "diff": fields.Raw(
+                description="Changed fields as {field: [old, new]}, or the query of read actions",
+                example={"is_active": [True, False]},
+            ),
+        },
+    )
+
+    audit_log_response_model = namespace.model(
+        "AuditLogResponse",
+        {
+            "entries": fields.List(
+                fields.Nested(audit_entry_model), description="Entries, newest first"
+            ),
+            "next_cursor": fields.Integer(
+                description="Pass as 'before' to get the next page, null on the last page",
+                example=41,
+            ),
+        },
+    )
+
     return {
         "registration": user_registration_model,
         "login": user_login_model,
@@ -153,11 +358,19 @@ def create_user_models(namespace):
         "change_password": change_password_model,
         "admin_change_password": admin_change_password_model,
         "users_response": user_response_model,
+        "users_batch_request": users_batch_request_model,
+        "users_batch_response": users_batch_response_model,
+        "batch_request": batch_request_model,
+        "batch_response": batch_response_model,
+        "users_sync_response": users_sync_response_model,
+        "user_autocomplete_response": user_autocomplete_response_model,
+        "user_stats_response": user_stats_response_model,
+        "audit_log_response": audit_log_response_model,
     }
 
 
 def create_pagination_parser():
-    pagination_parser = reqparse.RequestParser(bundle_errors=True)
+    pagination_parser = TypedRequestParser(bundle_errors=True)
     pagination_parser.add_argument(
         "page", type=int, default=1, required=False, help="Page number"
     )
@@ -181,7 +394,104 @@ def create_pagination_parser():
         "filters",
         type=str,
         required=False,
-        help="Filtering criteria as a JSON string",
+        help='Filter expression as a JSON string, e.g. {"is_active": true, "created_at": {"between": ["2024-01-01", "2024-02-01"]}}. '
+        "Supported operators: eq, ne, in, gt, gte, lt, lte, between, is_null and nested and/or lists.",
         default='{"is_active":true}',
     )
+    pagination_parser.add_argument(
+        "include_archived",
+        type=inputs.boolean,
+        default=False,
+        required=False,
+        help="Also list users archived after a long inactivity",
+    )
     return pagination_parser
+
+
+def create_batch_parser():
+    batch_parser = TypedRequestParser(bundle_errors=True)
+    batch_parser.add_argument(
+        "ids",
+        type=str,
+        required=True,
+        help="Comma separated IDs of the users to retrieve",
+    )
+    return batch_parser
+
+
+def create_sync_parser():
+    sync_parser = TypedRequestParser(bundle_errors=True)
+    sync_parser.add_argument(
+        "since",
+        type=str,
+        required=False,
+        help="Sync token returned by the previous sync, omit for a full sync",
+    )
+    sync_parser.add_argument(
+        "limit",
+        type=int,
+        default=500,
+        required=False,
+        help="Maximum number of changes returned",
+    )
+    return sync_parser
+
+
+def create_autocomplete_parser():
+    autocomplete_parser = TypedRequestParser(bundle_errors=True)
+    autocomplete_parser.add_argument(
+        "q",
+        type=str,
+        required=True,
+        help="Typed prefix of the name, surname or email, case insensitive",
+    )
+    autocomplete_parser.add_argument(
+        "limit",
+        type=int,
+        default=10,
+        required=False,
+        help="Maximum number of users returned",
+    )
+    return autocomplete_parser
+
+
+def create_stats_parser():
+    stats_parser = TypedRequestParser(bundle_errors=True)
+    stats_parser.add_argument(
+        "days",
+        type=int,
+        default=30,
+        required=False,
+        help="Number of days, including today, registrations are listed for",
+    )
+    return stats_parser
+
+
+def create_audit_parser():
+    audit_parser = TypedRequestParser(bundle_errors=True)
+    audit_parser.add_argument(
+        "limit",
+        type=int,
+        default=50,
+        required=False,
+        help="Maximum number of entries returned",
+    )
+    audit_parser.add_argument(
+        "before",
+        type=int,
+        required=False,
+        help="Cursor returned by the previous page, omit for the newest entries",
+    )
+    audit_parser.add_argument(
+        "actor_id", type=int, required=False, help="Only actions of this user"
+    )
+    audit_parser.add_argument(
+        "action", type=str, required=False, help="Only this action, e.g. user.toggle_status"
+    )
+    audit_parser.add_argument(
+        "target_type", type=str, required=False, help="Only actions on this kind of object"
+    )
+    audit_parser.add_argument(
+        "target_id", type=str, required=False, help="Only actions on this object"
+    )
+    return audit_parser
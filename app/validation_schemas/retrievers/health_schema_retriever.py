@@ -0,0 +1,14 @@
+from app.validation_schemas.models.health_models import create_health_models
+from app.validation_schemas.retrievers.base_schema_retriever import BaseSchemaRetriever
+
+
+class HealthSchemaRetriever(BaseSchemaRetriever):
+    def __init__(self, namespace):
+        super().__init__(namespace)
+        self.models = create_health_models(namespace)
+
+    def retrieve(self, key: str):
+        model = self.models.get(key)
+        if not model:
+            raise ValueError(f"Model with key '{key}' not found.")
+        return model
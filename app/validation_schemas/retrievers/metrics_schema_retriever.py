@@ -0,0 +1,20 @@
+from app.validation_schemas.models.metrics_models import (
+    create_memory_parser,
+    create_metrics_models,
+)
+from app.validation_schemas.retrievers.base_schema_retriever import BaseSchemaRetriever
+
+
+class MetricsSchemaRetriever(BaseSchemaRetriever):
+    def __init__(self, namespace):
+        super().__init__(namespace)
+        self.models = create_metrics_models(namespace)
+        self.memory_parser = create_memory_parser()
+
+    def retrieve(self, key: str):
+        if key == "memory_parser":
+            return self.memory_parser
+        model = self.models.get(key)
+        if not model:
+            raise ValueError(f"Model with key '{key}' not found.")
+        return model
@@ -1,5 +1,10 @@
 from app.validation_schemas.models.user_models import (
+    create_audit_parser,
+    create_autocomplete_parser,
+    create_batch_parser,
     create_pagination_parser,
+    create_stats_parser,
+    create_sync_parser,
     create_user_models,
 )
 from app.validation_schemas.retrievers.base_schema_retriever import BaseSchemaRetriever
@@ -10,10 +15,25 @@ class UserSchemaRetriever(BaseSchemaRetriever):
         super().__init__(namespace)
         self.models = create_user_models(namespace)
         self.pagination_parser = create_pagination_parser()
+        self.batch_parser = create_batch_parser()
+        self.sync_parser = create_sync_parser()
+        self.autocomplete_parser = create_autocomplete_parser()
+        self.stats_parser = create_stats_parser()
+        self.audit_parser = create_audit_parser()
 
     def retrieve(self, key: str):
         if key == "pagination_parser":
             return self.pagination_parser
+        if key == "batch_parser":
+            return self.batch_parser
+        if key == "sync_parser":
+            return self.sync_parser
+        if key == "autocomplete_parser":
+            return self.autocomplete_parser
+        if key == "stats_parser":
+            return self.stats_parser
+        if key == "audit_parser":
+            return self.audit_parser
         model = self.models.get(key)
         if not model:
             raise ValueError(f"Model with key '{key}' not found.")
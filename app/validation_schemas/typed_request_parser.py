@@ -0,0 +1,141 @@
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from flask import request
+from flask_restx import reqparse
+
+
+class TypedRequestParser(reqparse.RequestParser):
+    """
+    A ``RequestParser`` for query string arguments that converts and caches
+    the parsed values per query string.
+
+    Arguments are declared with ``add_argument`` as before, so the Swagger
+    documentation does not change. On the first ``parse_args`` each argument is
+    compiled into a plain name, converter and default. Requests without a body
+    whose query string was parsed before get a copy of the cached result,
+    others are parsed in one pass over ``request.args``. Anything unusual,
+    like repeated arguments, a body, a failed conversion or an invalid choice,
+    goes through reqparse, so errors keep their messages and status codes.
+    """
+
+    CACHE_SIZE = 256
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._compiled = None
+
+    def __deepcopy__(self, memo):
+        # restx deep copies expected parsers into the API docs, the lock and
+        # the cache stay with the original.
+        return self.copy()
+
+    def add_argument(self, *args, **kwargs):
+        self._reset()
+        return super().add_argument(*args, **kwargs)
+
+    def replace_argument(self, name, *args, **kwargs):
+        self._reset()
+        return super().replace_argument(name, *args, **kwargs)
+
+    def remove_argument(self, name):
+        self._reset()
+        return super().remove_argument(name)
+
+    def parse_args(self, req=None, strict=False):
+        if req is not None or strict or not self._is_bodyless():
+            return super().parse_args(req, strict)
+
+        key = request.query_string
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            return self.result_class(cached)
+
+        parsed = self._parse_query_args()
+        if parsed is None:
+            return super().parse_args(req, strict)
+
+        with self._lock:
+            self._cache[key] = parsed
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return self.result_class(parsed)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def loads_json(value: str) -> Any:
+        """
+        Decodes a JSON query argument, caching the result per distinct value.
+
+        The returned object is shared between calls and must not be modified.
+
+        Raises:
+            ValueError: If the value is not valid JSON, with the message of ``json.loads``.
+        """
+        return json.loads(value)
+
+    def _parse_query_args(self) -> Optional[Dict[str, Any]]:
+        compiled = self._compile()
+        if compiled is None:
+            return None
+
+        parsed = {}
+        for name, dest, argument in compiled:
+            values = request.args.getlist(name)
+            if not values:
+                if argument.required:
+                    return None
+                default = argument.default
+                parsed[dest] = default() if callable(default) else default
+                continue
+            if len(values) > 1:
+                return None
+            try:
+                value = argument.convert(values[0], "=")
+            except Exception:
+                return None
+            if argument.choices and value not in argument.choices:
+                return None
+            parsed[dest] = value
+        return parsed
+
+    def _compile(self):
+        if self._compiled is None:
+            compiled = []
+            for argument in self.args:
+                if not self._is_simple(argument):
+                    compiled = False
+                    break
+                compiled.append((argument.name, argument.dest or argument.name, argument))
+            self._compiled = compiled
+        return self._compiled or None
+
+    def _reset(self) -> None:
+        self._compiled = None
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _is_simple(argument: reqparse.Argument) -> bool:
+        # Arguments read from the query string and stored as a single value.
+        return (
+            argument.action == "store"
+            and tuple(argument.operators) == ("=",)
+            and argument.location in (("json", "values"), "values", "args")
+            and argument.case_sensitive
+            and not argument.trim
+            and not argument.ignore
+            and argument.store_missing
+        )
+
+    @staticmethod
+    def _is_bodyless() -> bool:
+        return not request.content_length and "Transfer-Encoding" not in request.headers
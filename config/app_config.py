@@ -26,6 +26,142 @@ class AppConfig(BaseConfig):
     REDIS_DB = 0
     REDIS_PASSWORD = None
     REDIS_URL = None
+    # Above the 5 second blocking reads of the change feed.
+    REDIS_SOCKET_TIMEOUT_SECONDS = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", 10))
+    REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS = float(
+        os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS", 2)
+    )
+
+    # Model cache (primary-key lookups of models with `cache_ttl` in their Meta)
+    MODEL_CACHE_ENABLED = os.getenv("MODEL_CACHE_ENABLED", "False") == "True"
+    MODEL_CACHE_TTL = int(os.getenv("MODEL_CACHE_TTL", 300))
+    MODEL_CACHE_L1_TTL = float(os.getenv("MODEL_CACHE_L1_TTL", 5))
+    MODEL_CACHE_L1_MAX_SIZE = int(os.getenv("MODEL_CACHE_L1_MAX_SIZE", 1024))
+
+    # Server-side prepared statements for hot-path selects
+    PREPARED_STATEMENTS_ENABLED = (
+        os.getenv("PREPARED_STATEMENTS_ENABLED", "True") == "True"
+    )
+
+    # Response compression
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True") == "True"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
+    # Batch endpoints
+    USER_BATCH_MAX_SIZE = int(os.getenv("USER_BATCH_MAX_SIZE", 100))
+    BATCH_REQUEST_MAX_SIZE = int(os.getenv("BATCH_REQUEST_MAX_SIZE", 20))
+
+    # Incremental user sync
+    USER_SYNC_SETTLE_SECONDS = int(os.getenv("USER_SYNC_SETTLE_SECONDS", 5))
+    USER_SYNC_MAX_LIMIT = int(os.getenv("USER_SYNC_MAX_LIMIT", 1000))
+    USER_SYNC_TOMBSTONE_RETENTION_DAYS = int(
+        os.getenv("USER_SYNC_TOMBSTONE_RETENTION_DAYS", 30)
+    )
+    USER_SYNC_TOMBSTONE_PURGE_SECONDS = int(
+        os.getenv("USER_SYNC_TOMBSTONE_PURGE_SECONDS", 3600)
+    )
+
+    # User autocomplete
+    USER_AUTOCOMPLETE_MAX_LIMIT = int(os.getenv("USER_AUTOCOMPLETE_MAX_LIMIT", 25))
+
+    # Live change feed (server-sent events)
+    CHANGE_FEED_ENABLED = os.getenv("CHANGE_FEED_ENABLED", "True") == "True"
+    CHANGE_FEED_MAX_LEN = int(os.getenv("CHANGE_FEED_MAX_LEN", 10000))
+    CHANGE_FEED_CLIENT_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_CLIENT_QUEUE_SIZE", 100))
+    CHANGE_FEED_HEARTBEAT_SECONDS = int(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", 15))
+    CHANGE_FEED_RETRY_MS = int(os.getenv("CHANGE_FEED_RETRY_MS", 3000))
+
+    # Admin user statistics (aggregates refreshed by Celery beat)
+    USER_STATS_REFRESH_SECONDS = int(os.getenv("USER_STATS_REFRESH_SECONDS", 60))
+    USER_STATS_MAX_DAYS = int(os.getenv("USER_STATS_MAX_DAYS", 365))
+
+    # Audit log of admin actions (buffered, written in batches)
+    AUDIT_LOG_ENABLED = os.getenv("AUDIT_LOG_ENABLED", "True") == "True"
+    AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", 100))
+    AUDIT_LOG_FLUSH_SECONDS = float(os.getenv("AUDIT_LOG_FLUSH_SECONDS", 2))
+    AUDIT_LOG_MAX_BUFFER = int(os.getenv("AUDIT_LOG_MAX_BUFFER", 10000))
+    AUDIT_LOG_MAX_LIMIT = int(os.getenv("AUDIT_LOG_MAX_LIMIT", 500))
+
+    # Transactional outbox (Celery tasks relayed by Celery beat)
+    OUTBOX_RELAY_SECONDS = float(os.getenv("OUTBOX_RELAY_SECONDS", 1))
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+    OUTBOX_MAX_BATCHES = int(os.getenv("OUTBOX_MAX_BATCHES", 10))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 10))
+    OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", 2))
+    OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", 300))
+    OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", 24))
+    OUTBOX_DEDUP_TTL_SECONDS = int(os.getenv("OUTBOX_DEDUP_TTL_SECONDS", 86400))
+
+    # User archival (inactive users moved out of the userprofile table)
+    USER_ARCHIVE_INACTIVE_DAYS = int(os.getenv("USER_ARCHIVE_INACTIVE_DAYS", 180))
+    USER_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("USER_ARCHIVE_INTERVAL_SECONDS", 3600))
+    USER_ARCHIVE_BATCH_SIZE = int(os.getenv("USER_ARCHIVE_BATCH_SIZE", 1000))
+    USER_ARCHIVE_MAX_BATCHES = int(os.getenv("USER_ARCHIVE_MAX_BATCHES", 50))
+
+    # Admission control (per-process concurrency limits per route class, CoDel queueing)
+    ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "False") == "True"
+    ADMISSION_LIGHT_MAX_CONCURRENCY = int(os.getenv("ADMISSION_LIGHT_MAX_CONCURRENCY", 32))
+    ADMISSION_DEFAULT_MAX_CONCURRENCY = int(os.getenv("ADMISSION_DEFAULT_MAX_CONCURRENCY", 16))
+    ADMISSION_BULK_MAX_CONCURRENCY = int(os.getenv("ADMISSION_BULK_MAX_CONCURRENCY", 4))
+    ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", 100))
+    ADMISSION_TARGET_DELAY_MS = float(os.getenv("ADMISSION_TARGET_DELAY_MS", 5))
+    ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 1))
+
+    # Circuit breakers (Postgres and Redis, per process)
+    CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "True") == "True"
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", 5))
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN_SECONDS", 10))
+
+    # Statement timeouts (per-request deadlines and per-call budgets for SQL)
+    STATEMENT_TIMEOUT_ENABLED = os.getenv("STATEMENT_TIMEOUT_ENABLED", "False") == "True"
+    REQUEST_DEADLINE_MS = int(os.getenv("REQUEST_DEADLINE_MS", 10000))
+    REQUEST_DEADLINE_BULK_MS = int(os.getenv("REQUEST_DEADLINE_BULK_MS", 30000))
+    STATEMENT_TIMEOUT_SEARCH_MS = int(os.getenv("STATEMENT_TIMEOUT_SEARCH_MS", 5000))
+    STATEMENT_CANCEL_CHECK_MS = int(os.getenv("STATEMENT_CANCEL_CHECK_MS", 250))
+
+    # Unit of work (one transaction per write request)
+    UNIT_OF_WORK_ENABLED = os.getenv("UNIT_OF_WORK_ENABLED", "False") == "True"
+
+    # Request profiling (profiles are written to TEMP_STORAGE_PATH/profiles)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+    PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile")
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", 0.001))
+
+    # Tracing (spans written to TEMP_STORAGE_PATH/traces or sent to an OTLP collector)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "False") == "True"
+    TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", 0.01))
+    TRACING_TRUST_TRACEPARENT = os.getenv("TRACING_TRUST_TRACEPARENT", "False") == "True"
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "jsonl")
+    TRACING_OTLP_ENDPOINT = os.getenv(
+        "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "backend")
+    TRACING_FLUSH_SECONDS = float(os.getenv("TRACING_FLUSH_SECONDS", 5))
+    TRACING_MAX_BUFFER = int(os.getenv("TRACING_MAX_BUFFER", 10000))
+
+    # Memory diagnostics (tracemalloc snapshots and Celery task RSS tracking)
+    MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", 10))
+    MEMORY_SNAPSHOT_LIMIT = int(os.getenv("MEMORY_SNAPSHOT_LIMIT", 5))
+    MEMORY_TASK_TRACKING_ENABLED = os.getenv("MEMORY_TASK_TRACKING_ENABLED", "True") == "True"
+    MEMORY_TASK_RSS_WARNING_MB = int(os.getenv("MEMORY_TASK_RSS_WARNING_MB", 50))
+    MEMORY_DIAGNOSTICS_QUEUE = os.getenv("MEMORY_DIAGNOSTICS_QUEUE", "diagnostics")
+    CELERY_WORKER_MAX_MEMORY_PER_CHILD_MB = int(
+        os.getenv("CELERY_WORKER_MAX_MEMORY_PER_CHILD_MB", 0)
+    )
+
+    # Health checks (readiness probes of Postgres, Redis and Celery)
+    HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", 2))
+    HEALTH_CHECK_CACHE_SECONDS = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", 5))
+    # Dependencies whose failure fails readiness, the others only degrade it.
+    HEALTH_CHECK_CRITICAL = tuple(
+        name.strip()
+        for name in os.getenv("HEALTH_CHECK_CRITICAL", "database,redis").split(",")
+        if name.strip()
+    )
 
     # File path config
     TEMP_STORAGE_PATH = "storage/temp"
@@ -37,6 +173,10 @@ class AppConfig(BaseConfig):
     DB_HOST = os.getenv("DB_HOST")
     DB_PORT = os.getenv("DB_PORT", 5432)
 
+    # Migrations (session-level guards applied by db:migrate, "0" disables them)
+    MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+    MIGRATION_STATEMENT_TIMEOUT = os.getenv("MIGRATION_STATEMENT_TIMEOUT", "0")
+
     # Token and cookies
     JWT_SECRET_KEY = None
     JWT_TOKEN_LOCATION = None
@@ -52,6 +192,17 @@ class AppConfig(BaseConfig):
     TOKEN_EXPIRATION_TIME = None
     DEBUG_MODE = None
 
+    # Token revocation (per-process Bloom filter in front of the Redis blocklist)
+    TOKEN_REVOCATION_FILTER_CAPACITY = int(
+        os.getenv("TOKEN_REVOCATION_FILTER_CAPACITY", 100000)
+    )
+    TOKEN_REVOCATION_FILTER_ERROR_RATE = float(
+        os.getenv("TOKEN_REVOCATION_FILTER_ERROR_RATE", 0.001)
+    )
+    TOKEN_REVOCATION_FILTER_REBUILD_INTERVAL = int(
+        os.getenv("TOKEN_REVOCATION_FILTER_REBUILD_INTERVAL", 3600)
+    )
+
     # Admin seeding
     ADMIN_EMAIL = None
     ADMIN_PASSWORD = None
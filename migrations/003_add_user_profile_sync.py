@@ -0,0 +1,78 @@
+"""Peewee migrations -- 003_add_user_profile_sync.py.
+
+Some examples (model - class or model name)::
+
+    > Model = migrator.orm['table_name']            # Return model in current state by name
+    > Model = migrator.ModelClass                   # Return model in current state by name
+
+    > migrator.sql(sql)                             # Run custom SQL
+    > migrator.run(func, *args, **kwargs)           # Run python function with the given args
+    > migrator.create_model(Model)                  # Create a model (could be used as decorator)
+    > migrator.remove_model(model, cascade=True)    # Remove a model
+    > migrator.add_fields(model, **fields)          # Add fields to a model
+    > migrator.change_fields(model, **fields)       # Change fields
+    > migrator.remove_fields(model, *field_names, cascade=True)
+    > migrator.rename_field(model, old_field_name, new_field_name)
+    > migrator.rename_table(model, new_table_name)
+    > migrator.add_index(model, *col_names, unique=False)
+    > migrator.add_not_null(model, *field_names)
+    > migrator.add_default(model, field_name, default)
+    > migrator.add_constraint(model, name, sql)
+    > migrator.drop_index(model, *col_names)
+    > migrator.drop_not_null(model, *field_names)
+    > migrator.drop_constraints(model, *constraints)
+
+"""
+
+from contextlib import suppress
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+from app.online_migrations import OnlineMigrations
+
+
+with suppress(ImportError):
+    import playhouse.postgres_ext as pw_pext
+
+
+class BaseModel(pw.Model):
+    # The timestamp columns of BaseModel when this migration was written.
+    created_at = pw.DateTimeField()
+    updated_at = pw.DateTimeField()
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    # First, before this migration takes any lock the concurrent build would wait for.
+    OnlineMigrations.add_index_concurrently(migrator, "userprofile", ["updated_at", "id"])
+
+    @migrator.create_model
+    class UserProfileTombstone(BaseModel):
+        id = pw.AutoField()
+        user_id = pw.IntegerField(index=True)
+
+    migrator.sql(
+        """
+        CREATE OR REPLACE FUNCTION userprofile_write_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO userprofiletombstone (user_id, created_at, updated_at)
+            VALUES (OLD.id, LOCALTIMESTAMP, LOCALTIMESTAMP);
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    migrator.sql(
+        """
+        CREATE TRIGGER userprofile_tombstone
+        AFTER DELETE ON userprofile
+        FOR EACH ROW EXECUTE FUNCTION userprofile_write_tombstone();
+        """
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    OnlineMigrations.drop_index_concurrently(migrator, "userprofile_updated_at_id")
+    migrator.sql("DROP TRIGGER IF EXISTS userprofile_tombstone ON userprofile;")
+    migrator.sql("DROP FUNCTION IF EXISTS userprofile_write_tombstone();")
+    migrator.remove_model("userprofiletombstone")
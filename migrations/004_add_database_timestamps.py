@@ -0,0 +1,79 @@
+"""Peewee migrations -- 004_add_database_timestamps.py.
+
+Some examples (model - class or model name)::
+
+    > Model = migrator.orm['table_name']            # Return model in current state by name
+    > Model = migrator.ModelClass                   # Return model in current state by name
+
+    > migrator.sql(sql)                             # Run custom SQL
+    > migrator.run(func, *args, **kwargs)           # Run python function with the given args
+    > migrator.create_model(Model)                  # Create a model (could be used as decorator)
+    > migrator.remove_model(model, cascade=True)    # Remove a model
+    > migrator.add_fields(model, **fields)          # Add fields to a model
+    > migrator.change_fields(model, **fields)       # Change fields
+    > migrator.remove_fields(model, *field_names, cascade=True)
+    > migrator.rename_field(model, old_field_name, new_field_name)
+    > migrator.rename_table(model, new_table_name)
+    > migrator.add_index(model, *col_names, unique=False)
+    > migrator.add_not_null(model, *field_names)
+    > migrator.add_default(model, field_name, default)
+    > migrator.add_constraint(model, name, sql)
+    > migrator.drop_index(model, *col_names)
+    > migrator.drop_not_null(model, *field_names)
+    > migrator.drop_constraints(model, *constraints)
+
+"""
+
+from contextlib import suppress
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+with suppress(ImportError):
+    import playhouse.postgres_ext as pw_pext
+
+
+TABLES = ("userprofile", "userprofiletombstone")
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    for table in TABLES:
+        migrator.sql(
+            f"""
+            ALTER TABLE {table}
+                ALTER COLUMN created_at SET DEFAULT CURRENT_TIMESTAMP,
+                ALTER COLUMN updated_at SET DEFAULT CURRENT_TIMESTAMP;
+            """
+        )
+
+    migrator.sql(
+        """
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := CURRENT_TIMESTAMP;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    migrator.sql(
+        """
+        CREATE TRIGGER userprofile_set_updated_at
+        BEFORE UPDATE ON userprofile
+        FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+        """
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    migrator.sql("DROP TRIGGER IF EXISTS userprofile_set_updated_at ON userprofile;")
+    migrator.sql("DROP FUNCTION IF EXISTS set_updated_at();")
+    for table in TABLES:
+        migrator.sql(
+            f"""
+            ALTER TABLE {table}
+                ALTER COLUMN created_at DROP DEFAULT,
+                ALTER COLUMN updated_at DROP DEFAULT;
+            """
+        )
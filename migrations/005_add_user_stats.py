@@ -0,0 +1,135 @@
+"""Peewee migrations -- 005_add_user_stats.py.
+
+Some examples (model - class or model name)::
+
+    > Model = migrator.orm['table_name']            # Return model in current state by name
+    > Model = migrator.ModelClass                   # Return model in current state by name
+
+    > migrator.sql(sql)                             # Run custom SQL
+    > migrator.run(func, *args, **kwargs)           # Run python function with the given args
+    > migrator.create_model(Model)                  # Create a model (could be used as decorator)
+    > migrator.remove_model(model, cascade=True)    # Remove a model
+    > migrator.add_fields(model, **fields)          # Add fields to a model
+    > migrator.change_fields(model, **fields)       # Change fields
+    > migrator.remove_fields(model, *field_names, cascade=True)
+    > migrator.rename_field(model, old_field_name, new_field_name)
+    > migrator.rename_table(model, new_table_name)
+    > migrator.add_index(model, *col_names, unique=False)
+    > migrator.add_not_null(model, *field_names)
+    > migrator.add_default(model, field_name, default)
+    > migrator.add_constraint(model, name, sql)
+    > migrator.drop_index(model, *col_names)
+    > migrator.drop_not_null(model, *field_names)
+    > migrator.drop_constraints(model, *constraints)
+
+"""
+
+from contextlib import suppress
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+with suppress(ImportError):
+    import playhouse.postgres_ext as pw_pext
+
+
+class BaseModel(pw.Model):
+    # The timestamp columns of BaseModel when this migration was written.
+    created_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+    updated_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    @migrator.create_model
+    class UserDailyStats(BaseModel):
+        day = pw.DateField(primary_key=True)
+        total = pw.IntegerField(default=0)
+        active = pw.IntegerField(default=0)
+        admins = pw.IntegerField(default=0)
+
+    @migrator.create_model
+    class UserStatsSummary(BaseModel):
+        id = pw.AutoField()
+        total = pw.IntegerField(default=0)
+        active = pw.IntegerField(default=0)
+        admins = pw.IntegerField(default=0)
+        refreshed_at = pw.DateTimeField(null=True)
+
+    @migrator.create_model
+    class UserStatsDelta(BaseModel):
+        id = pw.BigAutoField()
+        day = pw.DateField()
+        total = pw.IntegerField()
+        active = pw.IntegerField()
+        admins = pw.IntegerField()
+
+    # Every insert, delete and relevant update of a user appends its effect on
+    # the counts to userstatsdelta. The refresh task folds the deltas into the
+    # aggregates, so writers never contend on the aggregate rows.
+    migrator.sql(
+        """
+        CREATE OR REPLACE FUNCTION userprofile_record_stats_delta() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO userstatsdelta (day, total, active, admins)
+                VALUES (OLD.created_at::date, -1, -OLD.is_active::int, -OLD.is_admin::int);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO userstatsdelta (day, total, active, admins)
+                VALUES (NEW.created_at::date, 1, NEW.is_active::int, NEW.is_admin::int);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    migrator.sql(
+        """
+        CREATE TRIGGER userprofile_stats_delta
+        AFTER INSERT OR DELETE ON userprofile
+        FOR EACH ROW EXECUTE FUNCTION userprofile_record_stats_delta();
+        """
+    )
+    migrator.sql(
+        """
+        CREATE TRIGGER userprofile_stats_delta_update
+        AFTER UPDATE OF created_at, is_active, is_admin ON userprofile
+        FOR EACH ROW
+        WHEN (
+            OLD.created_at::date IS DISTINCT FROM NEW.created_at::date
+            OR OLD.is_active IS DISTINCT FROM NEW.is_active
+            OR OLD.is_admin IS DISTINCT FROM NEW.is_admin
+        )
+        EXECUTE FUNCTION userprofile_record_stats_delta();
+        """
+    )
+
+    # Initial aggregates, computed in the same transaction the triggers are
+    # created in, so no write is counted twice or missed.
+    migrator.sql(
+        """
+        INSERT INTO userdailystats (day, total, active, admins)
+        SELECT created_at::date, COUNT(*), COUNT(*) FILTER (WHERE is_active),
+               COUNT(*) FILTER (WHERE is_admin)
+        FROM userprofile
+        GROUP BY created_at::date;
+        """
+    )
+    migrator.sql(
+        """
+        INSERT INTO userstatssummary (total, active, admins, refreshed_at)
+        SELECT COALESCE(SUM(total), 0), COALESCE(SUM(active), 0),
+               COALESCE(SUM(admins), 0), CURRENT_TIMESTAMP
+        FROM userdailystats;
+        """
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    migrator.sql("DROP TRIGGER IF EXISTS userprofile_stats_delta_update ON userprofile;")
+    migrator.sql("DROP TRIGGER IF EXISTS userprofile_stats_delta ON userprofile;")
+    migrator.sql("DROP FUNCTION IF EXISTS userprofile_record_stats_delta();")
+    migrator.remove_model("userstatsdelta")
+    migrator.remove_model("userstatssummary")
+    migrator.remove_model("userdailystats")
@@ -0,0 +1,78 @@
+"""Peewee migrations -- 006_add_audit_log.py.
+
+Some examples (model - class or model name)::
+
+    > Model = migrator.orm['table_name']            # Return model in current state by name
+    > Model = migrator.ModelClass                   # Return model in current state by name
+
+    > migrator.sql(sql)                             # Run custom SQL
+    > migrator.run(func, *args, **kwargs)           # Run python function with the given args
+    > migrator.create_model(Model)                  # Create a model (could be used as decorator)
+    > migrator.remove_model(model, cascade=True)    # Remove a model
+    > migrator.add_fields(model, **fields)          # Add fields to a model
+    > migrator.change_fields(model, **fields)       # Change fields
+    > migrator.remove_fields(model, *field_names, cascade=True)
+    > migrator.rename_field(model, old_field_name, new_field_name)
+    > migrator.rename_table(model, new_table_name)
+    > migrator.add_index(model, *col_names, unique=False)
+    > migrator.add_not_null(model, *field_names)
+    > migrator.add_default(model, field_name, default)
+    > migrator.add_constraint(model, name, sql)
+    > migrator.drop_index(model, *col_names)
+    > migrator.drop_not_null(model, *field_names)
+    > migrator.drop_constraints(model, *constraints)
+
+"""
+
+from contextlib import suppress
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+with suppress(ImportError):
+    import playhouse.postgres_ext as pw_pext
+
+
+class BaseModel(pw.Model):
+    # The timestamp columns of BaseModel when this migration was written.
+    created_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+    updated_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    @migrator.create_model
+    class AuditLog(BaseModel):
+        id = pw.BigAutoField()
+        occurred_at = pw.DateTimeField()
+        actor_id = pw.IntegerField(null=True)
+        action = pw.TextField()
+        target_type = pw.TextField(null=True)
+        target_id = pw.TextField(null=True)
+        diff = pw.TextField(null=True)
+
+    migrator.add_index("auditlog", "actor_id", "id")
+    migrator.add_index("auditlog", "target_type", "target_id", "id")
+
+    migrator.sql(
+        """
+        CREATE OR REPLACE FUNCTION auditlog_reject_change() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'auditlog is append-only';
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    migrator.sql(
+        """
+        CREATE TRIGGER auditlog_append_only
+        BEFORE UPDATE OR DELETE ON auditlog
+        FOR EACH STATEMENT EXECUTE FUNCTION auditlog_reject_change();
+        """
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    migrator.sql("DROP TRIGGER IF EXISTS auditlog_append_only ON auditlog;")
+    migrator.sql("DROP FUNCTION IF EXISTS auditlog_reject_change();")
+    migrator.remove_model("auditlog")
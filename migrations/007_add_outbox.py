@@ -0,0 +1,73 @@
+"""Peewee migrations -- 007_add_outbox.py.
+
+Some examples (model - class or model name)::
+
+    > Model = migrator.orm['table_name']            # Return model in current state by name
+    > Model = migrator.ModelClass                   # Return model in current state by name
+
+    > migrator.sql(sql)                             # Run custom SQL
+    > migrator.run(func, *args, **kwargs)           # Run python function with the given args
+    > migrator.create_model(Model)                  # Create a model (could be used as decorator)
+    > migrator.remove_model(model, cascade=True)    # Remove a model
+    > migrator.add_fields(model, **fields)          # Add fields to a model
+    > migrator.change_fields(model, **fields)       # Change fields
+    > migrator.remove_fields(model, *field_names, cascade=True)
+    > migrator.rename_field(model, old_field_name, new_field_name)
+    > migrator.rename_table(model, new_table_name)
+    > migrator.add_index(model, *col_names, unique=False)
+    > migrator.add_not_null(model, *field_names)
+    > migrator.add_default(model, field_name, default)
+    > migrator.add_constraint(model, name, sql)
+    > migrator.drop_index(model, *col_names)
+    > migrator.drop_not_null(model, *field_names)
+    > migrator.drop_constraints(model, *constraints)
+
+"""
+
+from contextlib import suppress
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+with suppress(ImportError):
+    import playhouse.postgres_ext as pw_pext
+
+
+class BaseModel(pw.Model):
+    # The timestamp columns of BaseModel when this migration was written.
+    created_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+    updated_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    @migrator.create_model
+    class OutboxMessage(BaseModel):
+        id = pw.BigAutoField()
+        task_name = pw.TextField()
+        payload = pw.TextField()
+        dedup_key = pw.TextField(null=True, unique=True)
+        attempts = pw.IntegerField(default=0)
+        available_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+        dispatched_at = pw.DateTimeField(null=True)
+        failed_at = pw.DateTimeField(null=True)
+        last_error = pw.TextField(null=True)
+
+    # The relay only scans messages that were not dispatched yet, so the index
+    # stays small however many dispatched messages are retained.
+    migrator.sql(
+        """
+        CREATE INDEX outboxmessage_pending ON outboxmessage (id)
+        WHERE dispatched_at IS NULL;
+        """
+    )
+    migrator.sql(
+        """
+        CREATE INDEX outboxmessage_dispatched_at ON outboxmessage (dispatched_at)
+        WHERE dispatched_at IS NOT NULL;
+        """
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    migrator.remove_model("outboxmessage")
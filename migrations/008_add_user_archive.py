@@ -0,0 +1,80 @@
+"""Peewee migrations -- 008_add_user_archive.py.
+
+Some examples (model - class or model name)::
+
+    > Model = migrator.orm['table_name']            # Return model in current state by name
+    > Model = migrator.ModelClass                   # Return model in current state by name
+
+    > migrator.sql(sql)                             # Run custom SQL
+    > migrator.run(func, *args, **kwargs)           # Run python function with the given args
+    > migrator.create_model(Model)                  # Create a model (could be used as decorator)
+    > migrator.remove_model(model, cascade=True)    # Remove a model
+    > migrator.add_fields(model, **fields)          # Add fields to a model
+    > migrator.change_fields(model, **fields)       # Change fields
+    > migrator.remove_fields(model, *field_names, cascade=True)
+    > migrator.rename_field(model, old_field_name, new_field_name)
+    > migrator.rename_table(model, new_table_name)
+    > migrator.add_index(model, *col_names, unique=False)
+    > migrator.add_not_null(model, *field_names)
+    > migrator.add_default(model, field_name, default)
+    > migrator.add_constraint(model, name, sql)
+    > migrator.drop_index(model, *col_names)
+    > migrator.drop_not_null(model, *field_names)
+    > migrator.drop_constraints(model, *constraints)
+
+"""
+
+from contextlib import suppress
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+
+with suppress(ImportError):
+    import playhouse.postgres_ext as pw_pext
+
+
+class BaseModel(pw.Model):
+    # The timestamp columns of BaseModel when this migration was written.
+    created_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+    updated_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    @migrator.create_model
+    class UserProfileArchive(BaseModel):
+        id = pw.IntegerField(primary_key=True)
+        name = pw.TextField()
+        surname = pw.TextField()
+        email = pw.TextField(unique=True)
+        password = pw.TextField()
+        is_admin = pw.BooleanField(default=False)
+        is_active = pw.BooleanField(default=False)
+        archived_at = pw.DateTimeField(constraints=[pw.SQL("DEFAULT CURRENT_TIMESTAMP")])
+
+    @migrator.create_model
+    class UserArchiveRun(BaseModel):
+        id = pw.AutoField()
+        archived = pw.IntegerField()
+        hot_rows_before = pw.BigIntegerField()
+        hot_rows_after = pw.BigIntegerField()
+        hot_bytes_before = pw.BigIntegerField()
+        hot_bytes_after = pw.BigIntegerField()
+        list_seconds_before = pw.FloatField()
+        list_seconds_after = pw.FloatField()
+
+    # Archived users still count in the user statistics. Moving a user between
+    # the tables appends a -1 and a +1 delta for the same day, which cancel out.
+    migrator.sql(
+        """
+        CREATE TRIGGER userprofilearchive_stats_delta
+        AFTER INSERT OR DELETE ON userprofilearchive
+        FOR EACH ROW EXECUTE FUNCTION userprofile_record_stats_delta();
+        """
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    migrator.sql("DROP TRIGGER IF EXISTS userprofilearchive_stats_delta ON userprofilearchive;")
+    migrator.remove_model("userarchiverun")
+    migrator.remove_model("userprofilearchive")
@@ -0,0 +1,52 @@
+"""Peewee migrations -- 009_add_userprofile_inactive_index.py.
+
+Some examples (model - class or model name)::
+
+    > Model = migrator.orm['table_name']            # Return model in current state by name
+    > Model = migrator.ModelClass                   # Return model in current state by name
+
+    > migrator.sql(sql)                             # Run custom SQL
+    > migrator.run(func, *args, **kwargs)           # Run python function with the given args
+    > migrator.create_model(Model)                  # Create a model (could be used as decorator)
+    > migrator.remove_model(model, cascade=True)    # Remove a model
+    > migrator.add_fields(model, **fields)          # Add fields to a model
+    > migrator.change_fields(model, **fields)       # Change fields
+    > migrator.remove_fields(model, *field_names, cascade=True)
+    > migrator.rename_field(model, old_field_name, new_field_name)
+    > migrator.rename_table(model, new_table_name)
+    > migrator.add_index(model, *col_names, unique=False)
+    > migrator.add_not_null(model, *field_names)
+    > migrator.add_default(model, field_name, default)
+    > migrator.add_constraint(model, name, sql)
+    > migrator.drop_index(model, *col_names)
+    > migrator.drop_not_null(model, *field_names)
+    > migrator.drop_constraints(model, *constraints)
+
+"""
+
+from contextlib import suppress
+
+import peewee as pw
+from peewee_migrate import Migrator
+
+from app.online_migrations import OnlineMigrations
+
+
+with suppress(ImportError):
+    import playhouse.postgres_ext as pw_pext
+
+
+def migrate(migrator: Migrator, database: pw.Database, *, fake=False):
+    # The archival job looks for users deactivated a while ago. Only inactive
+    # users are indexed, so the index stays small and active users' writes skip it.
+    OnlineMigrations.add_index_concurrently(
+        migrator,
+        "userprofile",
+        ["updated_at"],
+        name="userprofile_inactive_updated_at",
+        where_sql="NOT is_active",
+    )
+
+
+def rollback(migrator: Migrator, database: pw.Database, *, fake=False):
+    OnlineMigrations.drop_index_concurrently(migrator, "userprofile_inactive_updated_at")